@@ -0,0 +1,435 @@
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_COMPONENTS = ("e2e", "asr", "llm", "llm_websocket_network_rtt", "tts", "knowledge_base", "s2s")
+HOUR_MS = 60 * 60 * 1000
+DAY_MS = 24 * HOUR_MS
+INTERVAL_MS = {"hour": HOUR_MS, "day": DAY_MS}
+
+class LatencySketch:
+    """Mergeable quantile sketch over log-spaced buckets.
+
+    Every value lands in the bucket ceil(log_gamma(value)), so any quantile
+    is answered within `relative_accuracy` of the true value whatever the
+    distribution. Sketches with the same accuracy merge by adding counts.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.calls = 0  # calls whose values were added
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value > 0:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        else:
+            self.zero_count += count
+        self.count += count
+        self.total += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencySketch") -> None:
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.calls += other.calls
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(self.min, 0.0)
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                estimate = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def summary(self, percentiles: Iterable[float]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "calls": self.calls,
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+        for p in percentiles:
+            value = self.quantile(p / 100)
+            result[f"p{p:g}"] = round(value, 3) if value is not None else None
+        return result
+
+SketchKey = Tuple[str, str, int]  # component, agent_id, hour bucket start (ms)
+
+class LatencyAnalytics:
+    """Fleet-wide latency percentiles, maintained incrementally.
+
+    Each ended call's per-turn latency values are folded into one sketch per
+    (component, agent, hour). Queries merge the matching hourly sketches, so
+    answering over tens of thousands of calls touches a few hundred small
+    histograms instead of every call. Calls are counted once, by call_id;
+    the IDs are kept per hour and age out with that hour's sketches, as do
+    the per (agent, hour) call counts that queries report.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, retention_days: int = 30):
+        self.relative_accuracy = relative_accuracy
+        self.retention_ms = retention_days * 24 * HOUR_MS
+        self._sketches: Dict[SketchKey, LatencySketch] = {}
+        self._seen: Dict[int, Set[str]] = {}  # hour bucket start (ms) -> call_ids observed
+        # (agent_id, hour) -> number of calls by the set of components they had values for
+        self._call_counts: Dict[Tuple[str, int], Dict[FrozenSet[str], int]] = {}
+        self._stats = {"calls_observed": 0, "values_observed": 0}
+
+    def observe_call(self, call: Optional[Dict[str, Any]]) -> bool:
+        """Fold a call's latency into the sketches; returns False if skipped"""
+        if not call:
+            return False
+        call_id = call.get("call_id")
+        latency = call.get("latency")
+        if not call_id or not latency:
+            return False
+        timestamp = call.get("start_timestamp") or call.get("end_timestamp")
+        if timestamp is None:
+            return False
+        hour = int(timestamp) // HOUR_MS * HOUR_MS
+        if call_id in self._seen.get(hour, ()):
+            return False
+        if self.retention_ms and hour < int(time.time() * 1000) - self.retention_ms:
+            return False
+
+        agent_id = call.get("agent_id") or "unknown"
+        observed = []
+        for component in LATENCY_COMPONENTS:
+            metric = latency.get(component)
+            if not metric:
+                continue
+            values = metric.get("values")
+            if not values:
+                # Older payloads only carry summaries; the median stands in for each turn
+                if metric.get("p50") is None:
+                    continue
+                values = [metric["p50"]] * (metric.get("num") or 1)
+            key = (component, agent_id, hour)
+            sketch = self._sketches.get(key)
+            if sketch is None:
+                sketch = self._sketches[key] = LatencySketch(self.relative_accuracy)
+                self.prune()
+            for value in values:
+                sketch.add(value)
+            sketch.calls += 1
+            observed.append(component)
+            self._stats["values_observed"] += len(values)
+
+        seen = self._seen.get(hour)
+        if seen is None:
+            seen = self._seen[hour] = set()
+            self.prune()
+        seen.add(call_id)
+        if observed:
+            counts = self._call_counts.setdefault((agent_id, hour), {})
+            counts[frozenset(observed)] = counts.get(frozenset(observed), 0) + 1
+        self._stats["calls_observed"] += 1
+        return True
+
+    def clear(self) -> None:
+        """Forget every sketch and observed call"""
+        self._sketches.clear()
+        self._seen.clear()
+        self._call_counts.clear()
+        self._stats["calls_observed"] = 0
+        self._stats["values_observed"] = 0
+
+    def prune(self) -> int:
+        """Drop hourly sketches, and the call IDs counted in them, older than the retention window"""
+        if not self.retention_ms:
+            return 0
+        cutoff = int(time.time() * 1000) - self.retention_ms
+        expired = [key for key in self._sketches if key[2] < cutoff]
+        for key in expired:
+            del self._sketches[key]
+        for hour in [hour for hour in self._seen if hour < cutoff]:
+            del self._seen[hour]
+        for key in [key for key in self._call_counts if key[1] < cutoff]:
+            del self._call_counts[key]
+        return len(expired)
+
+    def query(
+        self,
+        components: Optional[List[str]] = None,
+        agent_id: Optional[List[str]] = None,
+        start_after: Optional[int] = None,
+        start_before: Optional[int] = None,
+        by_agent: bool = False,
+        interval: Optional[str] = None,
+        percentiles: Iterable[float] = (50, 90, 95, 99)
+    ) -> List[Dict[str, Any]]:
+        """Merge matching sketches into one row per component (and agent / time bucket).
+
+        Time bounds are applied at hour granularity.
+        """
+        wanted = set(components or LATENCY_COMPONENTS)
+        agents = set(agent_id) if agent_id else None
+        bucket_ms = INTERVAL_MS.get(interval or "")
+
+        groups: Dict[Tuple[str, Optional[str], Optional[int]], LatencySketch] = {}
+        for (component, agent, hour), sketch in self._sketches.items():
+            if component not in wanted or (agents is not None and agent not in agents):
+                continue
+            if start_after is not None and hour + HOUR_MS <= start_after:
+                continue
+            if start_before is not None and hour > start_before:
+                continue
+            group = (
+                component,
+                agent if by_agent else None,
+                hour // bucket_ms * bucket_ms if bucket_ms else None
+            )
+            merged = groups.get(group)
+            if merged is None:
+                merged = groups[group] = LatencySketch(self.relative_accuracy)
+            merged.merge(sketch)
+
+        rows = []
+        for (component, agent, bucket), sketch in sorted(
+            groups.items(), key=lambda item: (item[0][0], item[0][1] or "", item[0][2] or 0)
+        ):
+            row: Dict[str, Any] = {"component": component}
+            if by_agent:
+                row["agent_id"] = agent
+            if bucket_ms:
+                row["bucket_start"] = bucket
+            row.update(sketch.summary(percentiles))
+            rows.append(row)
+        return rows
+
+    def count_calls(
+        self,
+        components: Optional[List[str]] = None,
+        agent_id: Optional[List[str]] = None,
+        start_after: Optional[int] = None,
+        start_before: Optional[int] = None
+    ) -> int:
+        """Distinct calls merged into a query() with the same filters"""
+        wanted = set(components or LATENCY_COMPONENTS)
+        agents = set(agent_id) if agent_id else None
+        total = 0
+        for (agent, hour), counts in self._call_counts.items():
+            if agents is not None and agent not in agents:
+                continue
+            if start_after is not None and hour + HOUR_MS <= start_after:
+                continue
+            if start_before is not None and hour > start_before:
+                continue
+            total += sum(count for observed, count in counts.items() if observed & wanted)
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["sketches"] = len(self._sketches)
+        stats["calls_tracked"] = sum(len(seen) for seen in self._seen.values())
+        stats["relative_accuracy"] = self.relative_accuracy
+        return stats
+
+@dataclass
+class CostTotals:
+    """Summed cost and LLM token usage for a set of calls (costs in Retell's units)"""
+    calls: int = 0
+    combined_cost: float = 0.0
+    duration_seconds: float = 0.0
+    llm_tokens: float = 0.0
+    llm_requests: int = 0
+    products: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_call(cls, call: Dict[str, Any]) -> Optional["CostTotals"]:
+        cost = call.get("call_cost") or {}
+        usage = call.get("llm_token_usage") or {}
+        if not cost and not usage:
+            return None
+        totals = cls(
+            calls=1,
+            combined_cost=cost.get("combined_cost") or 0.0,
+            duration_seconds=cost.get("total_duration_seconds") or 0.0,
+            llm_tokens=sum(usage.get("values") or []),
+            llm_requests=usage.get("num_requests") or 0
+        )
+        for product in cost.get("product_costs") or []:
+            name = product.get("product") or "unknown"
+            totals.products[name] = totals.products.get(name, 0.0) + (product.get("cost") or 0.0)
+        return totals
+
+    def add(self, other: "CostTotals", sign: int = 1) -> None:
+        self.calls += sign * other.calls
+        self.combined_cost += sign * other.combined_cost
+        self.duration_seconds += sign * other.duration_seconds
+        self.llm_tokens += sign * other.llm_tokens
+        self.llm_requests += sign * other.llm_requests
+        for name, cost in other.products.items():
+            self.products[name] = self.products.get(name, 0.0) + sign * cost
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "combined_cost": round(self.combined_cost, 4),
+            "average_cost": round(self.combined_cost / self.calls, 4) if self.calls else None,
+            "duration_seconds": self.duration_seconds,
+            "llm_tokens": self.llm_tokens,
+            "llm_requests": self.llm_requests,
+            "products": {name: round(cost, 4) for name, cost in sorted(self.products.items())},
+        }
+
+RollupKey = Tuple[int, str]  # day start (ms), agent_id
+
+class CostRollups:
+    """Running cost and token totals per day and agent.
+
+    Each call's contribution is remembered so a later webhook carrying
+    revised cost data (call_analyzed after call_ended) replaces it instead of
+    being counted twice: the old contribution is subtracted and the new one
+    added, without rescanning any other call.
+    """
+
+    def __init__(self, retention_days: int = 30):
+        self.retention_ms = retention_days * DAY_MS
+        self._totals: Dict[RollupKey, CostTotals] = {}
+        self._contributions: Dict[str, Tuple[RollupKey, CostTotals]] = {}
+        self._stats = {"updates": 0, "revisions": 0}
+
+    def observe_call(self, call: Optional[Dict[str, Any]]) -> bool:
+        """Apply a call's cost data to the rollups; returns False if nothing changed"""
+        if not call or not call.get("call_id"):
+            return False
+        contribution = CostTotals.from_call(call)
+        timestamp = call.get("start_timestamp") or call.get("end_timestamp")
+        if contribution is None or timestamp is None:
+            return False
+        day = int(timestamp) // DAY_MS * DAY_MS
+        if self.retention_ms and day < int(time.time() * 1000) - self.retention_ms:
+            return False
+        key = (day, call.get("agent_id") or "unknown")
+
+        call_id = call["call_id"]
+        previous = self._contributions.get(call_id)
+        if previous is not None:
+            if previous == (key, contribution):
+                return False
+            self._totals[previous[0]].add(previous[1], sign=-1)
+            self._stats["revisions"] += 1
+
+        totals = self._totals.get(key)
+        if totals is None:
+            totals = self._totals[key] = CostTotals()
+            self.prune()
+        totals.add(contribution)
+        self._contributions[call_id] = (key, contribution)
+        self._stats["updates"] += 1
+        return True
+
+    def clear(self) -> None:
+        """Forget every rollup and per-call contribution"""
+        self._totals.clear()
+        self._contributions.clear()
+
+    def prune(self) -> int:
+        """Drop daily totals older than the retention window"""
+        if not self.retention_ms:
+            return 0
+        cutoff = int(time.time() * 1000) - self.retention_ms
+        expired = {key for key in self._totals if key[0] < cutoff}
+        if expired:
+            for key in expired:
+                del self._totals[key]
+            for call_id in [c for c, (key, _) in self._contributions.items() if key in expired]:
+                del self._contributions[call_id]
+        return len(expired)
+
+    def query(
+        self,
+        agent_id: Optional[List[str]] = None,
+        start_after: Optional[int] = None,
+        start_before: Optional[int] = None,
+        by_agent: bool = False,
+        by_day: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Sum matching daily totals into rows per agent and/or day.
+
+        Time bounds are applied at day granularity.
+        """
+        agents = set(agent_id) if agent_id else None
+        groups: Dict[Tuple[Optional[int], Optional[str]], CostTotals] = {}
+        for (day, agent), totals in self._totals.items():
+            if agents is not None and agent not in agents:
+                continue
+            if start_after is not None and day + DAY_MS <= start_after:
+                continue
+            if start_before is not None and day > start_before:
+                continue
+            group = (day if by_day else None, agent if by_agent else None)
+            merged = groups.get(group)
+            if merged is None:
+                merged = groups[group] = CostTotals()
+            merged.add(totals)
+
+        rows = []
+        for (day, agent), totals in sorted(groups.items(), key=lambda item: (item[0][0] or 0, item[0][1] or "")):
+            if totals.calls <= 0:
+                continue
+            row: Dict[str, Any] = {}
+            if by_day:
+                row["day_start"] = day
+            if by_agent:
+                row["agent_id"] = agent
+            row.update(totals.summary())
+            rows.append(row)
+        return rows
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["rollups"] = len(self._totals)
+        stats["calls_tracked"] = len(self._contributions)
+        return stats
+
+def observe_call(call: Optional[Dict[str, Any]]) -> None:
+    """Feed an updated call record to every analytics aggregate"""
+    latency_analytics.observe_call(call)
+    cost_rollups.observe_call(call)
+
+def rebuild(calls: Iterable[Dict[str, Any]]) -> None:
+    """Rebuild every analytics aggregate from stored calls in a single pass"""
+    started = time.monotonic()
+    latency_analytics.clear()
+    cost_rollups.clear()
+    count = 0
+    for call in calls:
+        observe_call(call)
+        count += 1
+    logger.info(f"Rebuilt call analytics from {count} calls in {round((time.monotonic() - started) * 1000, 3)}ms")
+
+# Global analytics instances
+latency_analytics = LatencyAnalytics(
+    relative_accuracy=settings.ANALYTICS_RELATIVE_ACCURACY,
+    retention_days=settings.ANALYTICS_RETENTION_DAYS
+)
+cost_rollups = CostRollups(retention_days=settings.ANALYTICS_RETENTION_DAYS)
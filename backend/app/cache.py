@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+from .config import settings
+from .packing import TRANSCRIPT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+Fetcher = Callable[[], Awaitable[Dict[str, Any]]]
+
+# Bulky payloads the call store already holds (packed); entries don't keep a second copy
+UNCACHED_FIELDS = frozenset(TRANSCRIPT_FIELDS + ("latency",))
+
+@dataclass
+class CacheEntry:
+    data: Dict[str, Any]
+    fetched_at: float
+    ttl: Optional[float]  # None means the entry never goes stale
+
+class CallCache:
+    """Stale-while-revalidate cache for upstream call lookups.
+
+    Freshness depends on the call status: ended calls with analysis are
+    immutable, ended calls still waiting for analysis and in-flight calls get
+    short TTLs. Stale entries are served immediately while a single
+    background fetch refreshes them, and concurrent misses for the same call
+    share one upstream request.
+    """
+
+    def __init__(
+        self,
+        ongoing_ttl: float = 2.0,
+        ended_ttl: float = 10.0,
+        max_stale: float = 30.0,
+        max_entries: int = 10000
+    ):
+        self.ongoing_ttl = ongoing_ttl
+        self.ended_ttl = ended_ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "revalidations": 0,
+            "errors": 0,
+        }
+
+    def ttl_for(self, data: Dict[str, Any]) -> Optional[float]:
+        """Freshness lifetime for a call payload, driven by its status"""
+        status = data.get("call_status")
+        if status == "error" or (status == "ended" and data.get("call_analysis")):
+            return None
+        if status == "ended":
+            return self.ended_ttl
+        return self.ongoing_ttl
+
+    def _put(self, call_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        data = {key: value for key, value in data.items() if key not in UNCACHED_FIELDS}
+        self._entries[call_id] = CacheEntry(data=data, fetched_at=time.monotonic(), ttl=self.ttl_for(data))
+        self._entries.move_to_end(call_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return data
+
+    def prime(self, call_id: str, data: Dict[str, Any]) -> None:
+        """Seed the cache with data known to be current (e.g. from a webhook)"""
+        self._put(call_id, data)
+
+    def invalidate(self, call_id: str) -> None:
+        self._entries.pop(call_id, None)
+
+    def peek(self, call_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(call_id)
+        return entry.data if entry else None
+
+    async def _run_fetch(self, call_id: str, fetcher: Fetcher) -> Dict[str, Any]:
+        try:
+            return self._put(call_id, await fetcher())
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        finally:
+            self._inflight.pop(call_id, None)
+
+    def _start_fetch(self, call_id: str, fetcher: Fetcher) -> asyncio.Task:
+        task = self._inflight.get(call_id)
+        if task is not None:
+            self._stats["coalesced"] += 1
+            return task
+        task = asyncio.create_task(self._run_fetch(call_id, fetcher))
+        self._inflight[call_id] = task
+        return task
+
+    def _revalidate(self, call_id: str, fetcher: Fetcher) -> None:
+        """Refresh an entry in the background without blocking the caller"""
+        if call_id in self._inflight:
+            return
+        self._stats["revalidations"] += 1
+        task = self._start_fetch(call_id, fetcher)
+        task.add_done_callback(self._log_background_error)
+
+    @staticmethod
+    def _log_background_error(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background revalidation failed: {task.exception()}")
+
+    async def get(self, call_id: str, fetcher: Fetcher) -> Dict[str, Any]:
+        """Return cached data (without transcripts or latency) when usable, otherwise wait for a (shared) upstream fetch"""
+        entry = self._entries.get(call_id)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if entry.ttl is None or age < entry.ttl:
+                self._stats["hits"] += 1
+                return entry.data
+            if age < entry.ttl + self.max_stale:
+                self._stats["stale_hits"] += 1
+                self._revalidate(call_id, fetcher)
+                return entry.data
+
+        self._stats["misses"] += 1
+        # Shield so a cancelled client request doesn't abort a fetch other polls are waiting on
+        return await asyncio.shield(self._start_fetch(call_id, fetcher))
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 4) if lookups else 0.0
+        stats["entries"] = len(self._entries)
+        stats["inflight"] = len(self._inflight)
+        return stats
+
+# Global cache instance
+call_cache = CallCache(
+    ongoing_ttl=settings.CALL_CACHE_ONGOING_TTL,
+    ended_ttl=settings.CALL_CACHE_ENDED_TTL,
+    max_stale=settings.CALL_CACHE_MAX_STALE,
+    max_entries=settings.CALL_CACHE_MAX_ENTRIES
+)
@@ -0,0 +1,68 @@
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# Lifecycle order of call statuses; terminal statuses share the highest rank
+STATUS_RANK = {
+    "created": 0,
+    "registered": 1,
+    "ongoing": 2,
+    "ended": 3,
+    "error": 3,
+    "not_connected": 3,
+}
+
+# Lifecycle order of webhook events
+EVENT_RANK = {
+    "call_started": 1,
+    "call_ended": 2,
+    "call_analyzed": 3,
+}
+
+def status_rank(status: Optional[str]) -> int:
+    return STATUS_RANK.get(status or "", -1)
+
+def is_status_regression(current: Optional[str], new: Optional[str]) -> bool:
+    """True when moving from current to new would step the call backwards"""
+    return status_rank(new) < status_rank(current)
+
+def is_stale_event(call: Optional[Dict[str, Any]], event_type: Optional[str]) -> bool:
+    """True when a later lifecycle event has already been applied to the call"""
+    if not call:
+        return False
+    return EVENT_RANK.get(event_type or "", 0) < call.get("event_rank", 0)
+
+def fill_missing(call: Optional[Dict[str, Any]], fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only fields the call doesn't have yet, so stale data never overwrites newer data"""
+    if not call:
+        return dict(fields)
+    return {
+        key: value for key, value in fields.items()
+        if value not in (None, "", [], {}) and call.get(key) in (None, "", [], {})
+    }
+
+def body_digest(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+class EventDeduplicator:
+    """Bounded set of recently seen event keys, evicting the oldest first"""
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._seen: "OrderedDict[Hashable, None]" = OrderedDict()
+
+    def check_and_add(self, key: Hashable) -> bool:
+        """Record key; True if it had already been seen"""
+        if key in self._seen:
+            self._seen.move_to_end(key)
+            return True
+        self._seen[key] = None
+        if len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+        return False
+
+    def forget(self, key: Hashable) -> None:
+        self._seen.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._seen)
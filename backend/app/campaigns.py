@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import httpx
+from .config import settings
+from .events import event_bus, call_event
+from .rate_limit import TokenBucket
+from .resilience import CircuitOpenError, backoff_delay
+from .retell_client import retell_client
+from .store import call_store
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CampaignItem:
+    index: int
+    to_number: str
+    dynamic_variables: Optional[Dict[str, str]] = None
+    status: str = "pending"  # pending, in_progress, succeeded, failed, cancelled
+    call_id: Optional[str] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "to_number": self.to_number,
+            "status": self.status,
+            "call_id": self.call_id,
+            "attempts": self.attempts,
+            "error": self.error,
+        }
+
+@dataclass
+class Campaign:
+    campaign_id: str
+    items: List[CampaignItem]
+    concurrency: int
+    rate_per_second: float
+    status: str = "pending"  # pending, running, completed, cancelled
+    retries: int = 0
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    task: Optional[asyncio.Task] = None
+
+    def progress(self, include_items: bool = False) -> Dict[str, Any]:
+        counts = {"pending": 0, "in_progress": 0, "succeeded": 0, "failed": 0, "cancelled": 0}
+        for item in self.items:
+            counts[item.status] += 1
+        progress: Dict[str, Any] = {
+            "campaign_id": self.campaign_id,
+            "status": self.status,
+            "total": len(self.items),
+            "pending": counts["pending"],
+            "in_progress": counts["in_progress"],
+            "succeeded": counts["succeeded"],
+            "failed": counts["failed"],
+            "cancelled": counts["cancelled"],
+            "retries": self.retries,
+            "concurrency": self.concurrency,
+            "rate_per_second": self.rate_per_second,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if include_items:
+            progress["items"] = [item.result() for item in self.items]
+        return progress
+
+def is_retryable(error: Exception) -> bool:
+    """Only failures where Retell cannot have placed the call: 429s, failures to connect and an open circuit.
+
+    A 5xx or a timeout may come after the call was placed, so retrying
+    could dial the number twice.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, CircuitOpenError))
+
+class CampaignManager:
+    """Runs bulk outbound call campaigns.
+
+    Each campaign dials its items with a fixed number of concurrent workers,
+    paced by a token bucket so the combined call rate stays under the Retell
+    quota. Retryable failures are retried with jittered exponential backoff.
+    Only the most recent max_campaigns campaigns are kept.
+    """
+
+    def __init__(self, max_retries: int = 3, retry_base_delay: float = 1.0, max_campaigns: int = 100):
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.max_campaigns = max_campaigns
+        self._campaigns: "OrderedDict[str, Campaign]" = OrderedDict()
+
+    def create(self, items: List[CampaignItem], concurrency: int, rate_per_second: float) -> Campaign:
+        campaign = Campaign(
+            campaign_id=f"campaign_{uuid.uuid4().hex[:16]}",
+            items=items,
+            concurrency=max(1, concurrency),
+            rate_per_second=rate_per_second
+        )
+        self._campaigns[campaign.campaign_id] = campaign
+        self._prune()
+        campaign.task = asyncio.create_task(self._run(campaign))
+        logger.info(f"Started {campaign.campaign_id} with {len(items)} calls (concurrency={campaign.concurrency}, rate={rate_per_second}/s)")
+        return campaign
+
+    def get(self, campaign_id: str) -> Optional[Campaign]:
+        return self._campaigns.get(campaign_id)
+
+    def list(self) -> List[Campaign]:
+        return list(reversed(self._campaigns.values()))
+
+    def cancel(self, campaign_id: str) -> Optional[Campaign]:
+        campaign = self._campaigns.get(campaign_id)
+        if campaign is not None and campaign.task is not None and not campaign.task.done():
+            campaign.task.cancel()
+        return campaign
+
+    def _prune(self) -> None:
+        while len(self._campaigns) > self.max_campaigns:
+            oldest_id, oldest = next(iter(self._campaigns.items()))
+            if oldest.task is not None and not oldest.task.done():
+                break
+            del self._campaigns[oldest_id]
+
+    async def _dial(self, campaign: Campaign, item: CampaignItem, bucket: TokenBucket) -> None:
+        item.status = "in_progress"
+        while True:
+            await bucket.acquire()
+            item.attempts += 1
+            try:
+                call_data = await retell_client.create_phone_call(item.to_number, item.dynamic_variables)
+            except Exception as e:
+                item.error = str(e) or type(e).__name__
+                if item.attempts > self.max_retries or not is_retryable(e):
+                    item.status = "failed"
+                    return
+                campaign.retries += 1
+                await asyncio.sleep(backoff_delay(item.attempts, self.retry_base_delay, 30.0))
+                continue
+
+            call_id = call_data.get("call_id")
+            if not call_id:
+                item.status = "failed"
+                item.error = "Retell response did not include a call_id"
+                return
+            item.call_id = call_id
+            item.status = "succeeded"
+            item.error = None
+            call_store.update_call(call_id, {
+                "call_id": call_id,
+                "call_status": "created",
+                "to_number": item.to_number,
+                "dynamic_variables": item.dynamic_variables,
+                "campaign_id": campaign.campaign_id
+            })
+            event_bus.publish(call_event("call_created", call_id, {"call_status": "created"}))
+            return
+
+    async def _worker(self, campaign: Campaign, queue: "asyncio.Queue[CampaignItem]", bucket: TokenBucket) -> None:
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await self._dial(campaign, item, bucket)
+
+    async def _run(self, campaign: Campaign) -> None:
+        campaign.status = "running"
+        campaign.started_at = datetime.utcnow()
+        queue: "asyncio.Queue[CampaignItem]" = asyncio.Queue()
+        for item in campaign.items:
+            queue.put_nowait(item)
+        bucket = TokenBucket(campaign.rate_per_second)
+        workers = [
+            asyncio.create_task(self._worker(campaign, queue, bucket))
+            for _ in range(min(campaign.concurrency, len(campaign.items)) or 1)
+        ]
+        try:
+            await asyncio.gather(*workers)
+            campaign.status = "completed"
+        except asyncio.CancelledError:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for item in campaign.items:
+                if item.status in ("pending", "in_progress"):
+                    item.status = "cancelled"
+            campaign.status = "cancelled"
+        finally:
+            campaign.finished_at = datetime.utcnow()
+            logger.info(f"{campaign.campaign_id} {campaign.status}: {campaign.progress()}")
+
+    async def shutdown(self) -> None:
+        """Cancel campaigns that are still running"""
+        tasks = [c.task for c in self._campaigns.values() if c.task is not None and not c.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+# Global campaign manager instance
+campaign_manager = CampaignManager(
+    max_retries=settings.CAMPAIGN_MAX_RETRIES,
+    retry_base_delay=settings.CAMPAIGN_RETRY_BASE_DELAY,
+    max_campaigns=settings.CAMPAIGN_MAX_RETAINED
+)
@@ -3,6 +3,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def _env_bool(name: str, default: bool = False) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
 class Settings:
     RETELL_API_KEY: str = os.getenv("RETELL_API_KEY", "")
     RETELL_FROM_NUMBER: str = os.getenv("RETELL_FROM_NUMBER", "")
@@ -10,4 +13,132 @@ class Settings:
     RETELL_BASE_URL: str = os.getenv("RETELL_BASE_URL", "https://api.retellai.com")
     RETELL_WEBHOOK_VERIFY_KEY: str = os.getenv("RETELL_WEBHOOK_VERIFY_KEY", "")
 
-settings = Settings()
\ No newline at end of file
+    # Shared HTTP connection pool to the Retell API
+    RETELL_MAX_CONNECTIONS: int = int(os.getenv("RETELL_MAX_CONNECTIONS", "100"))
+    RETELL_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("RETELL_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    RETELL_KEEPALIVE_EXPIRY: float = float(os.getenv("RETELL_KEEPALIVE_EXPIRY", "30"))
+    RETELL_HTTP2: bool = _env_bool("RETELL_HTTP2")
+    RETELL_CONNECT_TIMEOUT: float = float(os.getenv("RETELL_CONNECT_TIMEOUT", "5"))
+    RETELL_POOL_TIMEOUT: float = float(os.getenv("RETELL_POOL_TIMEOUT", "5"))
+
+    # Per-endpoint read timeouts (seconds)
+    RETELL_CREATE_CALL_TIMEOUT: float = float(os.getenv("RETELL_CREATE_CALL_TIMEOUT", "30"))
+    RETELL_GET_CALL_TIMEOUT: float = float(os.getenv("RETELL_GET_CALL_TIMEOUT", "10"))
+    RETELL_LIST_CALLS_TIMEOUT: float = float(os.getenv("RETELL_LIST_CALLS_TIMEOUT", "20"))
+
+    # Client-side rate limiting, retries and circuit breaker for the Retell API
+    RETELL_RATE_LIMIT: float = float(os.getenv("RETELL_RATE_LIMIT", "20"))
+    RETELL_RATE_BURST: float = float(os.getenv("RETELL_RATE_BURST", "20"))
+    RETELL_MAX_RETRIES: int = int(os.getenv("RETELL_MAX_RETRIES", "3"))
+    RETELL_RETRY_BASE_DELAY: float = float(os.getenv("RETELL_RETRY_BASE_DELAY", "0.5"))
+    RETELL_RETRY_MAX_DELAY: float = float(os.getenv("RETELL_RETRY_MAX_DELAY", "10"))
+    RETELL_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("RETELL_BREAKER_FAILURE_THRESHOLD", "5"))
+    RETELL_BREAKER_RECOVERY_TIMEOUT: float = float(os.getenv("RETELL_BREAKER_RECOVERY_TIMEOUT", "30"))
+
+    # Stale-while-revalidate cache for GET /api/calls/{call_id} (seconds)
+    CALL_CACHE_ONGOING_TTL: float = float(os.getenv("CALL_CACHE_ONGOING_TTL", "2"))
+    CALL_CACHE_ENDED_TTL: float = float(os.getenv("CALL_CACHE_ENDED_TTL", "10"))
+    CALL_CACHE_MAX_STALE: float = float(os.getenv("CALL_CACHE_MAX_STALE", "30"))
+    CALL_CACHE_MAX_ENTRIES: int = int(os.getenv("CALL_CACHE_MAX_ENTRIES", "10000"))
+
+    # POST /api/calls/batch: maximum IDs per request and concurrent Retell fetches
+    CALL_BATCH_MAX_IDS: int = int(os.getenv("CALL_BATCH_MAX_IDS", "500"))
+    CALL_BATCH_CONCURRENCY: int = int(os.getenv("CALL_BATCH_CONCURRENCY", "10"))
+
+    # Server-Sent Events streams for call updates
+    EVENT_QUEUE_SIZE: int = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+    EVENT_MAX_SUBSCRIBERS: int = int(os.getenv("EVENT_MAX_SUBSCRIBERS", "1000"))
+    EVENT_HEARTBEAT_SECONDS: float = float(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+
+    # Call store backend: "memory" (default) or "sqlite"
+    CALL_STORE_BACKEND: str = os.getenv("CALL_STORE_BACKEND", "memory").strip().lower()
+    CALL_STORE_PATH: str = os.getenv("CALL_STORE_PATH", "calls.db")
+    CALL_STORE_BATCH_SIZE: int = int(os.getenv("CALL_STORE_BATCH_SIZE", "100"))
+    CALL_STORE_FLUSH_INTERVAL: float = float(os.getenv("CALL_STORE_FLUSH_INTERVAL", "0.5"))
+
+    # Memory bounds for the in-memory store (0 disables a limit)
+    CALL_STORE_MAX_ENTRIES: int = int(os.getenv("CALL_STORE_MAX_ENTRIES", "50000"))
+    CALL_STORE_MAX_BYTES: int = int(os.getenv("CALL_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+    CALL_STORE_COLD_TTL: float = float(os.getenv("CALL_STORE_COLD_TTL", "86400"))
+    CALL_STORE_HOT_TTL: float = float(os.getenv("CALL_STORE_HOT_TTL", "21600"))
+    CALL_STORE_SPILL_PATH: str = os.getenv("CALL_STORE_SPILL_PATH", "")
+    # Hold word timings and latency samples in float64 arrays instead of Python lists
+    CALL_STORE_PACK: bool = _env_bool("CALL_STORE_PACK", True)
+
+    # Append-only log of call store changes, with periodic snapshots, replayed on startup
+    # (empty disables; in-memory store only, and one process per directory)
+    EVENT_LOG_DIR: str = os.getenv("EVENT_LOG_DIR", "")
+    EVENT_LOG_FSYNC_INTERVAL: float = float(os.getenv("EVENT_LOG_FSYNC_INTERVAL", "0.05"))
+    EVENT_LOG_SNAPSHOT_INTERVAL: float = float(os.getenv("EVENT_LOG_SNAPSHOT_INTERVAL", "300"))
+    EVENT_LOG_SNAPSHOT_EVERY: int = int(os.getenv("EVENT_LOG_SNAPSHOT_EVERY", "10000"))
+
+    # Asynchronous webhook ingestion
+    WEBHOOK_QUEUE_SIZE: int = int(os.getenv("WEBHOOK_QUEUE_SIZE", "10000"))
+    WEBHOOK_WORKERS: int = int(os.getenv("WEBHOOK_WORKERS", "4"))
+    WEBHOOK_BATCH_SIZE: int = int(os.getenv("WEBHOOK_BATCH_SIZE", "50"))
+    WEBHOOK_DRAIN_TIMEOUT: float = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "10"))
+    WEBHOOK_DEDUP_SIZE: int = int(os.getenv("WEBHOOK_DEDUP_SIZE", "100000"))
+
+    # Background sync of call history from Retell
+    CALL_SYNC_ENABLED: bool = _env_bool("CALL_SYNC_ENABLED")
+    CALL_SYNC_INTERVAL: float = float(os.getenv("CALL_SYNC_INTERVAL", "60"))
+    CALL_SYNC_PAGE_SIZE: int = int(os.getenv("CALL_SYNC_PAGE_SIZE", "100"))
+    CALL_SYNC_MAX_PAGES: int = int(os.getenv("CALL_SYNC_MAX_PAGES", "10"))
+    CALL_SYNC_OVERLAP_MS: int = int(os.getenv("CALL_SYNC_OVERLAP_MS", "300000"))
+    CALL_SYNC_BACKFILL_LIMIT: int = int(os.getenv("CALL_SYNC_BACKFILL_LIMIT", "20"))
+    # Give up re-fetching a call after this many tries, or this long (seconds) after it ended
+    CALL_SYNC_BACKFILL_MAX_ATTEMPTS: int = int(os.getenv("CALL_SYNC_BACKFILL_MAX_ATTEMPTS", "5"))
+    CALL_SYNC_BACKFILL_MAX_AGE: float = float(os.getenv("CALL_SYNC_BACKFILL_MAX_AGE", "86400"))
+
+    # Bulk outbound call campaigns
+    CAMPAIGN_DEFAULT_CONCURRENCY: int = int(os.getenv("CAMPAIGN_DEFAULT_CONCURRENCY", "5"))
+    CAMPAIGN_DEFAULT_RATE: float = float(os.getenv("CAMPAIGN_DEFAULT_RATE", "1"))
+    # Upper bounds on what a single campaign request may ask for
+    CAMPAIGN_MAX_CONCURRENCY: int = int(os.getenv("CAMPAIGN_MAX_CONCURRENCY", "50"))
+    CAMPAIGN_MAX_RATE: float = float(os.getenv("CAMPAIGN_MAX_RATE", "20"))
+    CAMPAIGN_MAX_ITEMS: int = int(os.getenv("CAMPAIGN_MAX_ITEMS", "10000"))
+    CAMPAIGN_MAX_RETRIES: int = int(os.getenv("CAMPAIGN_MAX_RETRIES", "3"))
+    CAMPAIGN_RETRY_BASE_DELAY: float = float(os.getenv("CAMPAIGN_RETRY_BASE_DELAY", "1"))
+    CAMPAIGN_MAX_RETAINED: int = int(os.getenv("CAMPAIGN_MAX_RETAINED", "100"))
+
+    # Fleet-wide analytics
+    ANALYTICS_RELATIVE_ACCURACY: float = float(os.getenv("ANALYTICS_RELATIVE_ACCURACY", "0.01"))
+    ANALYTICS_RETENTION_DAYS: int = int(os.getenv("ANALYTICS_RETENTION_DAYS", "30"))
+
+    # Multi-worker coordination: "local" for one process, "sqlite" to share
+    # events and the sync lease between workers (use with CALL_STORE_BACKEND=sqlite)
+    COORDINATION_BACKEND: str = os.getenv("COORDINATION_BACKEND", "local").strip().lower()
+    COORDINATION_PATH: str = os.getenv("COORDINATION_PATH", "coordination.db")
+    EVENT_BROKER_POLL_INTERVAL: float = float(os.getenv("EVENT_BROKER_POLL_INTERVAL", "0.1"))
+    EVENT_BROKER_RETENTION: float = float(os.getenv("EVENT_BROKER_RETENTION", "300"))
+
+    # Transcript search index
+    SEARCH_INDEX_ENABLED: bool = _env_bool("SEARCH_INDEX_ENABLED", True)
+
+    # Readiness checks: background Retell probe and saturation thresholds
+    HEALTH_PROBE_INTERVAL: float = float(os.getenv("HEALTH_PROBE_INTERVAL", "15"))
+    HEALTH_PROBE_TIMEOUT: float = float(os.getenv("HEALTH_PROBE_TIMEOUT", "3"))
+    HEALTH_PROBE_FAILURE_THRESHOLD: int = int(os.getenv("HEALTH_PROBE_FAILURE_THRESHOLD", "2"))
+    HEALTH_MAX_QUEUE_UTILIZATION: float = float(os.getenv("HEALTH_MAX_QUEUE_UTILIZATION", "0.8"))
+    HEALTH_REQUIRE_UPSTREAM: bool = _env_bool("HEALTH_REQUIRE_UPSTREAM", True)
+    # Seconds Retell must stay down before it fails readiness
+    HEALTH_UPSTREAM_GRACE_PERIOD: float = float(os.getenv("HEALTH_UPSTREAM_GRACE_PERIOD", "60"))
+
+    # On-disk LRU cache behind GET /api/calls/{call_id}/recording, filled on call_ended
+    RECORDING_CACHE_ENABLED: bool = _env_bool("RECORDING_CACHE_ENABLED", True)
+    RECORDING_CACHE_DIR: str = os.getenv("RECORDING_CACHE_DIR", "recordings")
+    RECORDING_CACHE_MAX_BYTES: int = int(os.getenv("RECORDING_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+    RECORDING_MAX_FILE_BYTES: int = int(os.getenv("RECORDING_MAX_FILE_BYTES", str(200 * 1024 * 1024)))
+    RECORDING_DOWNLOAD_TIMEOUT: float = float(os.getenv("RECORDING_DOWNLOAD_TIMEOUT", "60"))
+    RECORDING_PREFETCH: bool = _env_bool("RECORDING_PREFETCH", True)
+    RECORDING_PREFETCH_CONCURRENCY: int = int(os.getenv("RECORDING_PREFETCH_CONCURRENCY", "4"))
+    # Hosts recordings may be downloaded from ("*.example.com" matches subdomains); https only
+    # unless RECORDING_ALLOW_HTTP is set, e.g. for the local Retell stub
+    RECORDING_ALLOWED_HOSTS: str = os.getenv("RECORDING_ALLOWED_HOSTS", "retellai.s3.us-west-2.amazonaws.com,dxc03zgurdly9.cloudfront.net")
+    RECORDING_ALLOW_HTTP: bool = _env_bool("RECORDING_ALLOW_HTTP", False)
+
+    # Prometheus metrics at /metrics and Server-Timing response headers
+    METRICS_ENABLED: bool = _env_bool("METRICS_ENABLED", True)
+    SERVER_TIMING_ENABLED: bool = _env_bool("SERVER_TIMING_ENABLED", True)
+
+settings = Settings()
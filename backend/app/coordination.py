@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+from .config import settings
+from .events import event_bus
+from .jsonutil import dumps, loads
+from .store import call_store
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process to the other workers sharing coordination state
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+class Lease:
+    """Leadership lease: only the current holder should run singleton work"""
+
+    def acquire(self) -> bool:
+        """Take or renew the lease; returns True while this process holds it"""
+        raise NotImplementedError
+
+    def release(self) -> None:
+        raise NotImplementedError
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Publish a small status document for the other workers"""
+        raise NotImplementedError
+
+    def holder_state(self) -> Dict[str, Any]:
+        """Status document published by the current holder"""
+        raise NotImplementedError
+
+class LocalLease(Lease):
+    """Single-process lease that is always held"""
+
+    def __init__(self):
+        self._state: Dict[str, Any] = {}
+
+    def acquire(self) -> bool:
+        return True
+
+    def release(self) -> None:
+        pass
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._state = dict(state)
+
+    def holder_state(self) -> Dict[str, Any]:
+        return dict(self._state)
+
+class EventBroker:
+    """Carries call events between worker processes.
+
+    Implementations forward events published on the local event bus to the
+    other workers, deliver theirs to local subscribers, and call listeners so
+    per-process state (analytics, search, cache) can follow remote writes.
+    """
+
+    def __init__(self):
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call listener for every event received from another worker"""
+        self._listeners.append(listener)
+
+    def lease(self, name: str, ttl: float) -> Lease:
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "local", "worker_id": WORKER_ID}
+
+class LocalEventBroker(EventBroker):
+    """Single-process deployment: the in-process event bus already reaches everyone"""
+
+    def lease(self, name: str, ttl: float) -> Lease:
+        return LocalLease()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    origin TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_created ON events (created_at);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    state TEXT
+);
+"""
+
+class SQLiteLease(Lease):
+    """Lease row in the shared coordination database, renewed by its holder"""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.RLock, name: str, ttl: float):
+        self._conn = conn
+        self._lock = lock
+        self.name = name
+        self.ttl = ttl
+
+    def acquire(self) -> bool:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT holder, expires_at FROM leases WHERE name = ?", (self.name,)).fetchone()
+                held = row is None or row[0] == WORKER_ID or row[1] < now
+                if held:
+                    self._conn.execute(
+                        "INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at, "
+                        "state = CASE WHEN leases.holder = excluded.holder THEN leases.state ELSE NULL END",
+                        (self.name, WORKER_ID, now + self.ttl)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if held and (row is None or row[0] != WORKER_ID):
+            logger.info(f"Acquired lease {self.name} as {WORKER_ID}")
+        return held
+
+    def release(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (self.name, WORKER_ID))
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE leases SET state = ? WHERE name = ? AND holder = ?",
+                (dumps(state).decode("utf-8"), self.name, WORKER_ID)
+            )
+
+    def holder_state(self) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM leases WHERE name = ? AND expires_at >= ?", (self.name, time.time())
+            ).fetchone()
+        return loads(row[0]) if row and row[0] else {}
+
+class SQLiteEventBroker(EventBroker):
+    """Event broker over an append-only table in a shared SQLite file.
+
+    Locally published events are buffered and appended every poll_interval,
+    after the call store is flushed so other workers can read what the event
+    describes. Each worker polls for rows from other origins and hands them to
+    its event bus. Rows older than retention seconds are deleted.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.1, retention: float = 300.0):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        self._outbox: List[Dict[str, Any]] = []
+        self._last_id = 0
+        self._last_prune = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"sent": 0, "received": 0, "listener_errors": 0, "poll_errors": 0}
+
+    def lease(self, name: str, ttl: float) -> Lease:
+        return SQLiteLease(self._conn, self._lock, name, ttl)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        self._outbox.append(event)
+
+    def _send(self) -> None:
+        if not self._outbox:
+            return
+        outbox, self._outbox = self._outbox, []
+        call_store.flush()
+        now = int(time.time() * 1000)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO events (origin, created_at, payload) VALUES (?, ?, ?)",
+                [(WORKER_ID, now, dumps(event, default=str).decode("utf-8")) for event in outbox]
+            )
+        self._stats["sent"] += len(outbox)
+
+    def _receive(self) -> None:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, origin, payload FROM events WHERE id > ? ORDER BY id LIMIT 1000", (self._last_id,)
+            ).fetchall()
+        for row_id, origin, payload in rows:
+            self._last_id = row_id
+            if origin == WORKER_ID:
+                continue
+            event = loads(payload)
+            self._stats["received"] += 1
+            for listener in self._listeners:
+                try:
+                    listener(event)
+                except Exception as e:
+                    self._stats["listener_errors"] += 1
+                    logger.error(f"Remote event listener failed: {e}")
+            event_bus.deliver(event)
+
+    def _prune(self) -> None:
+        now = time.time()
+        if now - self._last_prune < 60:
+            return
+        self._last_prune = now
+        with self._lock:
+            self._conn.execute("DELETE FROM events WHERE created_at < ?", (int((now - self.retention) * 1000),))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self._send()
+                self._receive()
+                self._prune()
+            except Exception as e:
+                self._stats["poll_errors"] += 1
+                logger.error(f"Event broker poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        # Only events published from now on are relevant to this worker
+        with self._lock:
+            self._last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        event_bus.forwarder = self.publish
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"SQLite event broker started at {self.path} as {WORKER_ID}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        event_bus.forwarder = None
+        try:
+            self._send()
+        except Exception as e:
+            logger.error(f"Failed to send final events: {e}")
+        self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        stats["backend"] = "sqlite"
+        stats["path"] = self.path
+        stats["worker_id"] = WORKER_ID
+        stats["outbox"] = len(self._outbox)
+        return stats
+
+def create_event_broker(backend: str) -> EventBroker:
+    if backend == "sqlite":
+        return SQLiteEventBroker(
+            settings.COORDINATION_PATH,
+            poll_interval=settings.EVENT_BROKER_POLL_INTERVAL,
+            retention=settings.EVENT_BROKER_RETENTION
+        )
+    if backend != "local":
+        logger.warning(f"Unknown COORDINATION_BACKEND '{backend}', using local")
+    return LocalEventBroker()
+
+# Global broker instance
+event_broker = create_event_broker(settings.COORDINATION_BACKEND)
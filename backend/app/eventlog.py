@@ -0,0 +1,381 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from .config import settings
+from .jsonutil import dumps, loads
+from .packing import unpack
+from .store import CallStore, InMemoryCallStore
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; the directory lock is skipped there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Snapshots kept on disk; the older one (and the log since it) is the fallback if the newest is unreadable
+SNAPSHOTS_KEPT = 2
+
+def _segment_name(first_seq: int) -> str:
+    return f"events-{first_seq:020d}.log"
+
+def _snapshot_name(seq: int) -> str:
+    return f"snapshot-{seq:020d}.ndjson"
+
+def _seq_of(name: str) -> int:
+    return int(name.split("-", 1)[1].split(".", 1)[0])
+
+def _fsync_directory(directory: str) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _parse_time(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+class EventLog:
+    """Append-only journal of call store changes, with periodic snapshots, for crash recovery.
+
+    Every change to the in-memory store is appended as one JSON line to the
+    current log segment as it happens, so it survives a crash of the process;
+    the segment is fsynced at most every fsync_interval seconds, which bounds
+    what a power loss can take. Every snapshot_interval seconds (or
+    snapshot_every records) the store is written out as a snapshot and a new
+    segment begun; segments older than the kept snapshots are deleted. On
+    startup the newest readable snapshot is loaded and only the log written
+    after it is replayed.
+
+    One process owns a directory: with several workers, only the first to
+    start journals; the others run without it.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        fsync_interval: float = 0.05,
+        snapshot_interval: float = 300.0,
+        snapshot_every: int = 10000
+    ):
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_every = snapshot_every
+        self._store: Optional[InMemoryCallStore] = None
+        self._fd: Optional[int] = None
+        self._lock_fd: Optional[int] = None
+        self._segment = ""
+        self._seq = 0
+        self._snapshot_seq = 0
+        self._since_snapshot = 0
+        self._last_snapshot = 0.0
+        self._dirty = False
+        # Held while fsyncing or rotating, so a segment is never closed under a pending fsync
+        self._io_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._stats = {
+            "appended": 0,
+            "appended_bytes": 0,
+            "fsyncs": 0,
+            "snapshots": 0,
+            "last_snapshot_calls": 0,
+            "last_snapshot_ms": 0.0,
+            "recovered_calls": 0,
+            "replayed": 0,
+            "torn_records": 0,
+            "recovery_ms": 0.0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self._fd is not None
+
+    # Journal interface used by InMemoryCallStore
+
+    def _append(self, op: str, call_id: str, data: Any = None, at: Any = None) -> None:
+        if self._fd is None:
+            return
+        self._seq += 1
+        record: Dict[str, Any] = {"seq": self._seq, "op": op, "call_id": call_id}
+        if data is not None:
+            record["data"] = data
+        if at is not None:
+            record["at"] = at
+        line = dumps(record, default=str) + b"\n"
+        # One write per record on an O_APPEND descriptor: a crash can only tear the last line
+        os.write(self._fd, line)
+        self._dirty = True
+        self._since_snapshot += 1
+        self._stats["appended"] += 1
+        self._stats["appended_bytes"] += len(line)
+
+    def record_update(self, call_id: str, data: Dict[str, Any], updated_at: datetime) -> None:
+        self._append("update", call_id, data, updated_at)
+
+    def record_put(self, call_id: str, data: Dict[str, Any]) -> None:
+        self._append("put", call_id, data)
+
+    def record_evict(self, call_id: str) -> None:
+        self._append("evict", call_id)
+
+    def record_delete(self, call_id: str) -> None:
+        self._append("delete", call_id)
+
+    # Files
+
+    def _list(self, prefix: str) -> List[Tuple[int, str]]:
+        found = []
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and not name.endswith(".tmp"):
+                try:
+                    found.append((_seq_of(name), os.path.join(self.directory, name)))
+                except ValueError:
+                    continue
+        return sorted(found)
+
+    def _open_segment(self, first_seq: int) -> None:
+        self._segment = os.path.join(self.directory, _segment_name(first_seq))
+        self._fd = os.open(self._segment, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._dirty = False
+
+    @staticmethod
+    def _close_segment(fd: int, directory: str) -> None:
+        """Make a finished segment, and the directory entry of its successor, durable"""
+        os.fsync(fd)
+        os.close(fd)
+        _fsync_directory(directory)
+
+    def _lock_directory(self) -> bool:
+        if fcntl is None:
+            return True
+        self._lock_fd = os.open(os.path.join(self.directory, "LOCK"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+            return False
+        return True
+
+    # Recovery
+
+    def _load_snapshot(self, path: str) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        """Calls of a snapshot, or None if it is unreadable or incomplete"""
+        try:
+            with open(path, "rb") as f:
+                header = loads(f.readline())
+                calls = [loads(line) for line in f]
+        except (OSError, ValueError) as e:
+            logger.error(f"Unreadable event log snapshot {path}: {e}")
+            return None
+        if not isinstance(header, dict) or header.get("calls") != len(calls):
+            logger.error(f"Incomplete event log snapshot {path}")
+            return None
+        return header["seq"], calls
+
+    def _replay_segment(self, path: str, store: InMemoryCallStore) -> None:
+        with open(path, "rb") as f:
+            content = f.read()
+        end = content.rfind(b"\n") + 1
+        if end < len(content):
+            # The write in progress when the process died; drop it so appends start on a clean line
+            self._stats["torn_records"] += 1
+            os.truncate(path, end)
+        for line in content[:end].splitlines():
+            try:
+                record = loads(line)
+                seq = record["seq"]
+                op = record["op"]
+                call_id = record["call_id"]
+            except (ValueError, KeyError, TypeError):
+                self._stats["torn_records"] += 1
+                continue
+            if seq <= self._seq:
+                continue
+            data = record.get("data")
+            if op == "put" and isinstance(data, dict):
+                # A whole call, as in a snapshot
+                data["updated_at"] = _parse_time(data.get("updated_at"))
+            store.replay(op, call_id, data, _parse_time(record.get("at")))
+            self._seq = seq
+            self._stats["replayed"] += 1
+
+    def _recover(self, store: InMemoryCallStore) -> None:
+        for seq, path in reversed(self._list("snapshot-")):
+            loaded = self._load_snapshot(path)
+            if loaded is None:
+                continue
+            self._snapshot_seq, calls = loaded
+            self._seq = self._snapshot_seq
+            for call in calls:
+                call["updated_at"] = _parse_time(call.get("updated_at"))
+                store.replay("restore", call["call_id"], call)
+            self._stats["recovered_calls"] = len(calls)
+            break
+        for _, path in self._list("events-"):
+            self._replay_segment(path, store)
+        # Leftovers of a snapshot interrupted by the crash
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                os.unlink(os.path.join(self.directory, name))
+
+    # Snapshots
+
+    def _write_snapshot(self, seq: int, calls: List[Dict[str, Any]]) -> str:
+        path = os.path.join(self.directory, _snapshot_name(seq))
+        temp = path + ".tmp"
+        with open(temp, "wb") as f:
+            f.write(dumps({"seq": seq, "calls": len(calls), "created_at": datetime.utcnow()}) + b"\n")
+            for call in calls:
+                # Decoding packed transcripts table by table beats serializing them word by word
+                f.write(dumps(unpack(call), default=str) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+        _fsync_directory(self.directory)
+        return path
+
+    def _prune(self) -> None:
+        snapshots = self._list("snapshot-")
+        for _, path in snapshots[:-SNAPSHOTS_KEPT]:
+            os.unlink(path)
+        oldest = snapshots[-SNAPSHOTS_KEPT:][0][0] if snapshots else 0
+        # A segment starting at or before a snapshot's seq was rotated out by it, so is wholly covered
+        for first_seq, path in self._list("events-"):
+            if first_seq <= oldest and path != self._segment:
+                os.unlink(path)
+
+    async def snapshot(self) -> Optional[str]:
+        """Write the store out and start a new log segment; returns the snapshot path"""
+        if self._store is None or self._fd is None:
+            return None
+        async with self._io_lock:
+            seq = self._seq
+            if seq == self._snapshot_seq:
+                return None
+            # Calls evicted to the spill store must be on disk before the log of their eviction goes
+            self._store.flush()
+            calls = self._store.snapshot_calls()
+            previous = self._fd
+            self._open_segment(seq + 1)
+            self._since_snapshot = 0
+            self._last_snapshot = time.monotonic()
+            await asyncio.to_thread(self._close_segment, previous, self.directory)
+        started = time.perf_counter()
+        path = await asyncio.to_thread(self._write_snapshot, seq, calls)
+        self._snapshot_seq = seq
+        await asyncio.to_thread(self._prune)
+        elapsed = (time.perf_counter() - started) * 1000
+        self._stats["snapshots"] += 1
+        self._stats["last_snapshot_calls"] = len(calls)
+        self._stats["last_snapshot_ms"] = round(elapsed, 1)
+        logger.info(f"Event log snapshot at seq {seq}: {len(calls)} calls in {elapsed:.0f} ms")
+        return path
+
+    # Lifecycle
+
+    async def sync(self) -> None:
+        """fsync everything appended so far"""
+        async with self._io_lock:
+            if not self._dirty or self._fd is None:
+                return
+            self._dirty = False
+            await asyncio.to_thread(os.fsync, self._fd)
+            self._stats["fsyncs"] += 1
+
+    def _snapshot_due(self) -> bool:
+        if self._snapshot_task is not None and not self._snapshot_task.done():
+            return False
+        if self.snapshot_every and self._since_snapshot >= self.snapshot_every:
+            return True
+        return bool(self.snapshot_interval) and self._seq != self._snapshot_seq and time.monotonic() - self._last_snapshot >= self.snapshot_interval
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            try:
+                await self.sync()
+                if self._snapshot_due():
+                    self._snapshot_task = asyncio.create_task(self.snapshot())
+            except Exception as e:
+                logger.error(f"Event log flush failed: {e}")
+
+    async def start(self, store: CallStore) -> None:
+        """Rebuild the store from the latest snapshot and log, then journal its changes"""
+        if not isinstance(store, InMemoryCallStore):
+            logger.warning("EVENT_LOG_DIR is set but the call store is not in memory; the event log is not used")
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        if not self._lock_directory():
+            logger.warning(f"Event log {self.directory} is in use by another process; this worker runs without it")
+            return
+        started = time.perf_counter()
+        self._recover(store)
+        self._stats["recovery_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(
+            f"Event log recovered {self._stats['recovered_calls']} calls from snapshot seq {self._snapshot_seq} "
+            f"and replayed {self._stats['replayed']} records in {self._stats['recovery_ms']:.0f} ms"
+        )
+        self._store = store
+        self._open_segment(self._seq + 1)
+        self._last_snapshot = time.monotonic()
+        store.journal = self
+        # Replay left eviction to the journal; apply the current limits (and log what they evict)
+        store.sweep()
+        if self._seq != self._snapshot_seq:
+            # Fold the replayed log into a snapshot so the next start doesn't replay it again
+            await self.snapshot()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """Write a final snapshot so the next start has no log to replay"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        if self._snapshot_task is not None:
+            await asyncio.gather(self._snapshot_task, return_exceptions=True)
+            self._snapshot_task = None
+        if self._fd is None:
+            return
+        try:
+            await self.snapshot()
+        except Exception as e:
+            logger.error(f"Final event log snapshot failed: {e}")
+        if self._store is not None:
+            self._store.journal = None
+        await asyncio.to_thread(self._close_segment, self._fd, self.directory)
+        self._fd = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        stats.update({
+            "enabled": self.enabled,
+            "directory": self.directory,
+            "seq": self._seq,
+            "snapshot_seq": self._snapshot_seq,
+            "since_snapshot": self._since_snapshot,
+            "segment": os.path.basename(self._segment) if self._segment else None,
+        })
+        return stats
+
+# Global event log instance
+event_log = EventLog(
+    settings.EVENT_LOG_DIR,
+    fsync_interval=settings.EVENT_LOG_FSYNC_INTERVAL,
+    snapshot_interval=settings.EVENT_LOG_SNAPSHOT_INTERVAL,
+    snapshot_every=settings.EVENT_LOG_SNAPSHOT_EVERY
+)
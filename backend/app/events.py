@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Set
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    """A subscriber's bounded queue of call events.
+
+    When the subscriber falls behind, the oldest queued event is dropped so a
+    slow client can never block publishers or grow memory without bound.
+    """
+
+    def __init__(self, call_id: Optional[str], maxsize: int):
+        self.call_id = call_id
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.queue.get_nowait()
+            self.dropped += 1
+            self.queue.put_nowait(event)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+class SubscriberLimitReached(Exception):
+    pass
+
+class EventBus:
+    """In-process pub/sub for call updates, keyed by call_id with a firehose topic"""
+
+    def __init__(self, queue_size: int = 100, max_subscribers: int = 1000):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._by_call: Dict[str, Set[Subscription]] = {}
+        self._firehose: Set[Subscription] = set()
+        self._stats = {"published": 0, "delivered": 0, "dropped": 0, "remote": 0}
+        # Set by a cross-process event broker to forward locally published events
+        self.forwarder: Optional[Callable[[Dict[str, Any]], None]] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._firehose) + sum(len(subs) for subs in self._by_call.values())
+
+    def subscribe(self, call_id: Optional[str] = None) -> Subscription:
+        """Subscribe to one call's events, or to every call when call_id is None"""
+        if self.subscriber_count >= self.max_subscribers:
+            raise SubscriberLimitReached(f"Subscriber limit of {self.max_subscribers} reached")
+        subscription = Subscription(call_id, self.queue_size)
+        if call_id is None:
+            self._firehose.add(subscription)
+        else:
+            self._by_call.setdefault(call_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._stats["dropped"] += subscription.dropped
+        if subscription.call_id is None:
+            self._firehose.discard(subscription)
+            return
+        subs = self._by_call.get(subscription.call_id)
+        if subs is not None:
+            subs.discard(subscription)
+            if not subs:
+                del self._by_call[subscription.call_id]
+
+    def publish(self, event: Dict[str, Any]) -> int:
+        """Fan an event out to matching subscribers without blocking"""
+        event.setdefault("published_at", int(time.time() * 1000))
+        self._stats["published"] += 1
+        if self.forwarder is not None:
+            self.forwarder(event)
+        return self._fan_out(event)
+
+    def deliver(self, event: Dict[str, Any]) -> int:
+        """Fan out an event published by another process"""
+        self._stats["remote"] += 1
+        return self._fan_out(event)
+
+    def _fan_out(self, event: Dict[str, Any]) -> int:
+        targets = list(self._firehose)
+        targets.extend(self._by_call.get(event.get("call_id"), ()))
+        for subscription in targets:
+            subscription.offer(event)
+        self._stats["delivered"] += len(targets)
+        return len(targets)
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        stats["dropped"] += sum(sub.dropped for sub in self._firehose)
+        stats["dropped"] += sum(sub.dropped for subs in self._by_call.values() for sub in subs)
+        stats["subscribers"] = self.subscriber_count
+        stats["firehose_subscribers"] = len(self._firehose)
+        return stats
+
+def call_event(event_type: str, call_id: str, call_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the small notification pushed to stream subscribers"""
+    return {
+        "event": event_type,
+        "call_id": call_id,
+        "call_status": call_data.get("call_status"),
+        "has_analysis": bool(call_data.get("call_analysis")),
+        "start_timestamp": call_data.get("start_timestamp"),
+        "end_timestamp": call_data.get("end_timestamp"),
+    }
+
+# Global event bus instance
+event_bus = EventBus(
+    queue_size=settings.EVENT_QUEUE_SIZE,
+    max_subscribers=settings.EVENT_MAX_SUBSCRIBERS
+)
@@ -0,0 +1,276 @@
+import csv
+import io
+import logging
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+from .jsonutil import dumps
+from .packing import PackedSequence
+from .retell_client import retell_client
+from .store import call_store, encode_pagination_key
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+# Columns for the flat formats (CSV, Parquet, Arrow) when no fields are given.
+# Dotted paths reach into nested objects; custom_analysis_data keys vary by
+# agent, so select them explicitly (call_analysis.custom_analysis_data.<key>).
+DEFAULT_COLUMNS = [
+    "call_id",
+    "call_status",
+    "agent_id",
+    "agent_name",
+    "direction",
+    "from_number",
+    "to_number",
+    "start_timestamp",
+    "end_timestamp",
+    "duration_ms",
+    "disconnection_reason",
+    "call_analysis.call_summary",
+    "call_analysis.user_sentiment",
+    "call_analysis.call_successful",
+    "call_analysis.in_voicemail",
+    "call_analysis.custom_analysis_data",
+    "call_cost.combined_cost",
+    "call_cost.total_duration_seconds",
+    "call_cost.product_costs",
+    "llm_token_usage.average",
+    "llm_token_usage.num_requests",
+    "latency.e2e.p50",
+    "latency.e2e.p90",
+    "latency.e2e.p99",
+    "latency.llm.p50",
+    "latency.tts.p50",
+    "recording_url",
+    "transcript",
+]
+
+# Arrow types for known numeric and boolean columns; everything else is a string
+COLUMN_TYPES = {
+    "start_timestamp": "int64",
+    "end_timestamp": "int64",
+    "duration_ms": "int64",
+    "call_analysis.call_successful": "bool",
+    "call_analysis.in_voicemail": "bool",
+    "call_cost.combined_cost": "float64",
+    "call_cost.total_duration_seconds": "float64",
+    "llm_token_usage.average": "float64",
+    "llm_token_usage.num_requests": "int64",
+}
+LATENCY_STATS = ("p50", "p90", "p95", "p99", "min", "max", "num")
+
+class ExportError(Exception):
+    """Raised for export requests that cannot be served (e.g. a missing optional dependency)"""
+
+def column_type(column: str) -> str:
+    if column in COLUMN_TYPES:
+        return COLUMN_TYPES[column]
+    parts = column.split(".")
+    if parts[0] == "latency" and len(parts) == 3 and parts[2] in LATENCY_STATS:
+        return "float64"
+    return "string"
+
+def value_at(call: Dict[str, Any], path: str) -> Any:
+    value: Any = call
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+def flat_value(value: Any) -> Any:
+    """Scalars as-is; nested objects and lists as compact JSON"""
+    if isinstance(value, (dict, list, PackedSequence)):
+        return dumps(value, default=str).decode("utf-8")
+    return value
+
+def project(call: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only the selected (possibly dotted) fields of a call record"""
+    if not fields:
+        return call
+    return {field: value_at(call, field) for field in fields}
+
+async def iter_store_calls(
+    start_after: Optional[int] = None,
+    start_before: Optional[int] = None,
+    agent_id: Optional[List[str]] = None,
+    status: Optional[List[str]] = None,
+    page_size: int = 100
+) -> AsyncIterator[Dict[str, Any]]:
+    """Calls from the call store, newest first, one page in memory at a time"""
+    pagination_key = None
+    while True:
+        page = call_store.query_calls(
+            status=status,
+            agent_id=agent_id,
+            start_after=start_after,
+            start_before=start_before,
+            limit=page_size,
+            pagination_key=pagination_key
+        )
+        for call in page:
+            yield call
+        if len(page) < page_size:
+            return
+        pagination_key = encode_pagination_key(page[-1])
+
+async def iter_upstream_calls(
+    start_after: Optional[int] = None,
+    start_before: Optional[int] = None,
+    agent_id: Optional[List[str]] = None,
+    status: Optional[List[str]] = None,
+    page_size: int = 100
+) -> AsyncIterator[Dict[str, Any]]:
+    """Calls paged from Retell's list-calls, newest first"""
+    criteria: Dict[str, Any] = {}
+    if status:
+        criteria["call_status"] = status
+    if agent_id:
+        criteria["agent_id"] = agent_id
+    if start_after is not None or start_before is not None:
+        criteria["start_timestamp"] = {}
+        if start_after is not None:
+            criteria["start_timestamp"]["lower_threshold"] = start_after
+        if start_before is not None:
+            criteria["start_timestamp"]["upper_threshold"] = start_before
+    pagination_key = None
+    while True:
+        page = await retell_client.list_calls(limit=page_size, filter_criteria=criteria, pagination_key=pagination_key)
+        for call in page:
+            yield call
+        if len(page) < page_size or not page[-1].get("call_id"):
+            return
+        pagination_key = page[-1]["call_id"]
+
+async def encode_ndjson(calls: AsyncIterator[Dict[str, Any]], fields: Optional[List[str]], chunk_size: int = 65536) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+    async for call in calls:
+        buffer += dumps(project(call, fields), default=str)
+        buffer += b"\n"
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+async def encode_csv(calls: AsyncIterator[Dict[str, Any]], columns: List[str], chunk_size: int = 65536) -> AsyncIterator[bytes]:
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    async for call in calls:
+        writer.writerow([flat_value(value_at(call, column)) for column in columns])
+        if text.tell() >= chunk_size:
+            yield text.getvalue().encode("utf-8")
+            text.seek(0)
+            text.truncate()
+    if text.tell():
+        yield text.getvalue().encode("utf-8")
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the caller"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _arrow_type(pa: Any, kind: str) -> Any:
+    return {"string": pa.string, "int64": pa.int64, "float64": pa.float64, "bool": pa.bool_}[kind]()
+
+def _arrow_column(pa: Any, column: str, values: Iterable[Any]) -> Any:
+    kind = column_type(column)
+    if kind == "string":
+        return pa.array([None if v is None else str(flat_value(v)) for v in values], type=pa.string())
+    converted = []
+    for value in values:
+        try:
+            if value is None or isinstance(value, (dict, list)):
+                converted.append(None)
+            elif kind == "bool":
+                converted.append(bool(value))
+            elif kind == "int64":
+                converted.append(int(value))
+            else:
+                converted.append(float(value))
+        except (TypeError, ValueError):
+            converted.append(None)
+    return pa.array(converted, type=_arrow_type(pa, kind))
+
+async def encode_arrow(
+    calls: AsyncIterator[Dict[str, Any]],
+    columns: List[str],
+    fmt: str = "parquet",
+    batch_size: int = 1000
+) -> AsyncIterator[bytes]:
+    """Parquet (one row group per batch) or an Arrow IPC stream, written batch by batch"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError(f"{fmt} export requires the 'pyarrow' package")
+
+    schema = pa.schema([(column, _arrow_type(pa, column_type(column))) for column in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd") if fmt == "parquet" else pa.ipc.new_stream(sink, schema)
+
+    def write(rows: List[Dict[str, Any]]) -> None:
+        arrays = [_arrow_column(pa, column, (value_at(row, column) for row in rows)) for column in columns]
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+
+    rows: List[Dict[str, Any]] = []
+    async for call in calls:
+        rows.append(call)
+        if len(rows) >= batch_size:
+            write(rows)
+            rows = []
+            data = sink.drain()
+            if data:
+                yield data
+    if rows:
+        write(rows)
+    writer.close()
+    data = sink.drain()
+    if data:
+        yield data
+
+def export_calls(fmt: str, calls: AsyncIterator[Dict[str, Any]], fields: Optional[List[str]] = None) -> AsyncIterator[bytes]:
+    """Encode a stream of call records; fields select (dotted) columns"""
+    if fmt == "ndjson":
+        return encode_ndjson(calls, fields)
+    columns = fields or DEFAULT_COLUMNS
+    if fmt == "csv":
+        return encode_csv(calls, columns)
+    if fmt in ("parquet", "arrow"):
+        return encode_arrow(calls, columns, fmt)
+    raise ExportError(f"Unknown export format '{fmt}'")
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+from .config import settings
+from .ingest import webhook_queue
+from .retell_client import retell_client
+from .store import call_store
+
+logger = logging.getLogger(__name__)
+
+class HealthMonitor:
+    """Liveness and readiness state for load balancer health checks.
+
+    A background task probes Retell every interval seconds and caches the
+    result, so readiness checks only read cached and in-process state (probe
+    result, circuit breaker, webhook queue depth, store health) and never
+    wait on the network. Retell counts as down after failure_threshold
+    consecutive failed probes, and a result older than three intervals counts
+    as unknown. With require_upstream, readiness only fails on Retell once it
+    has been down (or the circuit open) for upstream_grace seconds straight,
+    so a blip never takes instances out of rotation. The task also measures
+    how late its sleeps wake up, which is reported as event loop lag.
+    """
+
+    def __init__(
+        self,
+        interval: float = 15.0,
+        timeout: float = 3.0,
+        failure_threshold: int = 2,
+        max_queue_utilization: float = 0.8,
+        require_upstream: bool = True,
+        upstream_grace: float = 60.0
+    ):
+        self.interval = interval
+        self.timeout = timeout
+        self.failure_threshold = max(1, failure_threshold)
+        self.max_queue_utilization = max_queue_utilization
+        self.require_upstream = require_upstream
+        self.upstream_grace = upstream_grace
+        self._upstream_down_since: Optional[float] = None
+        self.started_at = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._upstream_ok: Optional[bool] = None  # None until the first probe completes
+        self._last_probe: Optional[float] = None
+        self._last_status: Optional[int] = None
+        self._last_error: Optional[str] = None
+        self._last_latency_ms: Optional[float] = None
+        self._consecutive_failures = 0
+        self._loop_lag_ms = 0.0
+        self._stats = {"probes": 0, "probe_failures": 0}
+
+    async def probe(self) -> bool:
+        """Probe Retell once and update the cached upstream state"""
+        started = time.perf_counter()
+        try:
+            status = await retell_client.probe(self.timeout)
+            self._last_status = status
+            # 429 means Retell is up and answering; auth or routing errors mean we cannot use it
+            success = status < 400 or status == 429
+            self._last_error = None if success else f"HTTP {status}"
+        except Exception as e:
+            self._last_status = None
+            self._last_error = repr(e)
+            success = False
+        self._last_latency_ms = round((time.perf_counter() - started) * 1000, 3)
+        self._last_probe = time.monotonic()
+        self._stats["probes"] += 1
+
+        if success:
+            if self._upstream_ok is False:
+                logger.info("Retell probe succeeded; upstream is healthy again")
+            self._consecutive_failures = 0
+            self._upstream_ok = True
+        else:
+            self._stats["probe_failures"] += 1
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.failure_threshold or self._upstream_ok is None:
+                if self._upstream_ok is not False:
+                    logger.warning(f"Retell probe failed {self._consecutive_failures} time(s): {self._last_error}")
+                self._upstream_ok = False
+        return success
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe()
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self._loop_lag_ms = round(max(0.0, time.monotonic() - expected) * 1000, 3)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def upstream_check(self) -> Dict[str, Any]:
+        age = time.monotonic() - self._last_probe if self._last_probe is not None else None
+        fresh = age is not None and age <= 3 * self.interval
+        circuit_open = retell_client.circuit_open
+        ok = bool(self._upstream_ok) and fresh and not circuit_open
+        now = time.monotonic()
+        if ok:
+            self._upstream_down_since = None
+        elif self._upstream_down_since is None:
+            self._upstream_down_since = now
+        down_for = now - self._upstream_down_since if self._upstream_down_since is not None else 0.0
+        return {
+            "ok": ok,
+            "required": self.require_upstream,
+            # Whether the outage has lasted long enough to fail readiness
+            "failing": not ok and down_for >= self.upstream_grace,
+            "down_s": round(down_for, 3),
+            "last_status": self._last_status,
+            "last_error": self._last_error,
+            "latency_ms": self._last_latency_ms,
+            "age_s": round(age, 3) if age is not None else None,
+            "consecutive_failures": self._consecutive_failures,
+            "circuit_open": circuit_open,
+        }
+
+    def queue_check(self) -> Dict[str, Any]:
+        utilization = webhook_queue.depth / webhook_queue.maxsize if webhook_queue.maxsize else 0.0
+        return {
+            "ok": webhook_queue.accepting and utilization < self.max_queue_utilization,
+            "accepting": webhook_queue.accepting,
+            "depth": webhook_queue.depth,
+            "utilization": round(utilization, 4),
+        }
+
+    def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """Whether this instance should receive traffic, from cached state only"""
+        checks = {
+            "upstream": self.upstream_check(),
+            "webhook_queue": self.queue_check(),
+            "store": call_store.health(),
+        }
+        ready = all(check["ok"] for name, check in checks.items() if name != "upstream") and not (
+            self.require_upstream and checks["upstream"]["failing"]
+        )
+        return ready, {"status": "ready" if ready else "not_ready", "checks": checks}
+
+    def liveness(self) -> Dict[str, Any]:
+        return {
+            "status": "alive",
+            "uptime_s": round(time.monotonic() - self.started_at, 3),
+            "loop_lag_ms": self._loop_lag_ms,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        stats["interval"] = self.interval
+        stats["running"] = self._task is not None
+        stats["upstream"] = self.upstream_check()
+        return stats
+
+# Global health monitor instance
+health_monitor = HealthMonitor(
+    interval=settings.HEALTH_PROBE_INTERVAL,
+    timeout=settings.HEALTH_PROBE_TIMEOUT,
+    failure_threshold=settings.HEALTH_PROBE_FAILURE_THRESHOLD,
+    max_queue_utilization=settings.HEALTH_MAX_QUEUE_UTILIZATION,
+    require_upstream=settings.HEALTH_REQUIRE_UPSTREAM,
+    upstream_grace=settings.HEALTH_UPSTREAM_GRACE_PERIOD
+)
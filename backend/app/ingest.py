@@ -0,0 +1,317 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from pydantic import ValidationError
+from . import analytics
+from .cache import call_cache
+from .call_state import EVENT_RANK, EventDeduplicator, body_digest, fill_missing, is_stale_event, is_status_regression
+from .config import settings
+from .events import event_bus, call_event
+from .jsonutil import JSON_BACKEND, loads
+from .metrics import webhook_events, webhook_lag, webhook_processing
+from .models.schemas import WebhookPayload
+from .recordings import recording_cache
+from .search import transcript_index
+from .store import call_store
+
+logger = logging.getLogger(__name__)
+
+class InvalidWebhookPayload(ValueError):
+    pass
+
+def _event_fields(event_type: str, call_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Store fields carried by each webhook event type"""
+    if event_type == "call_started":
+        return {
+            "call_status": "ongoing",
+            "started_at": call_data.get("start_timestamp"),
+            "start_timestamp": call_data.get("start_timestamp"),
+            "agent_id": call_data.get("agent_id"),
+            "direction": call_data.get("direction"),
+            "transcript": call_data.get("transcript", ""),
+            "agent_name": call_data.get("agent_name"),
+            "from_number": call_data.get("from_number"),
+            "to_number": call_data.get("to_number")
+        }
+
+    if event_type == "call_ended":
+        # Carry agent and direction along for calls whose call_started was missed
+        identity = {key: call_data[key] for key in ("agent_id", "direction") if call_data.get(key)}
+        return {
+            **identity,
+            "call_status": "ended",
+            "ended_at": call_data.get("end_timestamp"),
+            "start_timestamp": call_data.get("start_timestamp"),
+            "end_timestamp": call_data.get("end_timestamp"),
+            "transcript": call_data.get("transcript", ""),
+            "duration_ms": call_data.get("duration_ms"),
+            "disconnection_reason": call_data.get("disconnection_reason"),
+            "recording_url": call_data.get("recording_url"),
+            "recording_multi_channel_url": call_data.get("recording_multi_channel_url"),
+            "scrubbed_recording_url": call_data.get("scrubbed_recording_url"),
+            "scrubbed_recording_multi_channel_url": call_data.get("scrubbed_recording_multi_channel_url"),
+            "public_log_url": call_data.get("public_log_url"),
+            "knowledge_base_retrieved_contents_url": call_data.get("knowledge_base_retrieved_contents_url"),
+            "latency": call_data.get("latency"),
+            "call_cost": call_data.get("call_cost"),
+            "llm_token_usage": call_data.get("llm_token_usage"),
+            "transcript_object": call_data.get("transcript_object"),
+            "transcript_with_tool_calls": call_data.get("transcript_with_tool_calls"),
+            "retell_llm_dynamic_variables": call_data.get("retell_llm_dynamic_variables"),
+            "collected_dynamic_variables": call_data.get("collected_dynamic_variables")
+        }
+
+    if event_type == "call_analyzed":
+        return {
+            "call_analysis": call_data.get("call_analysis", {}),
+            "transcript": call_data.get("transcript", ""),
+            "transcript_object": call_data.get("transcript_object"),
+            "transcript_with_tool_calls": call_data.get("transcript_with_tool_calls"),
+            # Update any additional data that might come with analysis
+            "latency": call_data.get("latency"),
+            "call_cost": call_data.get("call_cost"),
+            "llm_token_usage": call_data.get("llm_token_usage")
+        }
+
+    return {}
+
+def parse_webhook(body: bytes) -> Dict[str, Any]:
+    """Decode a webhook body straight from bytes and check it has the WebhookPayload shape"""
+    payload = loads(body)
+    try:
+        WebhookPayload.model_validate(payload)
+    except ValidationError as e:
+        raise InvalidWebhookPayload(f"Malformed webhook payload: {e.error_count()} validation error(s)")
+    return payload
+
+def process_webhook_event(payload: Dict[str, Any], verified: bool = False) -> bool:
+    """Apply one parsed webhook event to the store, cache and event streams.
+
+    Returns False when the event is older than what the call has already
+    seen (e.g. a late call_started after call_ended); such events only fill
+    in fields the call is still missing and never move its status backwards.
+    Recordings are only prefetched for events whose signature was verified.
+    """
+    event_type = payload.get("event")
+    call_data = payload.get("call") or {}
+    call_id = call_data.get("call_id")
+
+    if not call_id:
+        raise InvalidWebhookPayload("Missing call_id in webhook payload")
+
+    current = call_store.get_call(call_id)
+    fields = _event_fields(event_type, call_data)
+    stale = is_stale_event(current, event_type) or (
+        current is not None
+        and "call_status" in fields
+        and is_status_regression(current.get("call_status"), fields["call_status"])
+    )
+    if stale:
+        missing = fill_missing(current, fields)
+        missing.pop("call_status", None)
+        # Only a status that would step backwards is dropped: a call_ended
+        # arriving after call_analyzed still ends the call
+        status = fields.get("call_status")
+        if status and status != current.get("call_status") and not is_status_regression(current.get("call_status"), status):
+            missing["call_status"] = status
+        if missing:
+            call_store.update_call(call_id, missing)
+            stored = call_store.get_call(call_id)
+            analytics.observe_call(stored)
+            transcript_index.index_call(stored)
+            if "call_status" in missing:
+                event_bus.publish(call_event(event_type, call_id, stored))
+        logger.info(f"Ignoring out-of-order {event_type} for call {call_id}")
+        return False
+
+    fields["last_event"] = event_type
+    fields["event_rank"] = EVENT_RANK.get(event_type or "", 0)
+    fields["last_webhook_received"] = payload.get("timestamp") or int(time.time() * 1000)
+    call_store.update_call(call_id, fields)
+    stored = call_store.get_call(call_id)
+    analytics.observe_call(stored)
+    transcript_index.index_call(stored)
+
+    # The webhook is the freshest view of the call; let status polls use it
+    call_cache.prime(call_id, call_data)
+
+    # Push the update to any open event streams
+    event_bus.publish(call_event(event_type, call_id, stored or call_data))
+
+    # Download the recording now, so the first playback is served locally
+    if verified and event_type == "call_ended" and settings.RECORDING_CACHE_ENABLED and settings.RECORDING_PREFETCH:
+        recording_cache.prefetch(call_id, stored or call_data)
+    return True
+
+def apply_remote_event(event: Dict[str, Any]) -> None:
+    """Bring per-process state up to date with a call another worker updated"""
+    call_id = event.get("call_id")
+    if not call_id:
+        return
+    stored = call_store.get_call(call_id)
+    if stored is None:
+        return
+    # The other worker just refreshed this call; no need to ask Retell again
+    call_cache.prime(call_id, stored)
+    analytics.observe_call(stored)
+    transcript_index.index_call(stored)
+
+@dataclass
+class QueuedWebhook:
+    body: bytes
+    received_at: float
+    verified: bool = False
+
+class WebhookQueue:
+    """Bounded queue between the webhook endpoint and a pool of workers.
+
+    The endpoint only verifies and enqueues the raw body; workers parse and
+    apply events in batches and flush the store once per batch. On shutdown
+    the queue stops accepting new events and drains what is already queued.
+    """
+
+    def __init__(self, maxsize: int = 10000, workers: int = 4, batch_size: int = 50, dedup_size: int = 100000):
+        self.maxsize = maxsize
+        self.worker_count = workers
+        self.batch_size = batch_size
+        self._queue: Optional["asyncio.Queue[QueuedWebhook]"] = None
+        self._workers: List[asyncio.Task] = []
+        self._accepting = False
+        self._dedup = EventDeduplicator(dedup_size)
+        self._stats = {
+            "duplicates": 0,
+            "stale": 0,
+            "enqueued": 0,
+            "rejected": 0,
+            "processed": 0,
+            "failed": 0,
+            "batches": 0,
+            "max_depth": 0,
+            "last_lag_ms": 0.0,
+            "max_lag_ms": 0.0,
+        }
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def accepting(self) -> bool:
+        return self._accepting
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._accepting = True
+        self._workers = [
+            asyncio.create_task(self._worker(index)) for index in range(self.worker_count)
+        ]
+        logger.info(f"Started {self.worker_count} webhook workers (queue size {self.maxsize})")
+
+    def enqueue(self, body: bytes, verified: bool = False) -> bool:
+        """Queue a raw webhook body (verified: its signature checked out); False when the queue is full or draining"""
+        if not self._accepting or self._queue is None:
+            self._stats["rejected"] += 1
+            return False
+        try:
+            self._queue.put_nowait(QueuedWebhook(body=body, received_at=time.monotonic(), verified=verified))
+        except asyncio.QueueFull:
+            self._stats["rejected"] += 1
+            return False
+        self._stats["enqueued"] += 1
+        self._stats["max_depth"] = max(self._stats["max_depth"], self._queue.qsize())
+        return True
+
+    def _handle(self, item: QueuedWebhook) -> None:
+        # Redeliveries of an identical body are dropped before parsing
+        keys = [body_digest(item.body)]
+        started = time.perf_counter()
+        event = "unknown"
+        outcome = "duplicate"
+        try:
+            if self._dedup.check_and_add(keys[0]):
+                self._stats["duplicates"] += 1
+                return
+            payload = parse_webhook(item.body)
+            # Bound label cardinality to the event types we know about
+            event = payload.get("event") if payload.get("event") in EVENT_RANK else "other"
+            timestamp = payload.get("timestamp")
+            if timestamp is not None:
+                keys.append(((payload.get("call") or {}).get("call_id"), payload.get("event"), timestamp))
+                if self._dedup.check_and_add(keys[1]):
+                    self._stats["duplicates"] += 1
+                    return
+            if process_webhook_event(payload, verified=item.verified):
+                self._stats["processed"] += 1
+                outcome = "processed"
+            else:
+                self._stats["stale"] += 1
+                outcome = "stale"
+        except Exception as e:
+            # Let a retry of a failed event through the dedup index
+            for key in keys:
+                self._dedup.forget(key)
+            self._stats["failed"] += 1
+            outcome = "failed"
+            logger.error(f"Webhook processing failed: {e}")
+        finally:
+            webhook_events.inc(event=event, outcome=outcome)
+            webhook_processing.observe(time.perf_counter() - started, event=event)
+            webhook_lag.observe(time.monotonic() - item.received_at)
+            lag_ms = (time.monotonic() - item.received_at) * 1000
+            self._stats["last_lag_ms"] = round(lag_ms, 3)
+            self._stats["max_lag_ms"] = round(max(self._stats["max_lag_ms"], lag_ms), 3)
+
+    async def _worker(self, index: int) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                for item in batch:
+                    self._handle(item)
+                call_store.flush()
+                self._stats["batches"] += 1
+            except Exception as e:
+                logger.error(f"Webhook worker {index} failed to flush batch: {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def drain(self, timeout: float = 10.0) -> None:
+        """Stop accepting events, finish queued ones, then stop the workers"""
+        self._accepting = False
+        if self._queue is not None and self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Webhook queue drain timed out with {self.depth} events unprocessed")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        stats["depth"] = self.depth
+        stats["capacity"] = self.maxsize
+        stats["workers"] = len(self._workers)
+        stats["accepting"] = self._accepting
+        stats["dedup_entries"] = len(self._dedup)
+        stats["json_backend"] = JSON_BACKEND
+        return stats
+
+# Global ingestion queue instance
+webhook_queue = WebhookQueue(
+    maxsize=settings.WEBHOOK_QUEUE_SIZE,
+    workers=settings.WEBHOOK_WORKERS,
+    batch_size=settings.WEBHOOK_BATCH_SIZE,
+    dedup_size=settings.WEBHOOK_DEDUP_SIZE
+)
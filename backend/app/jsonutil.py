@@ -0,0 +1,45 @@
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional, Union
+from fastapi.responses import JSONResponse
+from .packing import PackedSequence
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library is used instead
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, PackedSequence):
+        return value.to_list()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _with_packed(default: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def encode(value: Any) -> Any:
+        if isinstance(value, PackedSequence):
+            return value.to_list()
+        return default(value)
+    return encode
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON straight from request bytes (or a str)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(value: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize to compact UTF-8 JSON; datetimes become ISO 8601 strings and packed arrays lists"""
+    if default is not None:
+        default = _with_packed(default)
+    if orjson is not None:
+        return orjson.dumps(value, default=default or _default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=default or _default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+else:
+    DefaultJSONResponse = JSONResponse
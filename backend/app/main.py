@@ -1,11 +1,32 @@
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .routes import calls, webhooks
+from .routes import analytics, calls, webhooks, campaigns, search, export
+from .analytics import cost_rollups, latency_analytics, rebuild as rebuild_analytics
+from .retell_client import retell_client
+from .cache import call_cache
+from .events import event_bus
+from .store import call_store
+from .search import transcript_index
+from .ingest import apply_remote_event, webhook_queue
+from .coordination import event_broker
+from .sync import call_sync
+from .campaigns import campaign_manager
+from .health import health_monitor
+from .recordings import recording_cache
+from .eventlog import event_log
+from .config import settings
+from .jsonutil import DefaultJSONResponse
+from .metrics import MetricsMiddleware, registry
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Retell POC API",
     description="FastAPI backend for Retell AI phone call integration",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DefaultJSONResponse
 )
 
 # Configure CORS for both local development and production
@@ -20,11 +41,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Pagination-Key", "ETag", "Server-Timing", "Content-Disposition", "Content-Range", "Accept-Ranges"],
 )
+# Outermost, so the timings cover CORS handling too
+app.add_middleware(MetricsMiddleware)
+
+@app.on_event("startup")
+async def startup():
+    await retell_client.start()
+    await call_store.start()
+    if settings.EVENT_LOG_DIR:
+        await event_log.start(call_store)
+    rebuild_analytics(call_store.iter_calls())
+    if settings.SEARCH_INDEX_ENABLED:
+        transcript_index.rebuild(call_store.iter_resident_calls())
+        call_store.add_removal_listener(transcript_index.remove_call)
+    if settings.COORDINATION_BACKEND == "sqlite" and settings.CALL_STORE_BACKEND != "sqlite":
+        logger.warning("COORDINATION_BACKEND=sqlite without CALL_STORE_BACKEND=sqlite: workers will not share call data")
+    event_broker.add_listener(apply_remote_event)
+    await event_broker.start()
+    if settings.RECORDING_CACHE_ENABLED:
+        await recording_cache.start()
+    await webhook_queue.start()
+    await health_monitor.start()
+    if settings.CALL_SYNC_ENABLED:
+        await call_sync.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await health_monitor.stop()
+    await call_sync.stop()
+    await campaign_manager.shutdown()
+    # Drain queued webhooks before the store they write to is closed
+    await webhook_queue.drain(settings.WEBHOOK_DRAIN_TIMEOUT)
+    await event_broker.stop()
+    await recording_cache.close()
+    await retell_client.close()
+    await event_log.close()
+    await call_store.close()
 
 # Include routers
 app.include_router(calls.router)
 app.include_router(webhooks.router)
+app.include_router(campaigns.router)
+app.include_router(analytics.router)
+app.include_router(search.router)
+app.include_router(export.router)
 
 @app.get("/")
 async def root():
@@ -32,4 +94,96 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/health/live")
+async def liveness():
+    """The process is up and its event loop is running"""
+    return health_monitor.liveness()
+
+@app.get("/health/ready")
+async def readiness():
+    """Whether to route traffic here: Retell reachable, webhook queue and store not saturated"""
+    ready, body = health_monitor.readiness()
+    return DefaultJSONResponse(body, status_code=200 if ready else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of request, upstream, webhook, store and cache metrics"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+def _labelled(stats: dict, keys: tuple) -> dict:
+    return {(key,): stats.get(key, 0) for key in keys}
+
+# Gauges read from the existing stats when /metrics is scraped
+registry.callback("call_store_entries", "Calls held by the call store", lambda: call_store.stats().get("entries", 0))
+registry.callback("call_store_bytes", "Approximate size of the in-memory call store", lambda: call_store.stats().get("bytes"))
+registry.callback(
+    "call_cache_lookups_total", "Call cache lookups by result",
+    lambda: _labelled(call_cache.stats(), ("hits", "stale_hits", "misses", "coalesced")), ("result",), kind="counter"
+)
+registry.callback("call_cache_hit_ratio", "Fraction of call cache lookups served from cache", lambda: call_cache.stats()["hit_ratio"])
+registry.callback("call_cache_entries", "Calls held by the upstream call cache", lambda: call_cache.stats()["entries"])
+registry.callback("webhook_queue_depth", "Webhook events waiting to be processed", lambda: webhook_queue.depth)
+registry.callback(
+    "retell_circuit_open", "1 while the Retell circuit breaker is failing calls fast",
+    lambda: int(retell_client.circuit_open)
+)
+registry.callback(
+    "retell_connections_total", "Retell API requests by connection reuse",
+    lambda: _labelled(retell_client.pool_stats(), ("new_connections", "reused_connections")), ("kind",), kind="counter"
+)
+registry.callback("ready", "1 while the readiness check passes", lambda: int(health_monitor.readiness()[0]))
+registry.callback(
+    "recording_cache_lookups_total", "Recording cache lookups by result",
+    lambda: _labelled(recording_cache.stats(), ("hits", "misses")), ("result",), kind="counter"
+)
+registry.callback("recording_cache_bytes", "Size of the on-disk recording cache", lambda: recording_cache.stats()["bytes"])
+registry.callback("event_subscribers", "Open call event streams", lambda: event_bus.stats().get("subscribers", 0))
+
+@app.get("/stats/retell-pool")
+async def retell_pool_stats():
+    return retell_client.pool_stats()
+
+@app.get("/stats/retell-resilience")
+async def retell_resilience_stats():
+    return retell_client.resilience_stats()
+
+@app.get("/stats/call-cache")
+async def call_cache_stats():
+    return call_cache.stats()
+
+@app.get("/stats/events")
+async def event_bus_stats():
+    stats = event_bus.stats()
+    stats["broker"] = event_broker.stats()
+    return stats
+
+@app.get("/stats/call-store")
+async def call_store_stats():
+    return call_store.stats()
+
+@app.get("/stats/event-log")
+async def event_log_stats():
+    return event_log.stats()
+
+@app.get("/stats/analytics")
+async def analytics_stats():
+    return {
+        "latency": latency_analytics.stats(),
+        "costs": cost_rollups.stats()
+    }
+
+@app.get("/stats/search")
+async def search_stats():
+    return transcript_index.stats()
+
+@app.get("/stats/recordings")
+async def recording_cache_stats():
+    return recording_cache.stats()
+
+@app.get("/stats/sync")
+async def call_sync_stats():
+    return call_sync.stats()
@@ -0,0 +1,222 @@
+import contextvars
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from .config import settings
+
+LabelValues = Tuple[str, ...]
+Sample = Union[float, Dict[LabelValues, float]]
+
+# Seconds; covers cache hits (sub-millisecond) up to slow upstream list calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return lines
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram, as Prometheus expects"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        # Per-bucket counts; made cumulative when rendered
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        counts[index] += 1
+        self._sums[key] += value
+
+    def samples(self) -> Iterable[str]:
+        for key, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(self._sums[key])}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+class CallbackMetric(Metric):
+    """Gauge (or counter) read from existing stats when the metrics are scraped"""
+
+    def __init__(self, name: str, help: str, callback: Callable[[], Sample], labelnames: Sequence[str] = (), kind: str = "gauge"):
+        super().__init__(name, help, labelnames)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self) -> Iterable[str]:
+        value = self.callback()
+        if isinstance(value, dict):
+            for key, sample in sorted(value.items()):
+                yield f"{self.name}{_labels(self.labelnames, key)} {_number(sample)}"
+        elif value is not None:
+            yield f"{self.name} {_number(value)}"
+
+class MetricsRegistry:
+    """Collects metrics and renders them in the Prometheus text format"""
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Any:
+        metric.name = self.prefix + metric.name
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name: str, help: str, callback: Callable[[], Sample], labelnames: Sequence[str] = (), kind: str = "gauge") -> CallbackMetric:
+        return self._register(CallbackMetric(name, help, callback, labelnames, kind))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+class RequestTiming:
+    """Time spent per component while serving one request, for Server-Timing"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.components: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.components.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    def header(self) -> str:
+        total = time.perf_counter() - self.started
+        parts = []
+        for name, (seconds, count) in self.components.items():
+            parts.append(f'{name};dur={seconds * 1000:.1f};desc="{count} request{"s" if count != 1 else ""}"')
+        parts.append(f"app;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+current_timing: "contextvars.ContextVar[Optional[RequestTiming]]" = contextvars.ContextVar("current_timing", default=None)
+
+def record_timing(name: str, seconds: float) -> None:
+    """Attribute time to a component of the request being served, if any"""
+    timing = current_timing.get()
+    if timing is not None:
+        timing.add(name, seconds)
+
+# Global registry and the metrics recorded directly by the app
+registry = MetricsRegistry(prefix="retell_poc_")
+
+http_requests = registry.counter("http_requests_total", "HTTP requests served", ("method", "route", "status"))
+http_request_duration = registry.histogram("http_request_duration_seconds", "Time to serve HTTP requests", ("method", "route"))
+upstream_requests = registry.counter("retell_requests_total", "Requests to the Retell API by outcome", ("operation", "outcome"))
+upstream_request_duration = registry.histogram("retell_request_duration_seconds", "Retell API request time including retries", ("operation",))
+webhook_events = registry.counter("webhook_events_total", "Webhook events handled by the ingestion workers", ("event", "outcome"))
+webhook_processing = registry.histogram("webhook_processing_seconds", "Time to apply a webhook event", ("event",))
+webhook_lag = registry.histogram("webhook_queue_lag_seconds", "Time from webhook receipt to processing")
+
+class MetricsMiddleware:
+    """Times every HTTP request per route template and adds a Server-Timing header.
+
+    Routes are labelled by their template (/api/calls/{call_id}) rather than
+    the raw path, so label cardinality stays bounded. Server-Timing carries
+    the time spent waiting on Retell alongside the total, measured up to the
+    point the response headers are sent.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timing.header().encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_timing.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            http_requests.inc(method=method, route=route_path, status=status)
+            http_request_duration.observe(time.perf_counter() - timing.started, method=method, route=route_path)
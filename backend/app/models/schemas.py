@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any, List, Union
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal, Union
 from datetime import datetime
+from ..config import settings
 
 class CreateCallRequest(BaseModel):
     to_number: str
@@ -89,6 +90,52 @@ class CallStatus(BaseModel):
     retell_llm_dynamic_variables: Optional[Dict[str, Any]] = None
     collected_dynamic_variables: Optional[Dict[str, Any]] = None
 
+class BatchCallRequest(BaseModel):
+    call_ids: List[str]
+    view: Literal["full", "summary"] = "summary"
+    fields: Optional[List[str]] = None  # CallStatus fields (plus has_analysis); overrides view
+
+class BatchCallError(BaseModel):
+    call_id: str
+    status_code: int
+    detail: str
+
+class BatchCallResponse(BaseModel):
+    calls: List[Dict[str, Any]]  # In request order, only calls that were found
+    errors: List[BatchCallError]
+    from_store: int  # Final calls answered from the call store without consulting Retell
+    refreshed: int  # Calls looked up through the call cache (a Retell fetch on a miss)
+
 class WebhookPayload(BaseModel):
     event: str
-    call: Dict[str, Any]
\ No newline at end of file
+    call: Dict[str, Any]
+
+class CreateCampaignRequest(BaseModel):
+    calls: List[CreateCallRequest]
+    concurrency: Optional[int] = Field(None, ge=1, le=settings.CAMPAIGN_MAX_CONCURRENCY)  # Defaults to CAMPAIGN_DEFAULT_CONCURRENCY
+    rate_per_second: Optional[float] = Field(None, gt=0, le=settings.CAMPAIGN_MAX_RATE)  # Defaults to CAMPAIGN_DEFAULT_RATE
+
+class CampaignItemResult(BaseModel):
+    index: int
+    to_number: str
+    status: str
+    call_id: Optional[str] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+class CampaignProgress(BaseModel):
+    campaign_id: str
+    status: str
+    total: int
+    pending: int
+    in_progress: int
+    succeeded: int
+    failed: int
+    cancelled: int
+    retries: int
+    concurrency: int
+    rate_per_second: float
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    items: Optional[List[CampaignItemResult]] = None
@@ -0,0 +1,268 @@
+from array import array
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Call fields whose utterances carry word-level timings
+TRANSCRIPT_FIELDS = ("transcript_object", "transcript_with_tool_calls")
+
+class PackedSequence(Sequence):
+    """Read-only list stand-in backed by typed arrays; items are built on access"""
+
+    __slots__ = ()
+
+    @property
+    def nbytes(self) -> int:
+        raise NotImplementedError
+
+    def to_list(self) -> List[Any]:
+        return list(self)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (list, tuple, PackedSequence)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_list()!r})"
+
+class PackedSeries(PackedSequence):
+    """Numeric samples (e.g. per-turn latencies) as a float64 array; ints come back as ints"""
+
+    __slots__ = ("_values", "_integral")
+
+    def __init__(self, values: List[Any]):
+        self._values = array("d", values)
+        self._integral = all(type(v) is int for v in values)
+
+    def _decode(self, values: array) -> List[Any]:
+        return list(map(int, values)) if self._integral else values.tolist()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return self._decode(self._values[index])
+        return self._decode(array("d", [self._values[index]]))[0]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.to_list())
+
+    def to_list(self) -> List[Any]:
+        return self._decode(self._values)
+
+    @property
+    def nbytes(self) -> int:
+        return self._values.itemsize * len(self._values)
+
+class WordTable:
+    """Words of one call's transcripts: a single text buffer with offsets, plus float64 start/end times.
+
+    Built once per transcript update and read-only afterwards; utterances
+    refer to ranges of it through WordSlice.
+    """
+
+    __slots__ = ("text", "offsets", "starts", "ends", "_parts")
+
+    def __init__(self):
+        self.text = ""
+        self.offsets = array("I", [0])
+        self.starts = array("d")
+        self.ends = array("d")
+        self._parts: List[str] = []
+
+    def append(self, words: Any) -> Optional[Tuple[int, int]]:
+        """Add an utterance's words and return their (begin, end) index range, or None if they don't fit"""
+        if not isinstance(words, list) or not words:
+            return None
+        try:
+            texts = [word["word"] for word in words]
+            starts = array("d", [word["start"] for word in words])
+            ends = array("d", [word["end"] for word in words])
+        except (KeyError, TypeError):
+            return None
+        # Only {"word", "start", "end"} with string words packs losslessly
+        if not all(type(text) is str for text in texts) or not all(len(word) == 3 for word in words):
+            return None
+        begin = len(self.starts)
+        position = self.offsets[-1]
+        for text in texts:
+            position += len(text)
+            self.offsets.append(position)
+        self._parts.extend(texts)
+        self.starts.extend(starts)
+        self.ends.extend(ends)
+        return begin, len(self.starts)
+
+    def freeze(self) -> None:
+        self.text = "".join(self._parts)
+        self._parts = []
+
+    def words(self, begin: int, end: int) -> List[Dict[str, Any]]:
+        """Word dicts for the index range [begin, end)"""
+        text = self.text
+        offsets = self.offsets[begin:end + 1]
+        return [
+            {"word": text[offsets[i]:offsets[i + 1]], "start": start, "end": stop}
+            for i, start, stop in zip(range(end - begin), self.starts[begin:end].tolist(), self.ends[begin:end].tolist())
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.text) + sum(a.itemsize * len(a) for a in (self.offsets, self.starts, self.ends))
+
+class WordSlice(PackedSequence):
+    """The `words` list of one utterance, as a range of a WordTable"""
+
+    __slots__ = ("_table", "_begin", "_end")
+
+    def __init__(self, table: WordTable, begin: int, end: int):
+        self._table = table
+        self._begin = begin
+        self._end = end
+
+    def __len__(self) -> int:
+        return self._end - self._begin
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self.to_list()[index]
+            return self._table.words(self._begin + start, self._begin + max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("word index out of range")
+        return self._table.words(self._begin + index, self._begin + index + 1)[0]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.to_list())
+
+    def to_list(self, decoded: Optional[Dict[int, List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+        """Word dicts; decoded memoizes whole tables (by id) across the slices of one call"""
+        if decoded is None:
+            return self._table.words(self._begin, self._end)
+        words = decoded.get(id(self._table))
+        if words is None:
+            words = decoded[id(self._table)] = self._table.words(0, len(self._table.starts))
+        return words[self._begin:self._end]
+
+    @property
+    def nbytes(self) -> int:
+        # The table is shared by the call's utterances; each slice counts its own words
+        table = self._table
+        count = len(self)
+        return count * 20 + (table.offsets[self._end] - table.offsets[self._begin])
+
+def _pack_transcripts(data: Dict[str, Any], packed: Dict[str, Any]) -> None:
+    table = WordTable()
+    # transcript_with_tool_calls usually repeats transcript_object's utterances; share them
+    seen: Dict[Tuple[Any, Any, int], Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
+    def pack_utterance(item: Any) -> Any:
+        if not isinstance(item, dict) or not isinstance(item.get("words"), list):
+            return item
+        key = (item.get("role"), item.get("content"), len(item["words"]))
+        previous = seen.get(key)
+        if previous is not None and previous[0] == item:
+            return previous[1]
+        span = table.append(item["words"])
+        if span is None:
+            return item
+        utterance = dict(item)
+        utterance["words"] = WordSlice(table, *span)
+        seen[key] = (item, utterance)
+        return utterance
+
+    for field in TRANSCRIPT_FIELDS:
+        items = data.get(field)
+        if isinstance(items, list):
+            packed[field] = [pack_utterance(item) for item in items]
+    table.freeze()
+
+def _pack_metric(metric: Any) -> Any:
+    if not isinstance(metric, dict):
+        return metric
+    values = metric.get("values")
+    if not isinstance(values, list) or not values:
+        return metric
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return metric
+    # float64 holds integers exactly only up to 2**53
+    if any(type(v) is int and abs(v) > 1 << 53 for v in values):
+        return metric
+    return {**metric, "values": PackedSeries(values)}
+
+def pack_call(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a call (or call update) with word timings and latency samples packed into arrays.
+
+    Only the containers are replaced; utterances and metrics stay dicts, so
+    readers that iterate them keep working. Anything that doesn't have the
+    expected shape is left as it is.
+    """
+    if not any(field in data for field in TRANSCRIPT_FIELDS) and not isinstance(data.get("latency"), dict):
+        return data
+    packed = dict(data)
+    _pack_transcripts(data, packed)
+    latency = data.get("latency")
+    if isinstance(latency, dict):
+        packed["latency"] = {component: _pack_metric(metric) for component, metric in latency.items()}
+    return packed
+
+def unpack(value: Any, _tables: Optional[Dict[int, List[Dict[str, Any]]]] = None) -> Any:
+    """Plain lists and dicts in place of packed sequences, for code that needs real JSON types.
+
+    Each word table is decoded in one pass and sliced per utterance, which is
+    several times faster than decoding utterance by utterance.
+    """
+    if _tables is None:
+        _tables = {}
+    # Exact type checks; isinstance against the Sequence ABC is slow on every leaf
+    kind = type(value)
+    if kind is dict:
+        return {key: unpack(item, _tables) for key, item in value.items()}
+    if kind is list:
+        return [unpack(item, _tables) for item in value]
+    if kind is WordSlice:
+        return value.to_list(_tables)
+    if kind is PackedSeries:
+        return value.to_list()
+    return value
+
+def without_packed(call: Dict[str, Any]) -> Dict[str, Any]:
+    """Shallow copy of a call record with packed sequences emptied, for sizing the rest of it"""
+    if not any(field in call for field in TRANSCRIPT_FIELDS) and not isinstance(call.get("latency"), dict):
+        return call
+    view = dict(call)
+    for field in TRANSCRIPT_FIELDS:
+        items = call.get(field)
+        if isinstance(items, list):
+            view[field] = [
+                {**item, "words": []} if isinstance(item, dict) and isinstance(item.get("words"), PackedSequence) else item
+                for item in items
+            ]
+    latency = call.get("latency")
+    if isinstance(latency, dict):
+        view["latency"] = {
+            component: {**metric, "values": []} if isinstance(metric, dict) and isinstance(metric.get("values"), PackedSequence) else metric
+            for component, metric in latency.items()
+        }
+    return view
+
+def packed_nbytes(call: Dict[str, Any]) -> int:
+    """Bytes held in packed arrays by a call record"""
+    total = 0
+    counted = set()
+    for field in TRANSCRIPT_FIELDS:
+        for item in call.get(field) or ():
+            words = item.get("words") if isinstance(item, dict) else None
+            if isinstance(words, PackedSequence) and id(words) not in counted:
+                counted.add(id(words))
+                total += words.nbytes
+    latency = call.get("latency")
+    if isinstance(latency, dict):
+        for metric in latency.values():
+            if isinstance(metric, dict) and isinstance(metric.get("values"), PackedSequence):
+                total += metric["values"].nbytes
+    return total
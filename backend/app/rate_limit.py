@@ -0,0 +1,42 @@
+import asyncio
+import time
+from typing import Optional
+
+class TokenBucket:
+    """Async token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; each
+    acquire() takes one token, waiting until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Take a token, returning how long the caller waited (seconds)"""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                delay = (1 - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self._tokens -= 1
+        return waited
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
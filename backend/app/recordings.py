@@ -0,0 +1,407 @@
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate
+from typing import Any, Callable, Dict, Mapping, Optional, Set, Tuple
+from urllib.parse import urlparse
+import anyio
+import httpx
+from starlette.responses import Response
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Recording variants of a call; each is served from the call's "<variant>_url" field
+VARIANTS = ("recording", "recording_multi_channel", "scrubbed_recording", "scrubbed_recording_multi_channel")
+
+# Redirects followed per download; each hop is checked against the allowed hosts
+MAX_REDIRECTS = 5
+
+# Extensions recordings are stored under, so a lookup can stat each candidate
+# name rather than list the directory
+EXTENSIONS = (".wav", ".mp3", ".ogg", ".opus", ".m4a", ".webm", ".flac", ".bin")
+
+class RecordingTooLarge(Exception):
+    """The recording is bigger than the cache accepts for a single file"""
+
+class RecordingNotAllowed(Exception):
+    """The recording URL (or a redirect) points outside the allowed recording hosts"""
+
+@dataclass
+class CachedRecording:
+    path: str
+    size: int
+    media_type: str
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.hostname or ''}"
+
+def _media_type(name: str) -> str:
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+class RecordingCache:
+    """Size-bounded on-disk LRU cache of call recordings.
+
+    Recordings never change once a call has ended, so a file is downloaded
+    once (concurrent requests for the same recording share the download) and
+    served locally from then on. Files are written under a temporary name and
+    renamed into place, so readers never see a partial file; the least
+    recently served files are deleted once the directory exceeds max_bytes.
+    File access times record use, so the LRU order survives restarts;
+    modification times (and so ETags) stay those of the download.
+
+    Only https URLs on allowed_hosts are downloaded, and redirects are
+    followed by hand so every hop is checked the same way.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 1024 * 1024 * 1024,
+        max_file_bytes: int = 200 * 1024 * 1024,
+        timeout: float = 60.0,
+        prefetch_concurrency: int = 4,
+        allowed_hosts: Tuple[str, ...] = (),
+        allow_http: bool = False
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.timeout = timeout
+        self.allowed_hosts = tuple(host.strip().lower() for host in allowed_hosts if host.strip())
+        self.allow_http = allow_http
+        self._entries: "OrderedDict[str, CachedRecording]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._prefetches: Set[asyncio.Task] = set()
+        self._prefetch_slots = asyncio.Semaphore(max(1, prefetch_concurrency))
+        self._client: Optional[httpx.AsyncClient] = None
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "downloads": 0,
+            "download_errors": 0,
+            "downloaded_bytes": 0,
+            "evictions": 0,
+            "prefetches": 0,
+        }
+
+    @staticmethod
+    def key(call_id: str, variant: str) -> str:
+        """File name stem for a recording; hashed so call IDs never reach the filesystem"""
+        return hashlib.blake2b(f"{call_id}/{variant}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def _add(self, key: str, entry: CachedRecording) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.size
+        self._entries[key] = entry
+        self._bytes += entry.size
+
+    def _load_index(self) -> None:
+        """Index files left by an earlier run (or another worker), oldest use first"""
+        found = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            if entry.name.endswith(".part"):
+                # Abandoned downloads; a recent one may still be in progress in another worker
+                if time.time() - stat.st_mtime > self.timeout:
+                    os.unlink(entry.path)
+                continue
+            found.append((stat.st_atime, entry.name.split(".", 1)[0], CachedRecording(entry.path, stat.st_size, _media_type(entry.name))))
+        for _, key, recording in sorted(found, key=lambda item: item[0]):
+            self._add(key, recording)
+        self._enforce_limits()
+
+    async def start(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+        logger.info(f"Recording cache at {self.directory}: {len(self._entries)} files, {self._bytes} bytes")
+
+    async def close(self) -> None:
+        tasks = [*self._prefetches, *self._inflight.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Recording hosts are not the Retell API: no API key; _open follows redirects after checking them
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout, follow_redirects=False)
+        return self._client
+
+    def allows(self, url: str) -> bool:
+        """Whether url is https (or http, if allowed) on one of the allowed recording hosts"""
+        parsed = urlparse(url)
+        host = (parsed.hostname or "").lower()
+        if parsed.scheme not in (("https", "http") if self.allow_http else ("https",)) or not host:
+            return False
+        return any(
+            host == pattern or (pattern.startswith("*.") and host.endswith(pattern[1:]))
+            for pattern in self.allowed_hosts
+        )
+
+    async def _open(self, url: str) -> httpx.Response:
+        """Streaming GET of url, following redirects only to allowed hosts"""
+        for _ in range(MAX_REDIRECTS + 1):
+            if not self.allows(url):
+                raise RecordingNotAllowed(f"Not an allowed recording URL: {_origin(url)}")
+            response = await self.client.send(self.client.build_request("GET", url), stream=True)
+            if response.next_request is None:
+                return response
+            await response.aclose()
+            url = str(response.next_request.url)
+        raise RecordingNotAllowed(f"More than {MAX_REDIRECTS} redirects")
+
+    def lookup(self, call_id: str, variant: str) -> Optional[CachedRecording]:
+        """The cached file for a recording, if there is one, marked as just used (a hit)"""
+        key = self.key(call_id, variant)
+        entry = self._entries.get(key)
+        if entry is not None and not os.path.exists(entry.path):
+            self._bytes -= self._entries.pop(key).size
+            entry = None
+        if entry is None:
+            # Another worker sharing the directory may have downloaded it
+            for extension in EXTENSIONS:
+                path = os.path.join(self.directory, key + extension)
+                try:
+                    size = os.stat(path).st_size
+                except OSError:
+                    continue
+                entry = CachedRecording(path, size, _media_type(path))
+                self._add(key, entry)
+                break
+        if entry is None:
+            return None
+        self._stats["hits"] += 1
+        self._entries.move_to_end(key)
+        try:
+            os.utime(entry.path, ns=(time.time_ns(), os.stat(entry.path).st_mtime_ns))
+        except OSError:
+            pass
+        return entry
+
+    async def fetch(self, call_id: str, variant: str, url: str) -> CachedRecording:
+        """The recording from the cache, downloading it first on a miss"""
+        entry = self.lookup(call_id, variant)
+        if entry is not None:
+            return entry
+        if not self.allows(url):
+            raise RecordingNotAllowed(f"Not an allowed recording URL: {_origin(url)}")
+        self._stats["misses"] += 1
+        key = self.key(call_id, variant)
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            task = asyncio.create_task(self._download(key, url))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so a client that gives up doesn't abort a download others are waiting on
+        return await asyncio.shield(task)
+
+    async def _download(self, key: str, url: str) -> CachedRecording:
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = os.path.join(self.directory, f"{key}.{os.getpid()}.part")
+        started = time.perf_counter()
+        size = 0
+        try:
+            response = await self._open(url)
+            try:
+                response.raise_for_status()
+                length = response.headers.get("content-length")
+                if length and length.isdigit() and int(length) > self.max_file_bytes:
+                    raise RecordingTooLarge(f"Recording is {length} bytes (limit {self.max_file_bytes})")
+                media_type = response.headers.get("content-type", "").split(";")[0].strip()
+                extension = os.path.splitext(urlparse(url).path)[1].lower()
+                if extension not in EXTENSIONS:
+                    extension = mimetypes.guess_extension(media_type) or ".bin"
+                    if extension not in EXTENSIONS:
+                        extension = ".bin"
+                # Writes go to a worker thread so a slow disk doesn't stall the event loop
+                async with await anyio.open_file(temp_path, "wb") as output:
+                    async for chunk in response.aiter_bytes(256 * 1024):
+                        size += len(chunk)
+                        if size > self.max_file_bytes:
+                            raise RecordingTooLarge(f"Recording exceeds {self.max_file_bytes} bytes")
+                        await output.write(chunk)
+            finally:
+                await response.aclose()
+            path = os.path.join(self.directory, key + extension)
+            os.replace(temp_path, path)
+        except BaseException:
+            self._stats["download_errors"] += 1
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        self._stats["downloads"] += 1
+        self._stats["downloaded_bytes"] += size
+        logger.info(f"Cached recording {key} ({size} bytes) in {time.perf_counter() - started:.2f}s")
+        entry = CachedRecording(path, size, mimetypes.guess_type(path)[0] or media_type or "application/octet-stream")
+        self._add(key, entry)
+        self._enforce_limits(keep=key)
+        return entry
+
+    def _enforce_limits(self, keep: Optional[str] = None) -> None:
+        while self.max_bytes and self._bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            if key == keep:
+                if len(self._entries) == 1:
+                    return
+                self._entries.move_to_end(key)
+                continue
+            entry = self._entries.pop(key)
+            self._bytes -= entry.size
+            self._stats["evictions"] += 1
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def prefetch(self, call_id: str, call: Mapping[str, Any], variants: Tuple[str, ...] = ("recording",)) -> None:
+        """Download a call's recordings in the background (e.g. on call_ended)"""
+        for variant in variants:
+            url = call.get(f"{variant}_url")
+            if not url or self.key(call_id, variant) in self._entries or self.key(call_id, variant) in self._inflight:
+                continue
+            task = asyncio.create_task(self._prefetch(call_id, variant, url))
+            self._prefetches.add(task)
+            task.add_done_callback(self._prefetches.discard)
+
+    async def _prefetch(self, call_id: str, variant: str, url: str) -> None:
+        async with self._prefetch_slots:
+            self._stats["prefetches"] += 1
+            try:
+                await self.fetch(call_id, variant, url)
+            except Exception as e:
+                logger.warning(f"Prefetching {variant} for call {call_id} failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["entries"] = len(self._entries)
+        stats["bytes"] = self._bytes
+        stats["max_bytes"] = self.max_bytes
+        stats["downloading"] = len(self._inflight)
+        return stats
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single "bytes=" range, or None to send the whole file.
+
+    Multiple ranges and malformed headers are ignored, as RFC 9110 allows;
+    a range that starts past the end of the file raises ValueError (416).
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, dash, last = header[len("bytes="):].strip().partition("-")
+    if not dash or not (first or last) or (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0 or size == 0:
+            raise ValueError("Unsatisfiable suffix range")
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and start > end:
+        return None
+    if start >= size:
+        raise ValueError("Range starts past the end of the file")
+    return start, min(end, size - 1)
+
+class RangeFileResponse(Response):
+    """Serves a file, or one byte range of it (206), with validators for caching.
+
+    Uses the ASGI zero-copy send extension (sendfile) when the server offers
+    it, and otherwise streams the file in chunks from a worker thread.
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(self, path: str, request_headers: Mapping[str, str], media_type: str, cache_control: str = "private, max-age=86400"):
+        self.path = path
+        self.media_type = media_type
+        self.background = None
+        stat = os.stat(path)
+        size = stat.st_size
+        etag = '"' + hashlib.blake2b(f"{stat.st_mtime_ns}-{size}-{path}".encode("utf-8"), digest_size=16).hexdigest() + '"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": last_modified,
+            "cache-control": cache_control,
+        }
+        self.start, self.length = 0, size
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            self.status_code, self.length = 304, 0
+        else:
+            self.status_code = 200
+            if_range = request_headers.get("if-range")
+            if not if_range or if_range in (etag, last_modified):
+                try:
+                    byte_range = parse_range(request_headers.get("range"), size)
+                except ValueError:
+                    self.status_code, self.length = 416, 0
+                    headers["content-range"] = f"bytes */{size}"
+                else:
+                    if byte_range is not None:
+                        self.status_code = 206
+                        self.start, self.length = byte_range[0], byte_range[1] - byte_range[0] + 1
+                        headers["content-range"] = f"bytes {byte_range[0]}-{byte_range[1]}/{size}"
+            headers["content-length"] = str(self.length)
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD" or not self.length:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False,
+                })
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # The file shrank under us; end the body rather than hang the client
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+# Global recording cache instance
+recording_cache = RecordingCache(
+    settings.RECORDING_CACHE_DIR,
+    max_bytes=settings.RECORDING_CACHE_MAX_BYTES,
+    max_file_bytes=settings.RECORDING_MAX_FILE_BYTES,
+    timeout=settings.RECORDING_DOWNLOAD_TIMEOUT,
+    prefetch_concurrency=settings.RECORDING_PREFETCH_CONCURRENCY,
+    allowed_hosts=tuple(settings.RECORDING_ALLOWED_HOSTS.split(",")),
+    allow_http=settings.RECORDING_ALLOW_HTTP
+)
@@ -0,0 +1,107 @@
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that is known to be unhealthy"""
+
+class CircuitBreaker:
+    """Classic closed / open / half-open circuit breaker.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail fast for recovery_timeout seconds. It then lets a single probe
+    through (half-open): success closes the circuit, failure re-opens it. A
+    probe that ends with neither (e.g. cancelled) must be released; one that
+    is never released expires after recovery_timeout.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._stats: Dict[str, Any] = {"short_circuited": 0, "transitions": {}}
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        key = f"{self.state}->{state}"
+        self._stats["transitions"][key] = self._stats["transitions"].get(key, 0) + 1
+        log = logger.warning if state == self.OPEN else logger.info
+        log(f"Circuit {self.name}: {self.state} -> {state}")
+        self.state = state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == self.OPEN and time.monotonic() - self._opened_at < self.recovery_timeout
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError unless a call may proceed; True when the call is the half-open probe"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                self._stats["short_circuited"] += 1
+                raise CircuitOpenError(f"Circuit {self.name} is open")
+            self._transition(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight and time.monotonic() - self._probe_started < self.recovery_timeout:
+                self._stats["short_circuited"] += 1
+                raise CircuitOpenError(f"Circuit {self.name} is half-open, probe in flight")
+            self._probe_in_flight = True
+            self._probe_started = time.monotonic()
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Let another call probe; for a probe that ended without a success or failure"""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_in_flight = False
+        self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._transition(self.OPEN)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "short_circuited": self._stats["short_circuited"],
+            "transitions": dict(self._stats["transitions"]),
+        }
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or an HTTP date"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
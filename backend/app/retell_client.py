@@ -1,9 +1,15 @@
+import asyncio
 import httpx
 import hashlib
 import hmac
 import logging
+import time
+import weakref
 from typing import Dict, Any, Optional, List
 from .config import settings
+from .metrics import record_timing, upstream_request_duration, upstream_requests
+from .rate_limit import TokenBucket
+from .resilience import CircuitBreaker, CircuitOpenError, backoff_delay, retry_after_seconds
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +21,237 @@ class RetellClient:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
-    
+        self._client: Optional[httpx.AsyncClient] = None
+        self._http2 = False
+        # Network streams seen so far, used to tell new connections from reused ones
+        self._seen_streams: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self.limiter = TokenBucket(settings.RETELL_RATE_LIMIT, settings.RETELL_RATE_BURST)
+        self.breaker = CircuitBreaker(
+            "retell",
+            failure_threshold=settings.RETELL_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=settings.RETELL_BREAKER_RECOVERY_TIMEOUT
+        )
+        self._resilience: Dict[str, Any] = {
+            "retries": 0,
+            "throttled": 0,
+            "rate_limited_waits": 0,
+            "rate_limited_seconds": 0.0,
+        }
+        self._stats = {
+            "requests": 0,
+            "new_connections": 0,
+            "reused_connections": 0,
+            "unknown_connections": 0,
+        }
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Create the shared pooled HTTP client"""
+        http2 = settings.RETELL_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("RETELL_HTTP2 is enabled but the 'h2' package is not installed; falling back to HTTP/1.1")
+                http2 = False
+        self._http2 = http2
+
+        limits = httpx.Limits(
+            max_connections=settings.RETELL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.RETELL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.RETELL_KEEPALIVE_EXPIRY
+        )
+        timeout = httpx.Timeout(
+            settings.RETELL_GET_CALL_TIMEOUT,
+            connect=settings.RETELL_CONNECT_TIMEOUT,
+            pool=settings.RETELL_POOL_TIMEOUT
+        )
+        logger.info(f"Opening Retell HTTP client (http2={http2}, max_connections={limits.max_connections}, keepalive={limits.max_keepalive_connections})")
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            limits=limits,
+            timeout=timeout,
+            http2=http2
+        )
+
+    async def start(self) -> None:
+        """Open the shared HTTP client (called on application startup)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+
+    async def close(self) -> None:
+        """Close the shared HTTP client (called on application shutdown)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("Closed Retell HTTP client")
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client, opened lazily when used outside the app lifecycle"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    def _endpoint_timeout(self, read_timeout: float) -> httpx.Timeout:
+        return httpx.Timeout(
+            read_timeout,
+            connect=settings.RETELL_CONNECT_TIMEOUT,
+            pool=settings.RETELL_POOL_TIMEOUT
+        )
+
+    def _track_connection(self, response: httpx.Response) -> None:
+        """Record whether a response was served over a new or reused connection"""
+        self._stats["requests"] += 1
+        stream = response.extensions.get("network_stream")
+        if stream is None:
+            self._stats["unknown_connections"] += 1
+            return
+        try:
+            if stream in self._seen_streams:
+                self._stats["reused_connections"] += 1
+            else:
+                self._seen_streams.add(stream)
+                self._stats["new_connections"] += 1
+        except TypeError:
+            self._stats["unknown_connections"] += 1
+
+    async def _request(self, method: str, path: str, read_timeout: float, idempotent: bool = True, **kwargs) -> httpx.Response:
+        """Send a request to Retell, recording its latency and outcome per operation"""
+        operation = path.split("/")[2]  # /v2/get-call/{call_id} -> get-call
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._send(method, path, read_timeout, idempotent, **kwargs)
+            outcome = str(response.status_code)
+            return response
+        except CircuitOpenError:
+            outcome = "circuit_open"
+            raise
+        except httpx.TimeoutException:
+            outcome = "timeout"
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            upstream_requests.inc(operation=operation, outcome=outcome)
+            upstream_request_duration.observe(elapsed, operation=operation)
+            record_timing("retell", elapsed)
+
+    async def _send(self, method: str, path: str, read_timeout: float, idempotent: bool = True, **kwargs) -> httpx.Response:
+        """Send a request through the shared client with rate limiting, retries and the circuit breaker.
+
+        Non-idempotent requests are only retried when Retell cannot have acted
+        on them (429 responses and failures to connect), so a retry never
+        places a second call.
+        """
+        probe = self.breaker.before_call()
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                waited = await self.limiter.acquire()
+                if waited:
+                    self._resilience["rate_limited_waits"] += 1
+                    self._resilience["rate_limited_seconds"] += waited
+
+                delay = None
+                try:
+                    response = await self.client.request(
+                        method,
+                        path,
+                        timeout=self._endpoint_timeout(read_timeout),
+                        **kwargs
+                    )
+                except (httpx.TimeoutException, httpx.TransportError) as e:
+                    self.breaker.record_failure()
+                    retryable = idempotent or isinstance(e, httpx.ConnectError)
+                    if not retryable or attempt > settings.RETELL_MAX_RETRIES:
+                        raise
+                    logger.warning(f"Retell {method} {path} failed ({e!r}), retrying (attempt {attempt})")
+                else:
+                    self._track_connection(response)
+                    status = response.status_code
+                    if status == 429:
+                        # Throttling means Retell is up; it should not trip the breaker
+                        self.breaker.record_success()
+                        self._resilience["throttled"] += 1
+                        delay = retry_after_seconds(response)
+                    elif status >= 500:
+                        self.breaker.record_failure()
+                        if not idempotent:
+                            return response
+                    else:
+                        self.breaker.record_success()
+                        return response
+                    if attempt > settings.RETELL_MAX_RETRIES:
+                        return response
+                    logger.warning(f"Retell {method} {path} returned {status}, retrying (attempt {attempt})")
+
+                self._resilience["retries"] += 1
+                if delay is None:
+                    delay = backoff_delay(attempt, settings.RETELL_RETRY_BASE_DELAY, settings.RETELL_RETRY_MAX_DELAY)
+                await asyncio.sleep(min(delay, settings.RETELL_RETRY_MAX_DELAY))
+                # Stop retrying if the failures so far have opened the circuit
+                probe = self.breaker.before_call() or probe
+        finally:
+            # A probe cancelled or failed by something other than Retell must not keep the circuit half-open
+            if probe:
+                self.breaker.release_probe()
+
+    async def probe(self, timeout: float) -> int:
+        """Single cheap request for health checks; returns the HTTP status.
+
+        Bypasses the rate limiter, retries and circuit breaker so the result
+        reflects Retell right now.
+        """
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self.client.post("/v2/list-calls", json={"limit": 1}, timeout=timeout)
+            self._track_connection(response)
+            outcome = str(response.status_code)
+            return response.status_code
+        except httpx.TimeoutException:
+            outcome = "timeout"
+            raise
+        finally:
+            upstream_requests.inc(operation="probe", outcome=outcome)
+            upstream_request_duration.observe(time.perf_counter() - started, operation="probe")
+
+    @property
+    def circuit_open(self) -> bool:
+        """True while the circuit breaker is failing calls fast"""
+        return self.breaker.is_open
+
+    def resilience_stats(self) -> Dict[str, Any]:
+        """Retry, throttling and circuit breaker counters"""
+        stats: Dict[str, Any] = dict(self._resilience)
+        stats["rate_limited_seconds"] = round(stats["rate_limited_seconds"], 3)
+        stats["rate_limit_per_second"] = self.limiter.rate
+        stats["circuit"] = self.breaker.stats()
+        return stats
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection reuse counters and current pool occupancy"""
+        stats: Dict[str, Any] = dict(self._stats)
+        tracked = stats["new_connections"] + stats["reused_connections"]
+        stats["reuse_ratio"] = round(stats["reused_connections"] / tracked, 4) if tracked else 0.0
+        stats["http2"] = self._http2
+        stats["client_open"] = self._client is not None and not self._client.is_closed
+
+        connections = []
+        if stats["client_open"]:
+            pool = getattr(self._client._transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []) or [])
+        stats["pool_connections"] = len(connections)
+        stats["pool_idle_connections"] = sum(1 for conn in connections if conn.is_idle())
+        stats["limits"] = {
+            "max_connections": settings.RETELL_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.RETELL_MAX_KEEPALIVE_CONNECTIONS,
+            "keepalive_expiry": settings.RETELL_KEEPALIVE_EXPIRY
+        }
+        return stats
+
     async def create_phone_call(self, to_number: str, dynamic_variables: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Create an outbound phone call using Retell API"""
         payload = {
@@ -25,103 +261,113 @@ class RetellClient:
             "language": "multi",  # Enable multilingual support
             "retell_llm_dynamic_variables": dynamic_variables or {}
         }
-        
+
         logger.info(f"Creating phone call to {to_number} with dynamic variables: {payload['retell_llm_dynamic_variables']}")
         logger.info(f"Full payload: {payload}")
-        
+
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/v2/create-phone-call",
-                    json=payload,
-                    headers=self.headers
+            response = await self._request(
+                "POST",
+                "/v2/create-phone-call",
+                settings.RETELL_CREATE_CALL_TIMEOUT,
+                idempotent=False,
+                json=payload
+            )
+
+            logger.info(f"Retell API response status: {response.status_code}")
+
+            if response.status_code not in [200, 201]:
+                error_text = response.text
+                logger.error(f"Retell API error: {response.status_code} - {error_text}")
+                raise httpx.HTTPStatusError(
+                    f"Retell API error: {response.status_code} - {error_text}",
+                    request=response.request,
+                    response=response
                 )
-                
-                logger.info(f"Retell API response status: {response.status_code}")
-                
-                if response.status_code not in [200, 201]:
-                    error_text = response.text
-                    logger.error(f"Retell API error: {response.status_code} - {error_text}")
-                    raise httpx.HTTPStatusError(
-                        f"Retell API error: {response.status_code} - {error_text}",
-                        request=response.request,
-                        response=response
-                    )
-                
-                result = response.json()
-                logger.info(f"Call created successfully: {result.get('call_id')}")
-                return result
-                
-        except httpx.TimeoutException:
-            logger.error("Timeout connecting to Retell API")
-            raise Exception("Timeout connecting to Retell API")
+
+            result = response.json()
+            logger.info(f"Call created successfully: {result.get('call_id')}")
+            return result
+
+        # Raised as-is: a timeout means Retell may have placed the call, a connect error that it cannot have
+        except httpx.TimeoutException as e:
+            logger.error(f"Timeout waiting for Retell API to create call: {e!r}")
+            raise
         except httpx.ConnectError as e:
             logger.error(f"Connection error to Retell API: {e}")
-            raise Exception(f"Failed to connect to Retell API: {e}")
+            raise
         except Exception as e:
             logger.error(f"Unexpected error calling Retell API: {e}")
             raise
-    
+
     async def get_call(self, call_id: str) -> Dict[str, Any]:
         """Get call details from Retell API"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    f"{self.base_url}/v2/get-call/{call_id}",
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await self._request(
+                "GET",
+                f"/v2/get-call/{call_id}",
+                settings.RETELL_GET_CALL_TIMEOUT
+            )
+            response.raise_for_status()
+            return response.json()
         except Exception as e:
             logger.error(f"Error getting call {call_id}: {e}")
             raise
-    
-    async def list_calls(self, limit: int = 100) -> List[Dict[str, Any]]:
+
+    async def list_calls(
+        self,
+        limit: int = 100,
+        filter_criteria: Optional[Dict[str, Any]] = None,
+        pagination_key: Optional[str] = None,
+        sort_order: str = "descending"
+    ) -> List[Dict[str, Any]]:
         """List calls from Retell API"""
         try:
-            payload = {
-                "filter_criteria": {},
-                "sort_order": "descending",
+            payload: Dict[str, Any] = {
+                "filter_criteria": filter_criteria or {},
+                "sort_order": sort_order,
                 "limit": limit
             }
-            
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/v2/list-calls",
-                    json=payload,
-                    headers=self.headers
+            if pagination_key:
+                payload["pagination_key"] = pagination_key
+
+            response = await self._request(
+                "POST",
+                "/v2/list-calls",
+                settings.RETELL_LIST_CALLS_TIMEOUT,
+                json=payload
+            )
+
+            logger.info(f"List calls response status: {response.status_code}")
+
+            if response.status_code not in [200, 201]:
+                error_text = response.text
+                logger.error(f"Retell API error: {response.status_code} - {error_text}")
+                raise httpx.HTTPStatusError(
+                    f"Retell API error: {response.status_code} - {error_text}",
+                    request=response.request,
+                    response=response
                 )
-                
-                logger.info(f"List calls response status: {response.status_code}")
-                
-                if response.status_code not in [200, 201]:
-                    error_text = response.text
-                    logger.error(f"Retell API error: {response.status_code} - {error_text}")
-                    raise httpx.HTTPStatusError(
-                        f"Retell API error: {response.status_code} - {error_text}",
-                        request=response.request,
-                        response=response
-                    )
-                
-                result = response.json()
-                logger.info(f"Successfully fetched {len(result)} calls from Retell")
-                return result  # Return the list directly
-                
+
+            result = response.json()
+            logger.info(f"Successfully fetched {len(result)} calls from Retell")
+            return result  # Return the list directly
+
         except Exception as e:
             logger.error(f"Error listing calls: {e}")
             raise
-    
+
     def verify_webhook_signature(self, payload: bytes, signature: str) -> bool:
         """Verify webhook signature from Retell"""
         if not settings.RETELL_WEBHOOK_VERIFY_KEY:
             return False
-        
+
         expected_signature = hmac.new(
             settings.RETELL_WEBHOOK_VERIFY_KEY.encode(),
             payload,
             hashlib.sha256
         ).hexdigest()
-        
+
         return hmac.compare_digest(signature, expected_signature)
 
-retell_client = RetellClient()
\ No newline at end of file
+retell_client = RetellClient()
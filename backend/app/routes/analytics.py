@@ -0,0 +1,70 @@
+import logging
+from fastapi import APIRouter, HTTPException, Query
+from ..analytics import LATENCY_COMPONENTS, cost_rollups, latency_analytics
+from typing import Any, Dict, List, Literal, Optional
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+@router.get("/latency")
+async def latency_percentiles(
+    component: Optional[List[str]] = Query(None, description=f"Latency components ({', '.join(LATENCY_COMPONENTS)})"),
+    agent_id: Optional[List[str]] = Query(None),
+    start_after: Optional[int] = Query(None, description="Earliest start_timestamp (ms)"),
+    start_before: Optional[int] = Query(None, description="Latest start_timestamp (ms)"),
+    by_agent: bool = False,
+    interval: Optional[Literal["hour", "day"]] = None,
+    percentile: List[float] = Query([50, 90, 95, 99])
+) -> Dict[str, Any]:
+    """Latency percentiles (ms) across all stored calls.
+
+    Returns one row per component, split by agent when by_agent is set and
+    into hour or day buckets when interval is given.
+    """
+    unknown = set(component or []) - set(LATENCY_COMPONENTS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown latency component(s): {', '.join(sorted(unknown))}")
+    if any(p < 0 or p > 100 for p in percentile):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100")
+
+    rows = latency_analytics.query(
+        components=component,
+        agent_id=agent_id,
+        start_after=start_after,
+        start_before=start_before,
+        by_agent=by_agent,
+        interval=interval,
+        percentiles=percentile
+    )
+    return {
+        "relative_accuracy": latency_analytics.relative_accuracy,
+        "calls": latency_analytics.count_calls(
+            components=component,
+            agent_id=agent_id,
+            start_after=start_after,
+            start_before=start_before
+        ),
+        "results": rows
+    }
+
+@router.get("/costs")
+async def cost_rollup(
+    agent_id: Optional[List[str]] = Query(None),
+    start_after: Optional[int] = Query(None, description="Earliest start_timestamp (ms)"),
+    start_before: Optional[int] = Query(None, description="Latest start_timestamp (ms)"),
+    by_agent: bool = False,
+    by_day: bool = False
+) -> Dict[str, Any]:
+    """Call cost, per-product cost and LLM token totals across all stored calls.
+
+    Costs are in Retell's units. Rows are split by agent and/or day on request.
+    """
+    rows = cost_rollups.query(
+        agent_id=agent_id,
+        start_after=start_after,
+        start_before=start_before,
+        by_agent=by_agent,
+        by_day=by_day
+    )
+    return {"results": rows}
@@ -1,58 +1,139 @@
+import asyncio
+import hashlib
 import logging
-from fastapi import APIRouter, HTTPException
-from ..models.schemas import CreateCallRequest, CreateCallResponse, CallStatus
+import httpx
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import RedirectResponse, StreamingResponse
+from ..models.schemas import BatchCallRequest, BatchCallResponse, CreateCallRequest, CreateCallResponse, CallStatus
 from ..retell_client import retell_client
-from ..store import call_store
-from typing import Dict, Any, List
+from ..resilience import CircuitOpenError
+from ..store import call_store, encode_pagination_key
+from ..sync import apply_retell_call, call_sync
+from ..cache import call_cache
+from ..config import settings
+from ..jsonutil import dumps
+from ..packing import unpack
+from ..recordings import RangeFileResponse, RecordingNotAllowed, RecordingTooLarge, recording_cache
+from ..events import event_bus, call_event, Subscription, SubscriberLimitReached
+from typing import AsyncIterator, Callable, Dict, Any, List, Literal, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/calls", tags=["calls"])
 
+def _summarize_call(call_data: Dict[str, Any], local_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Shape a call into the compact row used by the history list"""
+    return {
+        "call_id": call_data.get("call_id"),
+        "call_status": call_data.get("call_status", "unknown"),
+        "to_number": call_data.get("to_number") or "",
+        "from_number": call_data.get("from_number") or "",
+        "agent_name": call_data.get("agent_name") or "",
+        "agent_id": call_data.get("agent_id") or "",
+        "direction": call_data.get("direction") or "",
+        "start_timestamp": call_data.get("start_timestamp"),
+        "end_timestamp": call_data.get("end_timestamp"),
+        "duration_ms": call_data.get("duration_ms"),
+        "disconnection_reason": call_data.get("disconnection_reason"),
+        "created_at": local_data.get("created_at") if local_data else None,
+        "updated_at": local_data.get("updated_at") if local_data else None,
+        # Include analysis status
+        "has_analysis": bool(call_data.get("call_analysis") or (local_data and local_data.get("call_analysis"))),
+        "has_recording": bool(call_data.get("recording_url")),
+        "call_cost": call_data.get("call_cost", {}).get("combined_cost") if call_data.get("call_cost") else None
+    }
+
+def _filter_criteria(
+    status: Optional[List[str]],
+    agent_id: Optional[List[str]],
+    direction: Optional[str],
+    start_after: Optional[int],
+    start_before: Optional[int]
+) -> Dict[str, Any]:
+    """Translate list filters into Retell's list-calls filter_criteria"""
+    criteria: Dict[str, Any] = {}
+    if status:
+        criteria["call_status"] = status
+    if agent_id:
+        criteria["agent_id"] = agent_id
+    if direction:
+        criteria["direction"] = [direction]
+    if start_after is not None or start_before is not None:
+        criteria["start_timestamp"] = {}
+        if start_after is not None:
+            criteria["start_timestamp"]["lower_threshold"] = start_after
+        if start_before is not None:
+            criteria["start_timestamp"]["upper_threshold"] = start_before
+    return criteria
+
 @router.get("/", response_model=List[Dict[str, Any]])
-async def list_calls():
-    """Get list of all calls from Retell API"""
+async def list_calls(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    pagination_key: Optional[str] = None,
+    status: Optional[List[str]] = Query(None),
+    agent_id: Optional[List[str]] = Query(None),
+    direction: Optional[str] = None,
+    start_after: Optional[int] = Query(None, description="Earliest start_timestamp (ms)"),
+    start_before: Optional[int] = Query(None, description="Latest start_timestamp (ms)"),
+    has_analysis: Optional[bool] = None,
+    source: Literal["auto", "upstream", "local"] = "auto"
+):
+    """List calls newest first, one page at a time.
+
+    Pass the X-Pagination-Key response header back as pagination_key to get
+    the next page. source=local answers from the call store instead of Retell;
+    auto does so once the background sync has completed a full pass.
+    """
     try:
-        logger.info("Getting list of all calls from Retell API")
-        
-        # Fetch calls from Retell API - this returns a list directly
-        retell_calls = await retell_client.list_calls(limit=100)
+        if source == "auto":
+            source = "local" if call_sync.ready else "upstream"
         
-        # Process and format the calls
-        all_calls = []
-        for call_data in retell_calls:
-            call_id = call_data.get("call_id")
+        if source == "local":
+            calls = call_store.query_calls(
+                status=status,
+                agent_id=agent_id,
+                direction=direction,
+                start_after=start_after,
+                start_before=start_before,
+                has_analysis=has_analysis,
+                limit=limit,
+                pagination_key=pagination_key
+            )
+            all_calls = [_summarize_call(call, call) for call in calls]
+            next_key = encode_pagination_key(calls[-1]) if len(calls) == limit else None
+        else:
+            logger.info(f"Getting page of calls from Retell API (limit={limit}, pagination_key={pagination_key})")
             
-            # Merge with local store data if available
-            local_data = call_store.get_call(call_id) if call_id else {}
+            # Fetch calls from Retell API - this returns a list directly
+            retell_calls = await retell_client.list_calls(
+                limit=limit,
+                filter_criteria=_filter_criteria(status, agent_id, direction, start_after, start_before),
+                pagination_key=pagination_key
+            )
+            next_key = retell_calls[-1].get("call_id") if len(retell_calls) == limit else None
             
-            call_info = {
-                "call_id": call_id,
-                "call_status": call_data.get("call_status", "unknown"),
-                "to_number": call_data.get("to_number", ""),
-                "from_number": call_data.get("from_number", ""),
-                "agent_name": call_data.get("agent_name", ""),
-                "agent_id": call_data.get("agent_id", ""),
-                "direction": call_data.get("direction", ""),
-                "start_timestamp": call_data.get("start_timestamp"),
-                "end_timestamp": call_data.get("end_timestamp"),
-                "duration_ms": call_data.get("duration_ms"),
-                "disconnection_reason": call_data.get("disconnection_reason"),
-                "created_at": local_data.get("created_at") if local_data else None,
-                "updated_at": local_data.get("updated_at") if local_data else None,
-                # Include analysis status
-                "has_analysis": bool(call_data.get("call_analysis") or (local_data and local_data.get("call_analysis"))),
-                "has_recording": bool(call_data.get("recording_url")),
-                "call_cost": call_data.get("call_cost", {}).get("combined_cost") if call_data.get("call_cost") else None
-            }
-            all_calls.append(call_info)
+            # Merge with local store data if available
+            all_calls = []
+            for call_data in retell_calls:
+                call_id = call_data.get("call_id")
+                local_data = call_store.get_call(call_id) if call_id else None
+                call_info = _summarize_call(call_data, local_data)
+                # Retell has no analysis filter, so apply it to the page
+                if has_analysis is not None and call_info["has_analysis"] != has_analysis:
+                    continue
+                all_calls.append(call_info)
         
-        # Sort by start_timestamp (most recent first), fallback to end_timestamp
-        all_calls.sort(key=lambda x: x.get("start_timestamp") or x.get("end_timestamp") or 0, reverse=True)
+        if next_key:
+            response.headers["X-Pagination-Key"] = next_key
         
-        logger.info(f"Successfully processed {len(all_calls)} calls from Retell API")
+        logger.info(f"Returning {len(all_calls)} calls from {source}")
         return all_calls
     
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=f"Retell API unavailable: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to list calls: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to list calls: {str(e)}")
@@ -76,93 +157,369 @@ async def create_call(request: CreateCallRequest):
             "call_id": call_id,
             "call_status": "created",
             "to_number": request.to_number,
-            "dynamic_variables": request.dynamic_variables,
-            "retell_data": call_data
+            "dynamic_variables": request.dynamic_variables
         })
         
+        event_bus.publish(call_event("call_created", call_id, {"call_status": "created"}))
+        
         return CreateCallResponse(call_id=call_id)
     
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=f"Retell API unavailable: {str(e)}")
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail="Timed out waiting for Retell API; the call may still have been placed")
+    except httpx.ConnectError as e:
+        raise HTTPException(status_code=502, detail=f"Failed to connect to Retell API: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create call: {str(e)}")
 
-@router.get("/{call_id}", response_model=CallStatus)
-async def get_call_status(call_id: str):
-    """Get call status and analysis"""
+def _format_sse(event: Dict[str, Any]) -> str:
+    return f"event: {event.get('event', 'message')}\ndata: {dumps(event, default=str).decode('utf-8')}\n\n"
+
+async def _event_stream(request: Request, subscription: Subscription, initial: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+    """Relay bus events to an SSE client, with heartbeats to keep proxies from closing the stream"""
     try:
-        logger.info(f"Getting status for call: {call_id}")
-        
-        # Always try to fetch fresh data from Retell API for more accurate status
+        yield "retry: 3000\n\n"
+        if initial is not None:
+            yield _format_sse(initial)
+        while True:
+            if await request.is_disconnected():
+                break
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=settings.EVENT_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield _format_sse(event)
+    finally:
+        event_bus.unsubscribe(subscription)
+
+def _sse_response(request: Request, call_id: Optional[str], initial: Optional[Dict[str, Any]] = None) -> StreamingResponse:
+    try:
+        subscription = event_bus.subscribe(call_id)
+    except SubscriberLimitReached as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return StreamingResponse(
+        _event_stream(request, subscription, initial),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/events")
+async def stream_all_call_events(request: Request):
+    """Stream updates for every call as Server-Sent Events"""
+    return _sse_response(request, None)
+
+@router.get("/{call_id}/events")
+async def stream_call_events(call_id: str, request: Request):
+    """Stream updates for a single call as Server-Sent Events"""
+    stored_call = call_store.get_call(call_id)
+    initial = call_event("snapshot", call_id, stored_call) if stored_call else None
+    return _sse_response(request, call_id, initial)
+
+async def _refresh_call_from_retell(call_id: str) -> Dict[str, Any]:
+    """Fetch a call from Retell and write it through to the store"""
+    logger.info(f"Fetching fresh data from Retell API for call: {call_id}")
+    retell_data = await retell_client.get_call(call_id)
+    retell_data.setdefault("call_id", call_id)
+    apply_retell_call(retell_data)
+    return retell_data
+
+# Fields returned by view=summary; enough for a status poll to decide whether to fetch more
+SUMMARY_FIELDS = (
+    "call_status",
+    "start_timestamp",
+    "end_timestamp",
+    "duration_ms",
+    "disconnection_reason",
+    "agent_name",
+)
+
+def _fetch_error(error: Exception) -> Tuple[int, str]:
+    """Status code and detail for a failed Retell call lookup"""
+    if isinstance(error, CircuitOpenError):
+        return 503, f"Retell API unavailable: {error}"
+    if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 404:
+        return 404, "Call not found"
+    return 502, f"Failed to fetch call from Retell: {error}"
+
+async def _load_call(call_id: str) -> Dict[str, Any]:
+    """Refresh a call through the cache and return its stored record.
+
+    Raises 404 only when Retell says the call doesn't exist (or returned
+    nothing); without a stored copy to fall back on, an open circuit is a 503
+    and any other upstream failure a 502.
+    """
+    # Serve from the stale-while-revalidate cache; only misses wait on Retell.
+    # While the Retell circuit is open, answer from the store without trying.
+    error: Optional[Exception] = None
+    stored_call = call_store.get_call(call_id)
+    if retell_client.circuit_open and stored_call:
+        logger.info(f"Retell circuit open, serving call {call_id} from store")
+    else:
+        if not stored_call:
+            # The store has dropped (evicted or expired) the record this entry stood for
+            call_cache.invalidate(call_id)
         try:
-            logger.info(f"Fetching fresh data from Retell API for call: {call_id}")
-            retell_data = await retell_client.get_call(call_id)
-            
-            # Update our store with fresh data
-            call_store.update_call(call_id, {
-                "call_id": call_id,
-                "call_status": retell_data.get("call_status", "unknown"),
-                "retell_data": retell_data,
-                # Update with any new data from Retell API
-                "transcript": retell_data.get("transcript", ""),
-                "duration_ms": retell_data.get("duration_ms"),
-                "agent_name": retell_data.get("agent_name"),
-                "start_timestamp": retell_data.get("start_timestamp"),
-                "end_timestamp": retell_data.get("end_timestamp"),
-                "disconnection_reason": retell_data.get("disconnection_reason"),
-                "recording_url": retell_data.get("recording_url"),
-                "recording_multi_channel_url": retell_data.get("recording_multi_channel_url"),
-                "scrubbed_recording_url": retell_data.get("scrubbed_recording_url"),
-                "scrubbed_recording_multi_channel_url": retell_data.get("scrubbed_recording_multi_channel_url"),
-                "public_log_url": retell_data.get("public_log_url"),
-                "knowledge_base_retrieved_contents_url": retell_data.get("knowledge_base_retrieved_contents_url"),
-                "latency": retell_data.get("latency"),
-                "call_cost": retell_data.get("call_cost"),
-                "llm_token_usage": retell_data.get("llm_token_usage"),
-                "transcript_object": retell_data.get("transcript_object"),
-                "transcript_with_tool_calls": retell_data.get("transcript_with_tool_calls"),
-                "retell_llm_dynamic_variables": retell_data.get("retell_llm_dynamic_variables"),
-                "collected_dynamic_variables": retell_data.get("collected_dynamic_variables")
-            })
-            
-            # If call analysis is available in the API response, store it
-            if retell_data.get("call_analysis"):
-                call_store.set_call_analysis(call_id, retell_data.get("call_analysis"))
-            
+            await call_cache.get(call_id, lambda: _refresh_call_from_retell(call_id))
         except Exception as e:
+            error = e
             logger.warning(f"Failed to fetch fresh data from Retell API: {e}")
-        
-        # Get data from store (either fresh or cached)
-        stored_call = call_store.get_call(call_id)
-        if not stored_call:
-            raise HTTPException(status_code=404, detail="Call not found")
-        
-        return CallStatus(
-            call_id=call_id,
-            call_status=stored_call.get("call_status", "unknown"),
-            call_analysis=stored_call.get("call_analysis"),
-            transcript=stored_call.get("transcript"),
-            transcript_object=stored_call.get("transcript_object"),
-            transcript_with_tool_calls=stored_call.get("transcript_with_tool_calls"),
-            created_at=stored_call.get("created_at"),
-            ended_at=stored_call.get("ended_at"),
-            start_timestamp=stored_call.get("start_timestamp"),
-            end_timestamp=stored_call.get("end_timestamp"),
-            duration_ms=stored_call.get("duration_ms"),
-            agent_name=stored_call.get("agent_name"),
-            disconnection_reason=stored_call.get("disconnection_reason"),
-            recording_url=stored_call.get("recording_url"),
-            recording_multi_channel_url=stored_call.get("recording_multi_channel_url"),
-            scrubbed_recording_url=stored_call.get("scrubbed_recording_url"),
-            scrubbed_recording_multi_channel_url=stored_call.get("scrubbed_recording_multi_channel_url"),
-            public_log_url=stored_call.get("public_log_url"),
-            knowledge_base_retrieved_contents_url=stored_call.get("knowledge_base_retrieved_contents_url"),
-            latency=stored_call.get("latency"),
-            call_cost=stored_call.get("call_cost"),
-            llm_token_usage=stored_call.get("llm_token_usage"),
-            retell_llm_dynamic_variables=stored_call.get("retell_llm_dynamic_variables"),
-            collected_dynamic_variables=stored_call.get("collected_dynamic_variables")
-        )
-    
+
+    # Get data from store (either fresh or cached)
+    stored_call = call_store.get_call(call_id)
+    if not stored_call:
+        status_code, detail = _fetch_error(error) if error is not None else (404, "Call not found")
+        raise HTTPException(status_code=status_code, detail=detail)
+    return stored_call
+
+def _call_status(call_id: str, stored_call: Dict[str, Any]) -> CallStatus:
+    # Word timings and latency samples may be held packed by the store
+    bulky = unpack({name: stored_call.get(name) for name in ("transcript_object", "transcript_with_tool_calls", "latency")})
+    return CallStatus(
+        call_id=call_id,
+        call_status=stored_call.get("call_status", "unknown"),
+        call_analysis=stored_call.get("call_analysis"),
+        transcript=stored_call.get("transcript"),
+        transcript_object=bulky["transcript_object"],
+        transcript_with_tool_calls=bulky["transcript_with_tool_calls"],
+        created_at=stored_call.get("created_at"),
+        ended_at=stored_call.get("ended_at"),
+        start_timestamp=stored_call.get("start_timestamp"),
+        end_timestamp=stored_call.get("end_timestamp"),
+        duration_ms=stored_call.get("duration_ms"),
+        agent_name=stored_call.get("agent_name"),
+        disconnection_reason=stored_call.get("disconnection_reason"),
+        recording_url=stored_call.get("recording_url"),
+        recording_multi_channel_url=stored_call.get("recording_multi_channel_url"),
+        scrubbed_recording_url=stored_call.get("scrubbed_recording_url"),
+        scrubbed_recording_multi_channel_url=stored_call.get("scrubbed_recording_multi_channel_url"),
+        public_log_url=stored_call.get("public_log_url"),
+        knowledge_base_retrieved_contents_url=stored_call.get("knowledge_base_retrieved_contents_url"),
+        latency=bulky["latency"],
+        call_cost=stored_call.get("call_cost"),
+        llm_token_usage=stored_call.get("llm_token_usage"),
+        retell_llm_dynamic_variables=stored_call.get("retell_llm_dynamic_variables"),
+        collected_dynamic_variables=stored_call.get("collected_dynamic_variables")
+    )
+
+def _parse_fields(fields: List[str]) -> List[str]:
+    """Validate requested CallStatus field names, or 400"""
+    names = [name.strip() for name in fields if name.strip()]
+    unknown = set(names) - set(CallStatus.model_fields) - {"has_analysis"}
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(sorted(unknown))}")
+    return names
+
+def _select_fields(call_id: str, stored_call: Dict[str, Any], names: List[str]) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"call_id": call_id}
+    for name in names:
+        if name == "has_analysis":
+            payload[name] = bool(stored_call.get("call_analysis"))
+        elif name == "call_status":
+            payload[name] = stored_call.get("call_status", "unknown")
+        elif name != "call_id":
+            payload[name] = stored_call.get(name)
+    return unpack(payload)
+
+def _etag_response(request: Request, stored_call: Dict[str, Any], variant: tuple, render: Callable[[], bytes]) -> Response:
+    """JSON response tagged with the stored call's version, or 304 if the client already has it.
+
+    The ETag is derived from the call's updated_at and the requested variant,
+    so a matching If-None-Match is answered without rendering the body.
+    """
+    body = None
+    updated_at = stored_call.get("updated_at")
+    if updated_at is None:
+        body = render()
+        source = body
+    else:
+        source = repr((stored_call.get("call_id"), str(updated_at), variant)).encode("utf-8")
+    etag = f'"{hashlib.blake2b(source, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=render() if body is None else body, media_type="application/json", headers=headers)
+
+def _transcript_body(call_id: str, stored_call: Dict[str, Any], words: bool) -> bytes:
+    transcript_object = stored_call.get("transcript_object")
+    transcript_with_tool_calls = stored_call.get("transcript_with_tool_calls")
+    if not words:
+        strip = lambda items: [{k: v for k, v in item.items() if k != "words"} for item in items] if items else items
+        transcript_object = strip(transcript_object)
+        transcript_with_tool_calls = strip(transcript_with_tool_calls)
+    return dumps(unpack({
+        "call_id": call_id,
+        "transcript": stored_call.get("transcript"),
+        "transcript_object": transcript_object,
+        "transcript_with_tool_calls": transcript_with_tool_calls
+    }))
+
+def _latency_body(call_id: str, stored_call: Dict[str, Any], values: bool) -> bytes:
+    latency = stored_call.get("latency")
+    if latency and not values:
+        latency = {
+            component: {k: v for k, v in metric.items() if k != "values"} if isinstance(metric, dict) else metric
+            for component, metric in latency.items()
+        }
+    return dumps(unpack({"call_id": call_id, "latency": latency}))
+
+@router.get("/{call_id}/transcript")
+async def get_call_transcript(call_id: str, request: Request, words: bool = True):
+    """Transcript of a call; words=false drops word-level timings"""
+    stored_call = await _load_call(call_id)
+    return _etag_response(request, stored_call, ("transcript", words), lambda: _transcript_body(call_id, stored_call, words))
+
+@router.get("/{call_id}/latency")
+async def get_call_latency(call_id: str, request: Request, values: bool = False):
+    """Latency summaries of a call; values=true includes the raw per-turn samples"""
+    stored_call = await _load_call(call_id)
+    return _etag_response(request, stored_call, ("latency", values), lambda: _latency_body(call_id, stored_call, values))
+
+@router.api_route("/{call_id}/recording", methods=["GET", "HEAD"])
+async def get_call_recording(
+    call_id: str,
+    request: Request,
+    variant: Literal["recording", "recording_multi_channel", "scrubbed_recording", "scrubbed_recording_multi_channel"] = "recording"
+):
+    """Call recording served from the local cache, with Range requests for seeking.
+
+    The first request for a recording (or the call_ended prefetch) downloads
+    it from the recording host; later requests, including every seek in the
+    player, are answered from disk.
+    """
+    if settings.RECORDING_CACHE_ENABLED:
+        cached = recording_cache.lookup(call_id, variant)
+        if cached is not None:
+            return RangeFileResponse(cached.path, request.headers, cached.media_type)
+
+    stored_call = call_store.get_call(call_id)
+    url = stored_call.get(f"{variant}_url") if stored_call else None
+    if not url:
+        stored_call = await _load_call(call_id)
+        url = stored_call.get(f"{variant}_url")
+    if not url:
+        raise HTTPException(status_code=404, detail=f"No {variant.replace('_', ' ')} for this call")
+    if not recording_cache.allows(url):
+        logger.warning(f"Refusing {variant} for call {call_id}: not on an allowed recording host")
+        raise HTTPException(status_code=502, detail="Recording URL is not on an allowed recording host")
+    if not settings.RECORDING_CACHE_ENABLED:
+        return RedirectResponse(url, status_code=307)
+
+    try:
+        cached = await recording_cache.fetch(call_id, variant, url)
+    except RecordingTooLarge as e:
+        logger.info(f"Not caching {variant} for call {call_id}: {e}")
+        return RedirectResponse(url, status_code=307)
+    except RecordingNotAllowed as e:
+        logger.warning(f"Refusing {variant} for call {call_id}: {e}")
+        raise HTTPException(status_code=502, detail=f"Failed to fetch recording: {e}")
+    except Exception as e:
+        logger.error(f"Failed to download {variant} for call {call_id}: {e}")
+        raise HTTPException(status_code=502, detail=f"Failed to fetch recording: {str(e)}")
+    return RangeFileResponse(cached.path, request.headers, cached.media_type)
+
+@router.get("/{call_id}", response_model=CallStatus)
+async def get_call_status(
+    call_id: str,
+    request: Request,
+    view: Literal["full", "summary"] = "full",
+    fields: Optional[str] = Query(None, description="Comma-separated CallStatus fields to return (plus has_analysis)")
+):
+    """Get call status and analysis.
+
+    view=summary returns only status, timing and has_analysis, and fields=
+    picks specific fields; both skip the transcript and latency payloads.
+    Responses carry an ETag and honor If-None-Match with 304.
+    """
+    try:
+        logger.info(f"Getting status for call: {call_id}")
+
+        names = _parse_fields(fields.split(",")) if fields else []
+        stored_call = await _load_call(call_id)
+
+        if names:
+            render = lambda: dumps(_select_fields(call_id, stored_call, names))
+        elif view == "summary":
+            render = lambda: dumps(_select_fields(call_id, stored_call, [*SUMMARY_FIELDS, "has_analysis"]))
+        else:
+            render = lambda: _call_status(call_id, stored_call).model_dump_json().encode("utf-8")
+        return _etag_response(request, stored_call, ("status", view, tuple(names)), render)
+
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get call status: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to get call status: {str(e)}")
+
+def _batch_error(call_id: str, error: Exception) -> Dict[str, Any]:
+    status_code, detail = _fetch_error(error)
+    return {"call_id": call_id, "status_code": status_code, "detail": detail}
+
+@router.post("/batch", response_model=BatchCallResponse)
+async def get_calls_batch(request: BatchCallRequest):
+    """Status for many calls in one request.
+
+    Calls that are final in the call store (ended with analysis, or errored)
+    are answered directly. The rest go through the call cache, with at most
+    CALL_BATCH_CONCURRENCY Retell fetches in flight; if a fetch fails the
+    stored copy is returned when there is one. Calls that cannot be found are
+    listed in errors with their own status code instead of failing the batch.
+    Defaults to view=summary.
+    """
+    call_ids = list(dict.fromkeys(request.call_ids))
+    if not call_ids:
+        raise HTTPException(status_code=400, detail="No call IDs given")
+    if len(call_ids) > settings.CALL_BATCH_MAX_IDS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {settings.CALL_BATCH_MAX_IDS} call IDs")
+    names = _parse_fields(request.fields) if request.fields else []
+
+    stored: Dict[str, Optional[Dict[str, Any]]] = {}
+    to_refresh: List[str] = []
+    for call_id in call_ids:
+        stored[call_id] = call_store.get_call(call_id)
+        if stored[call_id] is None:
+            call_cache.invalidate(call_id)
+        final = stored[call_id] is not None and call_cache.ttl_for(stored[call_id]) is None
+        if not final and not (retell_client.circuit_open and stored[call_id] is not None):
+            to_refresh.append(call_id)
+
+    semaphore = asyncio.Semaphore(max(1, settings.CALL_BATCH_CONCURRENCY))
+    failures: Dict[str, Exception] = {}
+
+    async def refresh(call_id: str) -> None:
+        async with semaphore:
+            try:
+                await call_cache.get(call_id, lambda: _refresh_call_from_retell(call_id))
+            except Exception as e:
+                failures[call_id] = e
+            else:
+                stored[call_id] = call_store.get_call(call_id)
+
+    if to_refresh:
+        logger.info(f"Batch lookup of {len(call_ids)} calls, refreshing {len(to_refresh)}")
+        await asyncio.gather(*(refresh(call_id) for call_id in to_refresh))
+
+    calls: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for call_id in call_ids:
+        stored_call = stored[call_id]
+        if stored_call is None:
+            error = failures.get(call_id)
+            errors.append(_batch_error(call_id, error) if error else {"call_id": call_id, "status_code": 404, "detail": "Call not found"})
+        elif names:
+            calls.append(_select_fields(call_id, stored_call, names))
+        elif request.view == "summary":
+            calls.append(_select_fields(call_id, stored_call, [*SUMMARY_FIELDS, "has_analysis"]))
+        else:
+            calls.append(_call_status(call_id, stored_call).model_dump(mode="json"))
+
+    return Response(
+        content=dumps({
+            "calls": calls,
+            "errors": errors,
+            "from_store": len(call_ids) - len(to_refresh),
+            "refreshed": len(to_refresh),
+        }),
+        media_type="application/json"
+    )
@@ -0,0 +1,81 @@
+import codecs
+import csv
+import logging
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from ..campaigns import CampaignItem, campaign_manager
+from ..config import settings
+from ..models.schemas import CampaignProgress, CreateCampaignRequest
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/campaigns", tags=["campaigns"])
+
+def _check_size(count: int) -> None:
+    if count == 0:
+        raise HTTPException(status_code=400, detail="Campaign has no calls")
+    if count > settings.CAMPAIGN_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Campaign exceeds {settings.CAMPAIGN_MAX_ITEMS} calls")
+
+def _start(items: List[CampaignItem], concurrency: Optional[int], rate_per_second: Optional[float]) -> CampaignProgress:
+    campaign = campaign_manager.create(
+        items,
+        concurrency=concurrency or settings.CAMPAIGN_DEFAULT_CONCURRENCY,
+        rate_per_second=rate_per_second if rate_per_second is not None else settings.CAMPAIGN_DEFAULT_RATE
+    )
+    return CampaignProgress(**campaign.progress())
+
+@router.post("/", response_model=CampaignProgress)
+async def create_campaign(request: CreateCampaignRequest):
+    """Start dialing a list of outbound calls"""
+    _check_size(len(request.calls))
+    items = [
+        CampaignItem(index=index, to_number=call.to_number, dynamic_variables=call.dynamic_variables)
+        for index, call in enumerate(request.calls)
+    ]
+    return _start(items, request.concurrency, request.rate_per_second)
+
+@router.post("/csv", response_model=CampaignProgress)
+async def create_campaign_from_csv(
+    file: UploadFile = File(...),
+    concurrency: Optional[int] = Form(None, ge=1, le=settings.CAMPAIGN_MAX_CONCURRENCY),
+    rate_per_second: Optional[float] = Form(None, gt=0, le=settings.CAMPAIGN_MAX_RATE)
+):
+    """Start a campaign from a CSV with a to_number column; other columns become dynamic variables"""
+    reader = csv.DictReader(codecs.iterdecode(file.file, "utf-8-sig"))
+    if not reader.fieldnames or "to_number" not in reader.fieldnames:
+        raise HTTPException(status_code=400, detail="CSV must have a to_number column")
+
+    items: List[CampaignItem] = []
+    for row in reader:
+        to_number = (row.pop("to_number") or "").strip()
+        if not to_number:
+            continue
+        dynamic_variables = {key: value for key, value in row.items() if key and value not in (None, "")}
+        items.append(CampaignItem(index=len(items), to_number=to_number, dynamic_variables=dynamic_variables or None))
+        if len(items) > settings.CAMPAIGN_MAX_ITEMS:
+            break
+
+    _check_size(len(items))
+    return _start(items, concurrency, rate_per_second)
+
+@router.get("/", response_model=List[CampaignProgress])
+async def list_campaigns():
+    """Progress of recent campaigns, newest first"""
+    return [CampaignProgress(**campaign.progress()) for campaign in campaign_manager.list()]
+
+@router.get("/{campaign_id}", response_model=CampaignProgress)
+async def get_campaign(campaign_id: str, include_items: bool = False):
+    """Campaign progress, optionally with per-call results"""
+    campaign = campaign_manager.get(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return CampaignProgress(**campaign.progress(include_items=include_items))
+
+@router.post("/{campaign_id}/cancel", response_model=CampaignProgress)
+async def cancel_campaign(campaign_id: str):
+    """Stop dialing; calls already placed are not affected"""
+    campaign = campaign_manager.cancel(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return CampaignProgress(**campaign.progress())
@@ -0,0 +1,62 @@
+import logging
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from ..export import FORMATS, arrow_available, export_calls, iter_store_calls, iter_upstream_calls
+from ..resilience import CircuitOpenError
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+async def _started(calls: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    """Read the first record before responding, so a failing source is an HTTP error rather than a truncated file"""
+    try:
+        first = await calls.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=f"Retell API unavailable: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Failed to read calls: {str(e)}")
+
+    async def rest() -> AsyncIterator[Dict[str, Any]]:
+        if first is None:
+            return
+        yield first
+        async for call in calls:
+            yield call
+    return rest()
+
+@router.get("/calls")
+async def export_call_records(
+    format: Literal["ndjson", "csv", "parquet", "arrow"] = "ndjson",
+    start_after: Optional[int] = Query(None, description="Earliest start_timestamp (ms)"),
+    start_before: Optional[int] = Query(None, description="Latest start_timestamp (ms)"),
+    agent_id: Optional[List[str]] = Query(None),
+    status: Optional[List[str]] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated fields; dotted paths such as call_analysis.call_summary reach into nested objects"),
+    source: Literal["local", "upstream"] = "local",
+    page_size: int = Query(100, ge=1, le=1000)
+):
+    """Stream call records as NDJSON, CSV (flattened), Parquet or an Arrow IPC stream.
+
+    Records are read one page at a time from the call store, or from Retell's
+    list-calls with source=upstream, and written as they arrive, so memory
+    stays flat regardless of the size of the export.
+    """
+    if format in ("parquet", "arrow") and not arrow_available():
+        raise HTTPException(status_code=400, detail=f"{format} export requires the 'pyarrow' package on the server")
+    names = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+
+    iterate = iter_upstream_calls if source == "upstream" else iter_store_calls
+    calls = await _started(iterate(start_after=start_after, start_before=start_before, agent_id=agent_id, status=status, page_size=page_size))
+    media_type, extension = FORMATS[format]
+    filename = f"calls-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{extension}"
+    logger.info(f"Exporting calls as {format} from {source} (start_after={start_after}, start_before={start_before})")
+    return StreamingResponse(
+        export_calls(format, calls, names),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,26 @@
+import logging
+from fastapi import APIRouter, HTTPException, Query
+from ..config import settings
+from ..search import transcript_index
+from typing import Any, Dict, List, Literal, Optional
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+@router.get("/transcripts")
+async def search_transcripts(
+    q: str = Query(..., min_length=1, description='Words to match; wrap phrases in double quotes, e.g. "main street"'),
+    role: Optional[Literal["agent", "user"]] = None,
+    agent_id: Optional[List[str]] = Query(None),
+    limit: int = Query(20, ge=1, le=200),
+    max_hits: int = Query(5, ge=1, le=100)
+) -> Dict[str, Any]:
+    """Find calls whose transcript contains every word and phrase in q.
+
+    Each hit reports the utterance it was found in and, when word timings are
+    available, its start/end offsets (seconds) into the recording.
+    """
+    if not settings.SEARCH_INDEX_ENABLED:
+        raise HTTPException(status_code=503, detail="Transcript search is disabled")
+    return transcript_index.search(q, role=role, agent_id=agent_id, limit=limit, max_hits=max_hits)
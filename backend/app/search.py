@@ -0,0 +1,279 @@
+import hashlib
+import logging
+import re
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from .config import settings
+from .store import call_store
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z0-9]+)*")
+QUERY_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+@dataclass
+class Utterance:
+    role: str
+    content: str
+    tokens: List[str]
+    starts: List[Optional[float]]
+    ends: List[Optional[float]]
+
+def _utterance(item: Dict[str, Any]) -> Utterance:
+    """One transcript_object entry with per-token timings"""
+    words = item.get("words") or []
+    tokens: List[str] = []
+    starts: List[Optional[float]] = []
+    ends: List[Optional[float]] = []
+    if words:
+        for word in words:
+            for token in tokenize(word.get("word") or ""):
+                tokens.append(token)
+                starts.append(word.get("start"))
+                ends.append(word.get("end"))
+    else:
+        tokens = tokenize(item.get("content") or "")
+        starts = ends = [None] * len(tokens)
+    return Utterance((item.get("role") or "").lower(), item.get("content") or "", tokens, starts, ends)
+
+def _utterances(call: Dict[str, Any]) -> List[Utterance]:
+    """Split a stored call's transcript into utterances with per-token timings"""
+    transcript_object = call.get("transcript_object") or []
+    utterances = [_utterance(item) for item in transcript_object]
+    if utterances or not call.get("transcript"):
+        return utterances
+
+    # Only the flat "Agent: ... / User: ..." transcript is available
+    for line in call["transcript"].splitlines():
+        speaker, sep, content = line.partition(":")
+        role = speaker.strip().lower() if sep and speaker.strip().lower() in ("agent", "user") else ""
+        text = content if role else line
+        tokens = tokenize(text)
+        if tokens:
+            utterances.append(Utterance(role, text.strip(), tokens, [None] * len(tokens), [None] * len(tokens)))
+    return utterances
+
+def _utterance_at(call: Dict[str, Any], u_index: int) -> Optional[Utterance]:
+    """The u_index-th utterance of _utterances(call), without splitting the rest"""
+    transcript_object = call.get("transcript_object") or []
+    if transcript_object:
+        return _utterance(transcript_object[u_index]) if u_index < len(transcript_object) else None
+    utterances = _utterances(call)
+    return utterances[u_index] if u_index < len(utterances) else None
+
+def _digest(call: Dict[str, Any]) -> Optional[str]:
+    source = call.get("transcript_object") or call.get("transcript")
+    if not source:
+        return None
+    if isinstance(source, list):
+        source = "\n".join(f"{item.get('role')}:{item.get('content')}" for item in source)
+    return hashlib.blake2b(source.encode("utf-8"), digest_size=16).hexdigest()
+
+# Postings pack (utterance index, token position) into one unsigned 64-bit int
+POSITION_BITS = 32
+POSITION_MASK = (1 << POSITION_BITS) - 1
+
+class TranscriptIndex:
+    """In-memory inverted index over call transcripts.
+
+    Postings map each token to the packed (utterance, position) pairs it
+    occurs at in every call, so single terms are answered straight from the
+    index and phrases only verify the calls that contain their rarest token,
+    by looking up the neighbouring positions. No transcript text is kept:
+    the few calls a query returns are read back through lookup for their hit
+    content and word timings. Calls are re-indexed when their transcript
+    changes (e.g. call_analyzed after call_ended) and dropped when the store
+    evicts or deletes them.
+    """
+
+    def __init__(self, lookup: Callable[[str], Optional[Dict[str, Any]]]):
+        self.lookup = lookup
+        self._postings: Dict[str, Dict[str, array]] = {}
+        # Per call: its distinct tokens (to unlink postings) and each utterance's role
+        self._terms: Dict[str, Tuple[str, ...]] = {}
+        self._roles: Dict[str, Tuple[str, ...]] = {}
+        self._digests: Dict[str, str] = {}
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        self._stats = {"indexed": 0, "reindexed": 0, "removed": 0, "queries": 0}
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def index_call(self, call: Optional[Dict[str, Any]]) -> bool:
+        """Index (or re-index) a call's transcript; returns False if unchanged"""
+        if not settings.SEARCH_INDEX_ENABLED or not call or not call.get("call_id"):
+            return False
+        call_id = call["call_id"]
+        digest = _digest(call)
+        if digest is None or self._digests.get(call_id) == digest:
+            return False
+        if call_id in self._terms:
+            self._unlink(call_id)
+            self._stats["reindexed"] += 1
+
+        utterances = _utterances(call)
+        postings: Dict[str, array] = {}
+        for u_index, utterance in enumerate(utterances):
+            base = u_index << POSITION_BITS
+            for position, token in enumerate(utterance.tokens):
+                entry = postings.get(token)
+                if entry is None:
+                    entry = postings[sys.intern(token)] = array("Q")
+                entry.append(base | position)
+        for token, entry in postings.items():
+            self._postings.setdefault(token, {})[call_id] = entry
+        self._terms[call_id] = tuple(postings)
+        self._roles[call_id] = tuple(sys.intern(utterance.role) for utterance in utterances)
+        self._digests[call_id] = digest
+        self._meta[call_id] = {
+            "agent_id": call.get("agent_id"),
+            "start_timestamp": call.get("start_timestamp"),
+        }
+        self._stats["indexed"] += 1
+        return True
+
+    def _unlink(self, call_id: str) -> None:
+        for token in self._terms.pop(call_id, ()):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(call_id, None)
+                if not postings:
+                    del self._postings[token]
+        self._roles.pop(call_id, None)
+        self._digests.pop(call_id, None)
+        self._meta.pop(call_id, None)
+
+    def remove_call(self, call_id: str) -> None:
+        """Drop a call from the index (e.g. when the store evicts or deletes it)"""
+        if call_id in self._terms:
+            self._unlink(call_id)
+            self._stats["removed"] += 1
+
+    def clear(self) -> None:
+        """Drop every indexed call"""
+        self._postings.clear()
+        self._terms.clear()
+        self._roles.clear()
+        self._digests.clear()
+        self._meta.clear()
+
+    def rebuild(self, calls: Iterable[Dict[str, Any]]) -> None:
+        """Re-index every stored call"""
+        started = time.monotonic()
+        self.clear()
+        for call in calls:
+            self.index_call(call)
+        logger.info(f"Indexed {len(self._terms)} transcripts in {round((time.monotonic() - started) * 1000, 3)}ms")
+
+    @staticmethod
+    def parse_query(query: str) -> List[List[str]]:
+        """Split a query into phrases ("quoted words") and single terms"""
+        clauses = []
+        for phrase, term in QUERY_RE.findall(query):
+            tokens = tokenize(phrase or term)
+            if tokens:
+                clauses.append(tokens)
+        return clauses
+
+    def _phrase_hits(self, call_id: str, phrase: List[str], role: Optional[str]) -> List[Tuple[int, int]]:
+        """(utterance, start position) of each occurrence of phrase in a call"""
+        # Anchor on the rarest token, then look its neighbours up in their postings
+        anchor = min(range(len(phrase)), key=lambda i: len(self._postings[phrase[i]][call_id]))
+        neighbours = [
+            (offset - anchor, set(self._postings[token][call_id]))
+            for offset, token in enumerate(phrase) if offset != anchor
+        ]
+        roles = self._roles[call_id]
+        hits = []
+        for posting in self._postings[phrase[anchor]][call_id]:
+            u_index, position = posting >> POSITION_BITS, posting & POSITION_MASK
+            if role and roles[u_index] != role:
+                continue
+            if position >= anchor and all(posting + delta in positions for delta, positions in neighbours):
+                hits.append((u_index, position - anchor))
+        return hits
+
+    def search(
+        self,
+        query: str,
+        role: Optional[str] = None,
+        agent_id: Optional[List[str]] = None,
+        limit: int = 20,
+        max_hits: int = 5
+    ) -> Dict[str, Any]:
+        """Calls matching every clause of the query, most hits first"""
+        self._stats["queries"] += 1
+        clauses = self.parse_query(query)
+        if not clauses:
+            return {"total": 0, "results": []}
+
+        candidates: Optional[Set[str]] = None
+        for clause in sorted(clauses, key=lambda c: min(len(self._postings.get(t, {})) for t in c)):
+            for token in clause:
+                calls = set(self._postings.get(token, {}))
+                candidates = calls if candidates is None else candidates & calls
+                if not candidates:
+                    return {"total": 0, "results": []}
+        if agent_id:
+            candidates = {c for c in candidates or () if self._meta[c].get("agent_id") in agent_id}
+
+        matches = []
+        for call_id in candidates or ():
+            hits: List[Tuple[int, int, int]] = []
+            for clause in clauses:
+                clause_hits = self._phrase_hits(call_id, clause, role)
+                if not clause_hits:
+                    break
+                hits.extend((u_index, start, len(clause)) for u_index, start in clause_hits)
+            else:
+                matches.append((call_id, hits))
+
+        matches.sort(key=lambda m: (len(m[1]), self._meta[m[0]].get("start_timestamp") or 0), reverse=True)
+        results = []
+        for call_id, hits in matches[:limit]:
+            results.append({
+                "call_id": call_id,
+                "agent_id": self._meta[call_id].get("agent_id"),
+                "start_timestamp": self._meta[call_id].get("start_timestamp"),
+                "hit_count": len(hits),
+                "hits": self._hits(call_id, sorted(hits)[:max_hits]),
+            })
+        return {"total": len(matches), "results": results}
+
+    def _hits(self, call_id: str, hits: List[Tuple[int, int, int]]) -> List[Dict[str, Any]]:
+        """Hit text, content and word timings, read back from the stored call"""
+        call = self.lookup(call_id) or {}
+        utterances: Dict[int, Optional[Utterance]] = {}
+        results = []
+        for u_index, start, length in hits:
+            if u_index not in utterances:
+                utterances[u_index] = _utterance_at(call, u_index)
+            utterance = utterances[u_index]
+            if utterance is None:
+                continue
+            results.append({
+                "utterance_index": u_index,
+                "role": utterance.role,
+                "text": " ".join(utterance.tokens[start:start + length]),
+                "content": utterance.content,
+                "word_index": start,
+                "start": utterance.starts[start],
+                "end": utterance.ends[start + length - 1],
+            })
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["calls"] = len(self._terms)
+        stats["terms"] = len(self._postings)
+        stats["enabled"] = settings.SEARCH_INDEX_ENABLED
+        return stats
+
+# Global transcript index
+transcript_index = TranscriptIndex(call_store.get_call)
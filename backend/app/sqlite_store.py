@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from .call_state import fill_missing, is_status_regression
+from .jsonutil import loads
+from .store import CallQuery, CallStore, encode_call, sort_key
+
+logger = logging.getLogger(__name__)
+
+# Columns pulled out of the JSON document so they can be indexed and filtered
+INDEXED_COLUMNS = ("call_status", "start_timestamp", "agent_id", "to_number", "direction")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    call_id TEXT PRIMARY KEY,
+    call_status TEXT,
+    start_timestamp INTEGER,
+    agent_id TEXT,
+    to_number TEXT,
+    direction TEXT,
+    has_analysis INTEGER NOT NULL DEFAULT 0,
+    sort_ts INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_calls_status ON calls (call_status);
+CREATE INDEX IF NOT EXISTS idx_calls_start ON calls (start_timestamp);
+CREATE INDEX IF NOT EXISTS idx_calls_agent ON calls (agent_id);
+CREATE INDEX IF NOT EXISTS idx_calls_to_number ON calls (to_number);
+CREATE INDEX IF NOT EXISTS idx_calls_sort ON calls (sort_ts DESC, call_id DESC);
+"""
+
+def merge_changes(current: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply one worker's buffered changes onto a call as stored by any worker.
+
+    Changes from an older lifecycle event than the row has seen only fill in
+    missing fields, and neither event_rank nor call_status ever moves backwards.
+    """
+    merged = dict(current)
+    stored_rank = current.get("event_rank", 0)
+    if changes.get("event_rank", stored_rank) < stored_rank:
+        # Another worker has already applied a later webhook for this call
+        merged.update(fill_missing(current, {k: v for k, v in changes.items() if k not in ("call_status", "event_rank")}))
+        merged["updated_at"] = changes["updated_at"]
+    else:
+        merged.update(changes)
+    status = changes.get("call_status")
+    if status is not None and is_status_regression(current.get("call_status"), status):
+        merged["call_status"] = current["call_status"]
+    elif status is not None:
+        merged["call_status"] = status
+    return merged
+
+class SQLiteCallStore(CallStore):
+    """Persistent call store backed by SQLite in WAL mode.
+
+    Writes are merged into an in-process buffer and flushed in a single
+    transaction once batch_size records are dirty or every flush_interval
+    seconds, whichever comes first. Reads check the buffer before the database
+    so callers always see their own writes. Several processes can share one
+    database file; each sees the others' writes once they are flushed.
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, flush_interval: float = 0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        # Merged view of buffered calls for reads, and the raw changes to apply on flush
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._changes: Dict[str, Dict[str, Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_error: Optional[str] = None
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(calls)")}
+        if "has_analysis" not in columns:
+            self._conn.execute("ALTER TABLE calls ADD COLUMN has_analysis INTEGER NOT NULL DEFAULT 0")
+
+    def _load(self, call_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT data FROM calls WHERE call_id = ?", (call_id,)).fetchone()
+        return loads(row[0]) if row else None
+
+    def update_call(self, call_id: str, data: Dict[str, Any]) -> None:
+        """Merge data into the write buffer"""
+        with self._lock:
+            current = self._pending.get(call_id)
+            if current is None:
+                current = self._load(call_id) or {"call_id": call_id}
+                self._pending[call_id] = current
+            current.update(data)
+            current["updated_at"] = datetime.utcnow()
+            changes = self._changes.setdefault(call_id, {})
+            changes.update(data)
+            changes["updated_at"] = current["updated_at"]
+            should_flush = len(self._pending) >= self.batch_size
+        if should_flush:
+            self.flush()
+
+    def get_call(self, call_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            pending = self._pending.get(call_id)
+            if pending is not None:
+                return pending
+            return self._load(call_id)
+
+    def delete_call(self, call_id: str) -> None:
+        with self._lock:
+            self._pending.pop(call_id, None)
+            self._changes.pop(call_id, None)
+            self._conn.execute("DELETE FROM calls WHERE call_id = ?", (call_id,))
+        self._removed(call_id)
+
+    def flush(self) -> None:
+        """Write all buffered changes in one transaction.
+
+        Each buffered change set is merged onto the row as it is inside the
+        write transaction, so another process writing other fields of the same
+        call between our read and our flush does not have its update lost, and
+        a later lifecycle event it applied is never rolled back (see merge_changes).
+        """
+        with self._lock:
+            if not self._changes:
+                return
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                rows = []
+                for call_id, changes in self._changes.items():
+                    data = merge_changes(self._load(call_id) or {"call_id": call_id}, changes)
+                    rows.append((
+                        call_id,
+                        *(data.get(column) for column in INDEXED_COLUMNS),
+                        1 if data.get("call_analysis") else 0,
+                        sort_key(data)[0],
+                        data["updated_at"].isoformat() if isinstance(data.get("updated_at"), datetime) else data.get("updated_at"),
+                        encode_call(data),
+                    ))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO calls "
+                    "(call_id, call_status, start_timestamp, agent_id, to_number, direction, has_analysis, sort_ts, updated_at, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception as e:
+                self._conn.execute("ROLLBACK")
+                self._flush_error = str(e)
+                raise
+            self._flush_error = None
+            self._pending.clear()
+            self._changes.clear()
+
+    def iter_calls(self) -> Iterator[Dict[str, Any]]:
+        self.flush()
+        cursor = self._conn.execute("SELECT data FROM calls ORDER BY sort_ts DESC, call_id DESC")
+        for (data,) in cursor:
+            yield loads(data)
+
+    def _query(self, filters: CallQuery, limit: int, cursor: Optional[tuple]) -> List[Dict[str, Any]]:
+        self.flush()
+        clauses: List[str] = []
+        params: List[Any] = []
+        if filters.status:
+            clauses.append(f"call_status IN ({','.join('?' * len(filters.status))})")
+            params.extend(filters.status)
+        if filters.agent_id:
+            clauses.append(f"agent_id IN ({','.join('?' * len(filters.agent_id))})")
+            params.extend(filters.agent_id)
+        if filters.to_number:
+            clauses.append("to_number = ?")
+            params.append(filters.to_number)
+        if filters.direction:
+            clauses.append("direction = ?")
+            params.append(filters.direction)
+        if filters.start_after is not None:
+            clauses.append("start_timestamp >= ?")
+            params.append(filters.start_after)
+        if filters.start_before is not None:
+            clauses.append("start_timestamp <= ?")
+            params.append(filters.start_before)
+        if filters.has_analysis is not None:
+            clauses.append("has_analysis = ?")
+            params.append(1 if filters.has_analysis else 0)
+        if cursor is not None:
+            clauses.append("(sort_ts < ? OR (sort_ts = ? AND call_id < ?))")
+            params.extend([cursor[0], cursor[0], cursor[1]])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data FROM calls {where} ORDER BY sort_ts DESC, call_id DESC LIMIT ?",
+                params
+            ).fetchall()
+        return [loads(data) for (data,) in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM calls").fetchone()[0]
+            new = sum(1 for call_id in self._pending if self._load(call_id) is None)
+        return count + new
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {"backend": "sqlite", "path": self.path, "entries": len(self), "pending_writes": pending}
+
+    def health(self) -> Dict[str, Any]:
+        # A backlog well past one batch means flushes are failing or falling behind
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "ok": self._flush_error is None and pending < 10 * self.batch_size,
+            "pending_writes": pending,
+            "last_flush_error": self._flush_error,
+        }
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush call store: {e}")
+
+    async def start(self) -> None:
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+            logger.info(f"SQLite call store opened at {self.path}")
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self.flush()
+        self._conn.close()
@@ -1,37 +1,531 @@
-from typing import Dict, Any, Optional
+import asyncio
+import base64
+import binascii
+import bisect
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, Optional, List, Iterator, Tuple
 from datetime import datetime
+from .config import settings
+from .jsonutil import dumps, loads
+from .packing import pack_call, packed_nbytes, without_packed
 
 class CallStore:
-    def __init__(self):
-        self._calls: Dict[str, Dict[str, Any]] = {}
-    
+    """Storage interface for call data.
+
+    Implementations only need to provide the primitive operations; status and
+    analysis helpers are built on top of update_call.
+    """
+
+    _removal_listeners: Tuple[Callable[[str], None], ...] = ()
+
+    def add_removal_listener(self, listener: Callable[[str], None]) -> None:
+        """Call listener(call_id) whenever a call is evicted, expires or is deleted"""
+        self._removal_listeners += (listener,)
+
+    def _removed(self, call_id: str) -> None:
+        for listener in self._removal_listeners:
+            listener(call_id)
+
     def update_call(self, call_id: str, data: Dict[str, Any]) -> None:
-        """Update call data in memory store"""
-        if call_id not in self._calls:
-            self._calls[call_id] = {}
-        
-        self._calls[call_id].update(data)
-        self._calls[call_id]["updated_at"] = datetime.utcnow()
-    
+        """Merge data into a call record, creating it if needed"""
+        raise NotImplementedError
+
     def get_call(self, call_id: str) -> Optional[Dict[str, Any]]:
-        """Get call data from memory store"""
-        return self._calls.get(call_id)
-    
+        """Get a call record"""
+        raise NotImplementedError
+
+    def delete_call(self, call_id: str) -> None:
+        """Remove a call record"""
+        raise NotImplementedError
+
+    def iter_calls(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over all call records"""
+        raise NotImplementedError
+
+    def iter_resident_calls(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the call records held in this store itself (not spilled)"""
+        return self.iter_calls()
+
+    def query_calls(
+        self,
+        status: Optional[List[str]] = None,
+        agent_id: Optional[List[str]] = None,
+        to_number: Optional[str] = None,
+        direction: Optional[str] = None,
+        start_after: Optional[int] = None,
+        start_before: Optional[int] = None,
+        has_analysis: Optional[bool] = None,
+        limit: int = 100,
+        pagination_key: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """List calls newest first by start_timestamp, continuing after pagination_key.
+
+        pagination_key is normally one made by encode_pagination_key, which
+        carries the sort position itself, so pages keep going when that call
+        has since been evicted or deleted. A bare call ID is still accepted.
+        """
+        cursor = None
+        if pagination_key:
+            cursor = decode_pagination_key(pagination_key)
+            if cursor is None:
+                cursor_call = self._lookup(pagination_key)
+                if cursor_call is None:
+                    return []
+                cursor = sort_key(cursor_call)
+        filters = CallQuery(status, agent_id, to_number, direction, start_after, start_before, has_analysis)
+        return self._query(filters, limit, cursor)
+
+    def _lookup(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """Read a call without side effects such as LRU promotion"""
+        return self.get_call(call_id)
+
+    def _query(self, filters: "CallQuery", limit: int, cursor: Optional[tuple]) -> List[Dict[str, Any]]:
+        """Return up to limit matching calls ordered by sort_key descending, strictly below cursor"""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
     def set_call_analysis(self, call_id: str, analysis: Dict[str, Any]) -> None:
         """Set call analysis data"""
-        if call_id not in self._calls:
-            self._calls[call_id] = {}
-        
-        self._calls[call_id]["call_analysis"] = analysis
-        self._calls[call_id]["updated_at"] = datetime.utcnow()
-    
+        self.update_call(call_id, {"call_analysis": analysis})
+
     def set_call_status(self, call_id: str, status: str) -> None:
         """Set call status"""
+        self.update_call(call_id, {"call_status": status})
+
+    def flush(self) -> None:
+        """Persist any buffered writes"""
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and housekeeping counters"""
+        return {"entries": len(self)}
+
+    def health(self) -> Dict[str, Any]:
+        """Cheap saturation check for readiness probes; "ok" is False when writes are at risk"""
+        return {"ok": True}
+
+    async def start(self) -> None:
+        """Start background work (called on application startup)"""
+
+    async def close(self) -> None:
+        """Flush and release resources (called on application shutdown)"""
+        self.flush()
+
+def sort_key(call: Dict[str, Any]) -> tuple:
+    """Newest-first ordering key shared by store implementations"""
+    return (call.get("start_timestamp") or call.get("end_timestamp") or 0, call.get("call_id") or "")
+
+# Marks pagination keys made by encode_pagination_key, as opposed to bare call IDs
+PAGINATION_KEY_PREFIX = "pk1."
+
+def encode_pagination_key(call: Dict[str, Any]) -> str:
+    """Opaque key for the page after call: its sort position, not a reference to the call"""
+    encoded = base64.urlsafe_b64encode(dumps(list(sort_key(call)))).decode("ascii")
+    return PAGINATION_KEY_PREFIX + encoded.rstrip("=")
+
+def decode_pagination_key(key: str) -> Optional[tuple]:
+    """Sort position in a key from encode_pagination_key, or None for a bare call ID.
+
+    Raises ValueError for a malformed key.
+    """
+    if not key.startswith(PAGINATION_KEY_PREFIX):
+        return None
+    encoded = key[len(PAGINATION_KEY_PREFIX):]
+    try:
+        position = loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid pagination_key")
+    if not (isinstance(position, list) and len(position) == 2 and isinstance(position[0], (int, float)) and isinstance(position[1], str)):
+        raise ValueError("Invalid pagination_key")
+    return tuple(position)
+
+@dataclass
+class CallQuery:
+    status: Optional[List[str]] = None
+    agent_id: Optional[List[str]] = None
+    to_number: Optional[str] = None
+    direction: Optional[str] = None
+    start_after: Optional[int] = None
+    start_before: Optional[int] = None
+    has_analysis: Optional[bool] = None
+
+    def matches(self, call: Dict[str, Any]) -> bool:
+        if self.status and call.get("call_status") not in self.status:
+            return False
+        if self.agent_id and call.get("agent_id") not in self.agent_id:
+            return False
+        if self.to_number and call.get("to_number") != self.to_number:
+            return False
+        if self.direction and call.get("direction") != self.direction:
+            return False
+        start = call.get("start_timestamp")
+        if self.start_after is not None and (start is None or start < self.start_after):
+            return False
+        if self.start_before is not None and (start is None or start > self.start_before):
+            return False
+        if self.has_analysis is not None and bool(call.get("call_analysis")) != self.has_analysis:
+            return False
+        return True
+
+HOT_STATUSES = ("created", "registered", "ongoing")
+
+def encode_call(data: Dict[str, Any]) -> str:
+    """Serialize a call record to compact JSON"""
+    return dumps(data).decode("utf-8")
+
+def is_hot(call: Dict[str, Any]) -> bool:
+    """Calls still in progress are hot; finished calls are cold"""
+    return call.get("call_status", "created") in HOT_STATUSES
+
+class InMemoryCallStore(CallStore):
+    """Memory-bounded call store with LRU/TTL eviction.
+
+    Entries are kept in least-recently-used order with an estimated byte size.
+    When max_entries or max_bytes is exceeded, cold (finished) calls are
+    evicted first; hot calls are only evicted once they have gone hot_ttl
+    seconds without an update. Cold calls untouched for cold_ttl seconds
+    expire. Evicted calls are written to the optional spill store and
+    transparently promoted back on the next read.
+
+    With pack enabled, word timings and latency samples are held in typed
+    arrays (see app.packing) rather than lists of dicts and floats.
+
+    An attached journal (see app.eventlog) is told about every change, so
+    the contents can be rebuilt after a restart.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 0,
+        max_bytes: int = 0,
+        cold_ttl: float = 0,
+        hot_ttl: float = 0,
+        spill: Optional[CallStore] = None,
+        pack: bool = False
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cold_ttl = cold_ttl
+        self.hot_ttl = hot_ttl
+        self.spill = spill
+        self.pack = pack
+        self.journal: Optional[Any] = None
+        self._calls: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._touched: Dict[str, float] = {}
+        # Ascending (sort_key, ...) index so newest-first pages don't re-sort the store
+        self._order: List[tuple] = []
+        self._order_keys: Dict[str, tuple] = {}
+        self._bytes = 0
+        self._sweep_task: Optional[asyncio.Task] = None
+        # While replaying, evictions come from the journal rather than the limits
+        self._replaying = False
+        self._stats = {"evictions": 0, "expired": 0, "spilled": 0, "promoted": 0}
+
+    def _reindex(self, call_id: str) -> None:
+        key = sort_key(self._calls[call_id])
+        old = self._order_keys.get(call_id)
+        if old == key:
+            return
+        if old is not None:
+            del self._order[bisect.bisect_left(self._order, old)]
+        bisect.insort(self._order, key)
+        self._order_keys[call_id] = key
+
+    def _account(self, call_id: str) -> None:
+        self._reindex(call_id)
+        call = self._calls[call_id]
+        if self.pack:
+            size = len(dumps(without_packed(call))) + packed_nbytes(call)
+        else:
+            size = len(dumps(call))
+        self._bytes += size - self._sizes.get(call_id, 0)
+        self._sizes[call_id] = size
+        self._touched[call_id] = time.monotonic()
+
+    def _remove(self, call_id: str) -> Optional[Dict[str, Any]]:
+        data = self._calls.pop(call_id, None)
+        self._bytes -= self._sizes.pop(call_id, 0)
+        self._touched.pop(call_id, None)
+        old = self._order_keys.pop(call_id, None)
+        if old is not None:
+            del self._order[bisect.bisect_left(self._order, old)]
+        return data
+
+    def _evict(self, call_id: str) -> None:
+        data = self._remove(call_id)
+        if data is not None and self.journal is not None:
+            self.journal.record_evict(call_id)
+        if data is not None:
+            self._removed(call_id)
+        if data is not None and self.spill is not None:
+            self.spill.update_call(call_id, data)
+            self._stats["spilled"] += 1
+
+    def _over_limit(self) -> bool:
+        return (
+            (self.max_entries and len(self._calls) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        )
+
+    def _enforce_limits(self) -> None:
+        if self._replaying or not self._over_limit():
+            return
+        now = time.monotonic()
+        # Oldest cold entries first, then hot entries that have stopped updating
+        for call_id in [cid for cid, call in self._calls.items() if not is_hot(call)]:
+            if not self._over_limit():
+                return
+            self._evict(call_id)
+            self._stats["evictions"] += 1
+        if self.hot_ttl:
+            for call_id in list(self._calls):
+                if not self._over_limit():
+                    return
+                if now - self._touched.get(call_id, now) > self.hot_ttl:
+                    self._evict(call_id)
+                    self._stats["evictions"] += 1
+
+    def sweep(self) -> None:
+        """Expire idle entries past their TTL"""
+        now = time.monotonic()
+        for call_id, call in list(self._calls.items()):
+            ttl = self.hot_ttl if is_hot(call) else self.cold_ttl
+            if ttl and now - self._touched.get(call_id, now) > ttl:
+                self._evict(call_id)
+                self._stats["expired"] += 1
+        self._enforce_limits()
+
+    def update_call(self, call_id: str, data: Dict[str, Any]) -> None:
+        """Update call data in memory store"""
+        updated_at = datetime.utcnow()
+        self._apply(call_id, data, updated_at)
+        if self.journal is not None:
+            self.journal.record_update(call_id, data, updated_at)
+
+    def _apply(self, call_id: str, data: Dict[str, Any], updated_at: Any) -> None:
         if call_id not in self._calls:
-            self._calls[call_id] = {}
-        
-        self._calls[call_id]["call_status"] = status
-        self._calls[call_id]["updated_at"] = datetime.utcnow()
+            self._calls[call_id] = self._promote(call_id) or {"call_id": call_id}
+
+        self._calls[call_id].update(pack_call(data) if self.pack else data)
+        self._calls[call_id]["updated_at"] = updated_at
+        self._calls.move_to_end(call_id)
+        self._account(call_id)
+        self._enforce_limits()
+
+    def replay(self, op: str, call_id: str, data: Optional[Dict[str, Any]] = None, updated_at: Any = None) -> None:
+        """Apply a change read back from the journal (detached while replaying)"""
+        self._replaying = True
+        try:
+            self._replay(op, call_id, data, updated_at)
+        finally:
+            self._replaying = False
+
+    def _replay(self, op: str, call_id: str, data: Optional[Dict[str, Any]], updated_at: Any) -> None:
+        if op == "update":
+            self._apply(call_id, data or {}, updated_at)
+        elif op == "put":
+            # Promoted from the spill store; drop any copy an earlier replayed eviction wrote there
+            if self.spill is not None:
+                self.spill.delete_call(call_id)
+            self._remove(call_id)
+            self._calls[call_id] = pack_call(data) if self.pack else data
+            self._account(call_id)
+        elif op == "restore":
+            # A call from a snapshot, which only holds calls that were in memory
+            self._calls[call_id] = pack_call(data) if self.pack else data
+            self._account(call_id)
+        elif op == "evict":
+            # The spill store normally has it already, unless its last flush was lost
+            if self.spill is not None and self.spill._lookup(call_id) is not None:
+                self._remove(call_id)
+            else:
+                self._evict(call_id)
+        elif op == "delete":
+            self.delete_call(call_id)
+
+    def snapshot_calls(self) -> List[Dict[str, Any]]:
+        """Shallow copies of the calls held in memory, least recently used first.
+
+        Updates replace field values rather than mutating them, so the copies
+        stay consistent while they are serialized off the event loop.
+        """
+        return [dict(call) for call in self._calls.values()]
+
+    def _promote(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """Pull a spilled call back into memory"""
+        if self.spill is None:
+            return None
+        data = self.spill.get_call(call_id)
+        if data is not None:
+            self.spill.delete_call(call_id)
+            self._stats["promoted"] += 1
+            if self.journal is not None:
+                # The spill store no longer has it; the journal must
+                self.journal.record_put(call_id, data)
+            if self.pack:
+                data = pack_call(data)
+        return data
+
+    def get_call(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """Get call data from memory store"""
+        data = self._calls.get(call_id)
+        if data is not None:
+            self._calls.move_to_end(call_id)
+            return data
+        data = self._promote(call_id)
+        if data is not None:
+            self._calls[call_id] = data
+            self._account(call_id)
+            self._enforce_limits()
+        return data
+
+    def delete_call(self, call_id: str) -> None:
+        self._remove(call_id)
+        if self.spill is not None:
+            self.spill.delete_call(call_id)
+        if self.journal is not None:
+            self.journal.record_delete(call_id)
+        self._removed(call_id)
+
+    def iter_calls(self) -> Iterator[Dict[str, Any]]:
+        yield from list(self._calls.values())
+        if self.spill is not None:
+            yield from self.spill.iter_calls()
+
+    def iter_resident_calls(self) -> Iterator[Dict[str, Any]]:
+        yield from list(self._calls.values())
+
+    def _lookup(self, call_id: str) -> Optional[Dict[str, Any]]:
+        data = self._calls.get(call_id)
+        if data is None and self.spill is not None:
+            data = self.spill._lookup(call_id)
+        return data
+
+    def _query(self, filters: CallQuery, limit: int, cursor: Optional[tuple]) -> List[Dict[str, Any]]:
+        results = []
+        position = bisect.bisect_left(self._order, cursor) if cursor is not None else len(self._order)
+        for index in range(position - 1, -1, -1):
+            call = self._calls[self._order[index][1]]
+            if filters.matches(call):
+                results.append(call)
+                if len(results) >= limit:
+                    break
+        if self.spill is not None:
+            spilled = self.spill._query(filters, limit, cursor)
+            results = sorted(results + spilled, key=sort_key, reverse=True)[:limit]
+        return results
+
+    def __len__(self) -> int:
+        return len(self._calls) + (len(self.spill) if self.spill is not None else 0)
+
+    def stats(self) -> Dict[str, Any]:
+        hot = sum(1 for call in self._calls.values() if is_hot(call))
+        stats: Dict[str, Any] = dict(self._stats)
+        stats.update({
+            "backend": "memory",
+            "entries": len(self._calls),
+            "hot_entries": hot,
+            "cold_entries": len(self._calls) - hot,
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "spilled_entries": len(self.spill) if self.spill is not None else 0,
+        })
+        return stats
+
+    def health(self) -> Dict[str, Any]:
+        # Over a limit after eviction means in-progress calls alone fill the store
+        return {
+            "ok": not self._over_limit(),
+            "entries": len(self._calls),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(60)
+            self.sweep()
+
+    async def start(self) -> None:
+        if self.spill is not None:
+            await self.spill.start()
+        if (self.cold_ttl or self.hot_ttl) and self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._sweep_loop())
+
+    async def close(self) -> None:
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            self._sweep_task = None
+        if self.spill is not None:
+            await self.spill.close()
+
+def create_call_store(backend: str = "memory") -> CallStore:
+    """Build the configured store backend"""
+    if backend == "memory":
+        spill = None
+        if settings.CALL_STORE_SPILL_PATH:
+            from .sqlite_store import SQLiteCallStore
+            spill = SQLiteCallStore(settings.CALL_STORE_SPILL_PATH)
+        return InMemoryCallStore(
+            max_entries=settings.CALL_STORE_MAX_ENTRIES,
+            max_bytes=settings.CALL_STORE_MAX_BYTES,
+            cold_ttl=settings.CALL_STORE_COLD_TTL,
+            hot_ttl=settings.CALL_STORE_HOT_TTL,
+            spill=spill,
+            pack=settings.CALL_STORE_PACK
+        )
+    if backend == "sqlite":
+        from .sqlite_store import SQLiteCallStore
+        return SQLiteCallStore(
+            settings.CALL_STORE_PATH,
+            batch_size=settings.CALL_STORE_BATCH_SIZE,
+            flush_interval=settings.CALL_STORE_FLUSH_INTERVAL
+        )
+    raise ValueError(f"Unknown CALL_STORE_BACKEND: {backend}")
+
+# Fields copied from a Retell call object into the store on each upstream refresh.
+# The raw object itself is not kept; these fields are everything the API serves.
+RETELL_CALL_FIELDS = (
+    "agent_id",
+    "direction",
+    "from_number",
+    "to_number",
+    "duration_ms",
+    "agent_name",
+    "start_timestamp",
+    "end_timestamp",
+    "disconnection_reason",
+    "recording_url",
+    "recording_multi_channel_url",
+    "scrubbed_recording_url",
+    "scrubbed_recording_multi_channel_url",
+    "public_log_url",
+    "knowledge_base_retrieved_contents_url",
+    "latency",
+    "call_cost",
+    "llm_token_usage",
+    "transcript_object",
+    "transcript_with_tool_calls",
+    "retell_llm_dynamic_variables",
+    "collected_dynamic_variables",
+)
+
+def retell_call_fields(retell_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a Retell call object onto the fields kept in the store"""
+    fields = {
+        "call_id": retell_data.get("call_id"),
+        "call_status": retell_data.get("call_status", "unknown"),
+        "transcript": retell_data.get("transcript", ""),
+    }
+    for field in RETELL_CALL_FIELDS:
+        fields[field] = retell_data.get(field)
+    return fields
 
 # Global store instance
-call_store = CallStore()
\ No newline at end of file
+call_store = create_call_store(settings.CALL_STORE_BACKEND)
@@ -0,0 +1,261 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from . import analytics
+from .cache import call_cache
+from .call_state import is_status_regression
+from .config import settings
+from .coordination import Lease, LocalLease, event_broker
+from .events import event_bus, call_event
+from .retell_client import retell_client
+from .search import transcript_index
+from .store import HOT_STATUSES, InMemoryCallStore, call_store, retell_call_fields
+
+logger = logging.getLogger(__name__)
+
+def apply_retell_call(retell_data: Dict[str, Any]) -> None:
+    """Upsert a Retell call object into the store without regressing its status"""
+    call_id = retell_data.get("call_id")
+    if not call_id:
+        return
+    current = call_store.get_call(call_id)
+    previous_status = current.get("call_status") if current else None
+
+    fields = retell_call_fields(retell_data)
+    if current and is_status_regression(previous_status, fields["call_status"]):
+        fields.pop("call_status")
+    if retell_data.get("call_analysis"):
+        fields["call_analysis"] = retell_data["call_analysis"]
+    if current:
+        # Revalidations mostly return what is already stored; writing it again would
+        # bump updated_at (and so every ETag) and journal the whole call for nothing
+        fields = {key: value for key, value in fields.items() if current.get(key) != value}
+    call_cache.prime(call_id, retell_data)
+    if not fields:
+        return
+    call_store.update_call(call_id, fields)
+    stored = call_store.get_call(call_id)
+    analytics.observe_call(stored)
+    transcript_index.index_call(stored)
+
+    if "call_status" in fields and fields["call_status"] != previous_status:
+        event_bus.publish(call_event("call_updated", call_id, stored or retell_data))
+
+class CallSync:
+    """Background task that mirrors Retell call history into the call store.
+
+    Each cycle pages through calls started at or after the high-water mark
+    (minus a small overlap for late-arriving calls), upserts them, then
+    re-fetches a bounded number of local calls that are still in progress or
+    ended without analysis, giving up on a call after backfill_max_attempts
+    tries or backfill_max_age seconds after it ended. Cycles that hit max_pages resume from the same
+    pagination key next time before the high-water mark advances. When
+    several workers run, only the holder of the sync lease syncs; the others
+    read its progress from the lease.
+    """
+
+    def __init__(
+        self,
+        interval: float = 60.0,
+        page_size: int = 100,
+        max_pages: int = 10,
+        overlap_ms: int = 5 * 60 * 1000,
+        backfill_limit: int = 20,
+        backfill_max_attempts: int = 5,
+        backfill_max_age: float = 86400.0,
+        lease: Optional[Lease] = None
+    ):
+        self.interval = interval
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.overlap_ms = overlap_ms
+        self.backfill_limit = backfill_limit
+        self.backfill_max_attempts = backfill_max_attempts
+        self.backfill_max_age = backfill_max_age
+        # call_id -> (attempts, end or start timestamp in ms) for calls still being backfilled
+        self._backfill_attempts: Dict[str, Tuple[int, Optional[int]]] = {}
+        self.lease = lease or LocalLease()
+        self.leader = False
+        self.high_water: Optional[int] = None
+        self._resume_key: Optional[str] = None
+        self._resume_lower: Optional[int] = None
+        self._pending_high_water: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._stats: Dict[str, Any] = {
+            "runs": 0,
+            "completed_runs": 0,
+            "errors": 0,
+            "calls_synced": 0,
+            "pages_fetched": 0,
+            "backfilled": 0,
+            "backfill_given_up": 0,
+            "last_run_at": None,
+            "last_duration_ms": None,
+            "last_error": None,
+        }
+
+    @property
+    def ready(self) -> bool:
+        """True once a full pass has completed, so local reads are complete"""
+        if self._task is not None and not self.leader:
+            return bool(self.lease.holder_state().get("ready"))
+        return self._stats["completed_runs"] > 0 and self._resume_key is None
+
+    def _initial_high_water(self) -> Optional[int]:
+        # A persistent store already holds history from earlier runs; an
+        # in-memory one starts empty and needs a full pass
+        if isinstance(call_store, InMemoryCallStore):
+            return None
+        newest = call_store.query_calls(limit=1)
+        return newest[0].get("start_timestamp") if newest else None
+
+    async def _sync_new_calls(self) -> None:
+        if self._resume_key is not None:
+            lower, pagination_key = self._resume_lower, self._resume_key
+        else:
+            lower = self.high_water - self.overlap_ms if self.high_water is not None else None
+            pagination_key = None
+            self._pending_high_water = self.high_water
+
+        criteria = {"start_timestamp": {"lower_threshold": lower}} if lower is not None else {}
+        for _ in range(self.max_pages):
+            calls = await retell_client.list_calls(
+                limit=self.page_size,
+                filter_criteria=criteria,
+                pagination_key=pagination_key
+            )
+            self._stats["pages_fetched"] += 1
+            for call in calls:
+                apply_retell_call(call)
+                start = call.get("start_timestamp")
+                if start is not None and (self._pending_high_water is None or start > self._pending_high_water):
+                    self._pending_high_water = start
+            self._stats["calls_synced"] += len(calls)
+            call_store.flush()
+
+            if len(calls) < self.page_size:
+                self._resume_key = None
+                self.high_water = self._pending_high_water
+                return
+            pagination_key = calls[-1].get("call_id")
+
+        # Page budget exhausted; continue from here next cycle
+        self._resume_key, self._resume_lower = pagination_key, lower
+
+    def _backfill_due(self, call: Dict[str, Any], now_ms: int) -> bool:
+        call_id = call.get("call_id")
+        if not call_id:
+            return False
+        attempts, _ = self._backfill_attempts.get(call_id, (0, None))
+        if self.backfill_max_attempts and attempts >= self.backfill_max_attempts:
+            return False
+        since = call.get("end_timestamp") or call.get("start_timestamp")
+        return not (self.backfill_max_age and since and now_ms - since > self.backfill_max_age * 1000)
+
+    def _prune_backfill_attempts(self, now_ms: int) -> None:
+        if not self.backfill_max_age:
+            return
+        cutoff = now_ms - self.backfill_max_age * 1000
+        for call_id, (_, since) in list(self._backfill_attempts.items()):
+            if since is None or since < cutoff:
+                del self._backfill_attempts[call_id]
+
+    async def _backfill(self) -> None:
+        now_ms = int(time.time() * 1000)
+        self._prune_backfill_attempts(now_ms)
+        # Look past the calls already given up on, so they don't crowd out the rest
+        given_up = sum(1 for attempts, _ in self._backfill_attempts.values() if attempts >= self.backfill_max_attempts) if self.backfill_max_attempts else 0
+        limit = self.backfill_limit + given_up
+        candidates: List[Dict[str, Any]] = []
+        candidates.extend(call_store.query_calls(status=list(HOT_STATUSES), limit=limit))
+        candidates.extend(call_store.query_calls(status=["ended"], has_analysis=False, limit=limit))
+        due = [call for call in candidates if self._backfill_due(call, now_ms)]
+        for call in due[:self.backfill_limit]:
+            call_id = call["call_id"]
+            attempts = self._backfill_attempts.get(call_id, (0, None))[0] + 1
+            self._backfill_attempts[call_id] = (attempts, call.get("end_timestamp") or call.get("start_timestamp"))
+            if attempts == self.backfill_max_attempts:
+                self._stats["backfill_given_up"] += 1
+                logger.info(f"Giving up backfilling call {call_id} after this attempt")
+            try:
+                retell_data = await retell_client.get_call(call_id)
+            except Exception as e:
+                logger.warning(f"Backfill failed for call {call_id}: {e}")
+                continue
+            apply_retell_call(retell_data)
+            self._stats["backfilled"] += 1
+            status = retell_data.get("call_status")
+            if status not in HOT_STATUSES and (status != "ended" or retell_data.get("call_analysis")):
+                self._backfill_attempts.pop(call_id, None)
+        call_store.flush()
+
+    async def sync_once(self) -> None:
+        """Run one incremental sync cycle"""
+        async with self._lock:
+            started = time.monotonic()
+            self._stats["runs"] += 1
+            self._stats["last_run_at"] = int(time.time() * 1000)
+            try:
+                if self.high_water is None and self._resume_key is None:
+                    self.high_water = self._initial_high_water()
+                await self._sync_new_calls()
+                await self._backfill()
+                self._stats["completed_runs"] += 1
+                self._stats["last_error"] = None
+            except Exception as e:
+                self._stats["errors"] += 1
+                self._stats["last_error"] = str(e)
+                logger.error(f"Call sync failed: {e}")
+            finally:
+                self._stats["last_duration_ms"] = round((time.monotonic() - started) * 1000, 3)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.leader = self.lease.acquire()
+            except Exception as e:
+                self.leader = False
+                logger.error(f"Failed to acquire sync lease: {e}")
+            if self.leader:
+                await self.sync_once()
+                self.lease.set_state({"ready": self.ready})
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Started call sync every {self.interval}s")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            if self.leader:
+                self.lease.release()
+                self.leader = False
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["enabled"] = self._task is not None
+        stats["leader"] = self.leader
+        stats["ready"] = self.ready
+        stats["high_water"] = self.high_water
+        stats["resume_pending"] = self._resume_key is not None
+        stats["backfill_tracked"] = len(self._backfill_attempts)
+        return stats
+
+# Global sync instance
+call_sync = CallSync(
+    interval=settings.CALL_SYNC_INTERVAL,
+    page_size=settings.CALL_SYNC_PAGE_SIZE,
+    max_pages=settings.CALL_SYNC_MAX_PAGES,
+    overlap_ms=settings.CALL_SYNC_OVERLAP_MS,
+    backfill_limit=settings.CALL_SYNC_BACKFILL_LIMIT,
+    backfill_max_attempts=settings.CALL_SYNC_BACKFILL_MAX_ATTEMPTS,
+    backfill_max_age=settings.CALL_SYNC_BACKFILL_MAX_AGE,
+    # Outlives a few missed renewals before another worker takes over
+    lease=event_broker.lease("call-sync", ttl=max(3 * settings.CALL_SYNC_INTERVAL, 30.0))
+)
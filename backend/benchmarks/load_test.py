@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Load test for the webhook, call status and call list endpoints.
+
+Starts the local Retell stub (mock_retell.py) and the backend as uvicorn
+subprocesses, then runs each scenario open-loop at a fixed request rate:
+
+    webhook      replays call_started -> call_ended -> call_analyzed sequences
+                 against POST /api/webhooks/retell, then waits for the queue to drain
+    call_status  polls GET /api/calls/{call_id} for a rotating set of calls
+    list_calls   pages through GET /api/calls (from the local store by default,
+                 once the background sync has caught up; --source upstream
+                 proxies every page to the Retell stub instead)
+
+For each scenario it records throughput, latency percentiles, errors and the
+backend's resident memory before and after, and writes everything to a JSON
+file so runs can be compared across versions:
+
+    cd backend && python benchmarks/load_test.py --rate 200 --duration 10
+    python benchmarks/load_test.py --scenario call_status --view summary --output results/summary.json
+
+Pass --base-url to test an already running backend instead (memory is then
+not measured). Backend settings can be varied through the environment, e.g.
+CALL_STORE_BACKEND=sqlite python benchmarks/load_test.py.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("MOCK_RETELL_SEED_CALLS", "0")
+
+from mock_retell import make_call  # noqa: E402
+
+SCENARIOS = ("webhook", "call_status", "list_calls")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def rss_kib(pid: int) -> Optional[int]:
+    """Resident memory of a process and its children (Linux only)"""
+    total = 0
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+        except OSError:
+            continue
+    return total or None
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 3)
+
+async def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+def start_server(module: str, port: int, env: Dict[str, str], workers: int = 1) -> subprocess.Popen:
+    command = [sys.executable, "-m", "uvicorn", module, "--port", str(port), "--log-level", "warning"]
+    if workers > 1:
+        command += ["--workers", str(workers)]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env={**os.environ, **env})
+
+async def run_open_loop(
+    send: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]],
+    client: httpx.AsyncClient,
+    rate: float,
+    duration: float,
+    concurrency: int
+) -> Dict[str, Any]:
+    """Issue requests at a fixed rate regardless of response times.
+
+    Latency is measured from each request's scheduled start, so queueing
+    behind a slow server shows up in the percentiles instead of lowering the
+    offered load (avoids coordinated omission).
+    """
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = []
+    total = int(rate * duration)
+    started = time.perf_counter()
+
+    async def one(index: int, scheduled: float) -> None:
+        nonlocal errors
+        async with semaphore:
+            try:
+                response = await send(client, index)
+                statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+                statuses["transport_error"] = statuses.get("transport_error", 0) + 1
+            latencies.append((time.perf_counter() - scheduled) * 1000)
+
+    for index in range(total):
+        scheduled = started + index / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(index, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "status_codes": statuses,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "p50": percentile(latencies, 0.50),
+            "p90": percentile(latencies, 0.90),
+            "p99": percentile(latencies, 0.99),
+            "max": round(latencies[-1], 3) if latencies else None,
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else None,
+        },
+    }
+
+def webhook_bodies(count: int, words: int) -> List[bytes]:
+    """Realistic event sequences: each call starts, ends and is analyzed, interleaved with other calls"""
+    bodies = []
+    in_flight: List[List[Dict[str, Any]]] = []
+    now_ms = int(time.time() * 1000)
+    index = 0
+    while len(bodies) < count:
+        if len(in_flight) < 20:
+            call = make_call(index, num_words=words, now_ms=now_ms)
+            index += 1
+            started = {k: call[k] for k in ("call_id", "agent_id", "direction", "from_number", "to_number", "start_timestamp")}
+            ended = {k: v for k, v in call.items() if k != "call_analysis"}
+            in_flight.append([
+                {"event": "call_started", "call": started},
+                {"event": "call_ended", "call": ended},
+                {"event": "call_analyzed", "call": call},
+            ])
+        sequence = random.choice(in_flight)
+        event = sequence.pop(0)
+        event["timestamp"] = now_ms + len(bodies)
+        bodies.append(json.dumps(event).encode("utf-8"))
+        if not sequence:
+            in_flight.remove(sequence)
+    return bodies
+
+async def wait_for_drain(client: httpx.AsyncClient, timeout: float = 120.0) -> Dict[str, Any]:
+    started = time.perf_counter()
+    stats: Dict[str, Any] = {}
+    while time.perf_counter() - started < timeout:
+        stats = (await client.get("/api/webhooks/stats")).json()
+        if stats.get("depth", 0) == 0:
+            break
+        await asyncio.sleep(0.05)
+    return {"drain_s": round(time.perf_counter() - started, 3), "queue": stats}
+
+async def scenario_webhook(client: httpx.AsyncClient, args: argparse.Namespace) -> Dict[str, Any]:
+    bodies = webhook_bodies(int(args.rate * args.duration), args.words)
+    headers = {"Content-Type": "application/json"}
+    result = await run_open_loop(
+        lambda c, i: c.post("/api/webhooks/retell", content=bodies[i], headers=headers),
+        client, args.rate, args.duration, args.concurrency
+    )
+    result["body_kib_mean"] = round(sum(len(b) for b in bodies) / len(bodies) / 1024, 1) if bodies else 0
+    result.update(await wait_for_drain(client))
+    return result
+
+async def scenario_call_status(client: httpx.AsyncClient, args: argparse.Namespace, call_ids: List[str]) -> Dict[str, Any]:
+    params = {"view": args.view} if args.view != "full" else {}
+    return await run_open_loop(
+        lambda c, i: c.get(f"/api/calls/{call_ids[i % len(call_ids)]}", params=params),
+        client, args.rate, args.duration, args.concurrency
+    )
+
+async def wait_for_sync(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if (await client.get("/stats/sync")).json().get("ready"):
+            return
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Call sync was not ready within {timeout}s")
+
+async def scenario_list_calls(client: httpx.AsyncClient, args: argparse.Namespace) -> Dict[str, Any]:
+    if args.source == "local":
+        await wait_for_sync(client)
+    params = {"limit": args.page_size, "source": args.source}
+    return await run_open_loop(
+        lambda c, i: c.get("/api/calls/", params=params),
+        client, args.rate, args.duration, args.concurrency
+    )
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append", help="scenario to run (repeatable; default all)")
+    parser.add_argument("--rate", type=float, default=100, help="requests per second offered to each scenario")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=100, help="maximum requests in flight")
+    parser.add_argument("--words", type=int, default=300, help="transcript length of replayed calls")
+    parser.add_argument("--view", choices=("full", "summary"), default="full", help="call_status response view")
+    parser.add_argument("--page-size", type=int, default=100, help="list_calls page size")
+    parser.add_argument("--source", choices=("local", "upstream"), default="local", help="list_calls data source")
+    parser.add_argument("--seed-calls", type=int, default=500, help="calls pre-loaded into the Retell stub")
+    parser.add_argument("--workers", type=int, default=1, help="backend worker processes")
+    parser.add_argument("--base-url", help="benchmark a running backend instead of starting one")
+    parser.add_argument("--output", help="results file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    args = parser.parse_args()
+    scenarios = args.scenario or list(SCENARIOS)
+
+    processes: List[subprocess.Popen] = []
+    backend: Optional[subprocess.Popen] = None
+    base_url = args.base_url
+    try:
+        if base_url is None:
+            mock_port, backend_port = free_port(), free_port()
+            processes.append(start_server("mock_retell:app", mock_port, {"MOCK_RETELL_SEED_CALLS": str(args.seed_calls)}))
+            await wait_until_up(f"http://127.0.0.1:{mock_port}/mock/stats")
+            backend = start_server("app.main:app", backend_port, {
+                "RETELL_BASE_URL": f"http://127.0.0.1:{mock_port}",
+                "RETELL_API_KEY": os.getenv("RETELL_API_KEY", "benchmark"),
+                "RETELL_FROM_NUMBER": os.getenv("RETELL_FROM_NUMBER", "+15550000000"),
+                "RETELL_AGENT_ID": os.getenv("RETELL_AGENT_ID", "agent_benchmark"),
+                # The stub has no quota, so measure the backend rather than the client-side pacing
+                "RETELL_RATE_LIMIT": os.getenv("RETELL_RATE_LIMIT", "10000"),
+                "RETELL_RATE_BURST": os.getenv("RETELL_RATE_BURST", "10000"),
+                "CALL_SYNC_ENABLED": os.getenv("CALL_SYNC_ENABLED", "true"),
+            }, workers=args.workers)
+            processes.append(backend)
+            base_url = f"http://127.0.0.1:{backend_port}"
+        await wait_until_up(f"{base_url}/health")
+
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        results: Dict[str, Any] = {}
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            calls = (await client.get("/api/calls/", params={"limit": 200, "source": "upstream"})).json()
+            call_ids = [c["call_id"] for c in calls] or ["missing"]
+            for name in scenarios:
+                rss_before = rss_kib(backend.pid) if backend else None
+                print(f"Running {name} at {args.rate:g} req/s for {args.duration:g}s ...", flush=True)
+                if name == "webhook":
+                    result = await scenario_webhook(client, args)
+                elif name == "call_status":
+                    result = await scenario_call_status(client, args, call_ids)
+                else:
+                    result = await scenario_list_calls(client, args)
+                rss_after = rss_kib(backend.pid) if backend else None
+                result["rss_kib"] = {
+                    "before": rss_before,
+                    "after": rss_after,
+                    "growth": rss_after - rss_before if rss_before and rss_after else None,
+                }
+                results[name] = result
+                latency = result["latency_ms"]
+                print(f"  {result['throughput_rps']} req/s, p50 {latency['p50']}ms, p99 {latency['p99']}ms, "
+                      f"{result['errors']} errors, RSS +{result['rss_kib']['growth']} KiB")
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output",)},
+        "environment": {k: v for k, v in os.environ.items() if k.startswith(("CALL_", "MOCK_RETELL_", "WEBHOOK_", "RETELL_", "EVENT_", "COORDINATION_")) and "KEY" not in k},
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        BACKEND_DIR, "benchmarks", "results", f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(json.load(f), report)
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> None:
+    """Print how each scenario moved relative to a baseline run"""
+    print(f"\nCompared with {baseline.get('git_commit')} ({baseline.get('timestamp')}):")
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        rows = [
+            ("throughput_rps", before.get("throughput_rps"), result.get("throughput_rps")),
+            ("p50_ms", before["latency_ms"].get("p50"), result["latency_ms"].get("p50")),
+            ("p99_ms", before["latency_ms"].get("p99"), result["latency_ms"].get("p99")),
+            ("rss_growth_kib", (before.get("rss_kib") or {}).get("growth"), (result.get("rss_kib") or {}).get("growth")),
+        ]
+        changes = ", ".join(
+            f"{label} {old} -> {new}" + (f" ({(new - old) / old * 100:+.0f}%)" if old else "")
+            for label, old, new in rows if old is not None and new is not None
+        )
+        print(f"  {name}: {changes}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Memory held by the in-memory call store per call, with and without packed transcripts.
+
+Feeds decoded call_ended payloads (a 10-minute call is ~1500 words at a normal
+speaking rate) into InMemoryCallStore with pack off and on, and reports the
+traced allocation per call, plus the cost of packing and of serializing the
+full transcript back out:
+
+    cd backend && python benchmarks/packed_calls.py --words 1500 --calls 200
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MOCK_RETELL_SEED_CALLS", "0")
+
+from app import jsonutil  # noqa: E402
+from app.packing import pack_call, packed_nbytes, unpack, without_packed  # noqa: E402
+from app.store import InMemoryCallStore  # noqa: E402
+from mock_retell import make_call  # noqa: E402
+
+def store_footprint(bodies, pack: bool):
+    """Traced bytes per call held by a store filled from webhook bodies"""
+    gc.collect()
+    tracemalloc.start()
+    store = InMemoryCallStore(pack=pack)
+    for body in bodies:
+        call = jsonutil.loads(body)
+        store.update_call(call["call_id"], call)
+        del call
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, current / len(bodies)
+
+def per_call_us(fn, iterations: int) -> float:
+    return min(timeit.repeat(fn, number=iterations, repeat=5)) / iterations * 1e6
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=1500, help="transcript length of each call")
+    parser.add_argument("--calls", type=int, default=200, help="calls held in the store")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    bodies = [json.dumps(make_call(i, num_words=args.words)).encode("utf-8") for i in range(args.calls)]
+    print(f"{args.calls} calls of {args.words} words; payload {len(bodies[0]) / 1024:.1f} KiB each\n")
+
+    plain_store, plain = store_footprint(bodies, pack=False)
+    packed_store, packed = store_footprint(bodies, pack=True)
+    print(f"{'plain lists':<16} {plain / 1024:8.1f} KiB/call   store estimate {plain_store.stats()['bytes'] / args.calls / 1024:8.1f} KiB/call")
+    print(f"{'packed arrays':<16} {packed / 1024:8.1f} KiB/call   store estimate {packed_store.stats()['bytes'] / args.calls / 1024:8.1f} KiB/call")
+    print(f"{'reduction':<16} {plain / packed:8.1f}x\n")
+
+    call = jsonutil.loads(bodies[0])
+    stored_plain = plain_store.get_call(call["call_id"])
+    stored_packed = packed_store.get_call(call["call_id"])
+    same = lambda stored: {k: v for k, v in json.loads(jsonutil.dumps(stored)).items() if k != "updated_at"}
+    assert same(stored_packed) == same(stored_plain), "packed call serializes differently"
+    cases = [
+        ("pack_call(call)", lambda: pack_call(call)),
+        ("size estimate per update, plain", lambda: len(jsonutil.dumps(stored_plain))),
+        ("size estimate per update, packed", lambda: len(jsonutil.dumps(without_packed(stored_packed))) + packed_nbytes(stored_packed)),
+        ("dumps(plain call)", lambda: jsonutil.dumps(stored_plain)),
+        ("dumps(packed call)", lambda: jsonutil.dumps(stored_packed)),
+        ("dumps(unpack(packed call))", lambda: jsonutil.dumps(unpack(stored_packed))),
+    ]
+    for name, fn in cases:
+        print(f"{name:<36} {per_call_us(fn, args.iterations):10.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Per-event CPU cost of decoding webhook bodies and encoding call responses.
+
+Builds realistic call_ended payloads with the local Retell stub's generator
+and times the standard-library path against the one in app.jsonutil (orjson
+when installed):
+
+    cd backend && python benchmarks/webhook_json.py --words 2000 --iterations 500
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MOCK_RETELL_SEED_CALLS", "0")
+
+from app import jsonutil  # noqa: E402
+from app.models.schemas import WebhookPayload  # noqa: E402
+from mock_retell import make_call  # noqa: E402
+
+def per_call_us(fn, iterations: int) -> float:
+    return min(timeit.repeat(fn, number=iterations, repeat=5)) / iterations * 1e6
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=2000, help="transcript length of the sample call")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    call = make_call(0, num_words=args.words)
+    body = json.dumps({"event": "call_ended", "call": call}).encode("utf-8")
+    print(f"JSON backend: {jsonutil.JSON_BACKEND}; webhook body: {len(body) / 1024:.1f} KiB ({args.words} words)\n")
+
+    cases = [
+        ("decode: json.loads(body.decode())", lambda: json.loads(body.decode())),
+        ("decode: jsonutil.loads(body)", lambda: jsonutil.loads(body)),
+        ("decode: WebhookPayload.model_validate_json(body)", lambda: WebhookPayload.model_validate_json(body)),
+        ("decode: WebhookPayload.model_validate(jsonutil.loads(body))", lambda: WebhookPayload.model_validate(jsonutil.loads(body))),
+        ("encode: json.dumps(call)", lambda: json.dumps(call, separators=(",", ":")).encode("utf-8")),
+        ("encode: jsonutil.dumps(call)", lambda: jsonutil.dumps(call)),
+    ]
+    baseline = {}
+    for name, fn in cases:
+        cost = per_call_us(fn, args.iterations)
+        kind = name.split(":")[0]
+        baseline.setdefault(kind, cost)
+        print(f"{name:<62} {cost:10.1f} us/event  ({baseline[kind] / cost:4.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Export call records to NDJSON, CSV, Parquet or Arrow without loading them all into memory.
+
+Reads from the SQLite call store (CALL_STORE_BACKEND=sqlite, CALL_STORE_PATH)
+or pages through Retell's list-calls with --source upstream, using the same
+pipeline as GET /api/export/calls:
+
+    cd backend && CALL_STORE_BACKEND=sqlite python export_calls.py --format csv --since 2026-09-01 --until 2026-10-01 -o september.csv
+    python export_calls.py --source upstream --format parquet --fields call_id,call_cost.combined_cost,call_analysis.user_sentiment -o costs.parquet
+
+Parquet and Arrow need pyarrow (pip install pyarrow).
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.config import settings
+from app.export import FORMATS, ExportError, arrow_available, export_calls, iter_store_calls, iter_upstream_calls
+from app.retell_client import retell_client
+from app.store import call_store
+
+def to_ms(value: Optional[str]) -> Optional[int]:
+    """ISO date/datetime (UTC unless an offset is given) or epoch milliseconds"""
+    if value is None:
+        return None
+    if value.isdigit():
+        return int(value)
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+async def run(args: argparse.Namespace) -> int:
+    if args.format in ("parquet", "arrow") and not arrow_available():
+        print(f"{args.format} export requires the 'pyarrow' package", file=sys.stderr)
+        return 2
+    if args.source == "local" and settings.CALL_STORE_BACKEND != "sqlite":
+        print("Warning: the in-memory call store is empty in a fresh process; "
+              "set CALL_STORE_BACKEND=sqlite or use --source upstream", file=sys.stderr)
+
+    fields = [name.strip() for name in args.fields.split(",") if name.strip()] if args.fields else None
+    iterate = iter_upstream_calls if args.source == "upstream" else iter_store_calls
+    counted = 0
+
+    async def counting():
+        nonlocal counted
+        async for call in iterate(
+            start_after=to_ms(args.since),
+            start_before=to_ms(args.until),
+            agent_id=args.agent_id,
+            status=args.status,
+            page_size=args.page_size
+        ):
+            counted += 1
+            yield call
+
+    started = time.monotonic()
+    written = 0
+    output = open(args.output, "wb") if args.output != "-" else sys.stdout.buffer
+    try:
+        async for chunk in export_calls(args.format, counting(), fields):
+            output.write(chunk)
+            written += len(chunk)
+    except ExportError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+        await retell_client.close()
+        await call_store.close()
+    print(f"Exported {counted} calls ({written} bytes) in {time.monotonic() - started:.1f}s", file=sys.stderr)
+    return 0
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=list(FORMATS), default="ndjson")
+    parser.add_argument("--source", choices=("local", "upstream"), default="local", help="call store or Retell list-calls")
+    parser.add_argument("--since", help="earliest start time (ISO date/datetime or epoch ms)")
+    parser.add_argument("--until", help="latest start time (ISO date/datetime or epoch ms)")
+    parser.add_argument("--agent-id", action="append", help="only calls for this agent (repeatable)")
+    parser.add_argument("--status", action="append", help="only calls with this status (repeatable)")
+    parser.add_argument("--fields", help="comma-separated fields; dotted paths reach into nested objects")
+    parser.add_argument("--page-size", type=int, default=100, help="calls held in memory at once")
+    parser.add_argument("-o", "--output", default="-", help="output file (default stdout)")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+if __name__ == "__main__":
+    main()
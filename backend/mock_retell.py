@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Retell API, for exercising the backend without placing real calls.
+
+Run it next to the backend and point RETELL_BASE_URL at it:
+
+    uvicorn mock_retell:app --port 9000
+    RETELL_BASE_URL=http://localhost:9000 uvicorn app.main:app --port 8000
+
+Environment variables:
+    MOCK_RETELL_SEED_CALLS   number of ended calls to pre-populate (default 200)
+    MOCK_RETELL_FAILURE_RATE fraction of requests answered with 429/503 (default 0)
+    MOCK_RETELL_LATENCY_MS   artificial latency added to every request (default 0)
+    MOCK_RETELL_PUBLIC_URL   base of the recording URLs it hands out (default http://localhost:9000)
+    MOCK_RETELL_RECORDING_SECONDS  length of the generated recordings (default 60)
+
+It also plays the recording host: GET /recordings/<n>.wav returns a generated
+8 kHz mono WAV file.
+"""
+import asyncio
+import math
+import os
+import struct
+import random
+import time
+import uuid
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+
+SEED_CALLS = int(os.getenv("MOCK_RETELL_SEED_CALLS", "200"))
+FAILURE_RATE = float(os.getenv("MOCK_RETELL_FAILURE_RATE", "0"))
+LATENCY_MS = float(os.getenv("MOCK_RETELL_LATENCY_MS", "0"))
+PUBLIC_URL = os.getenv("MOCK_RETELL_PUBLIC_URL", "http://localhost:9000").rstrip("/")
+RECORDING_SECONDS = int(os.getenv("MOCK_RETELL_RECORDING_SECONDS", "60"))
+
+WORDS = (
+    "hi this is the clinic calling to confirm your appointment tomorrow morning "
+    "yes that works for me thank you could you remind me of the address sure "
+    "it is on main street suite two hundred do I need to bring anything just your "
+    "insurance card and a photo id great see you then"
+).split()
+
+app = FastAPI(title="Mock Retell API")
+
+calls = {}
+stats = {"create_phone_call": 0, "get_call": 0, "list_calls": 0, "recordings": 0, "injected_failures": 0}
+
+def make_transcript(num_words: int, start: float = 0.0):
+    """Build alternating agent/user utterances with word-level timings"""
+    utterances = []
+    t = start
+    role = "agent"
+    remaining = num_words
+    while remaining > 0:
+        count = min(remaining, random.randint(6, 18))
+        words = []
+        for _ in range(count):
+            duration = random.uniform(0.15, 0.45)
+            words.append({"word": random.choice(WORDS), "start": round(t, 3), "end": round(t + duration, 3)})
+            t += duration + random.uniform(0.02, 0.1)
+        utterances.append({
+            "role": role,
+            "content": " ".join(w["word"] for w in words),
+            "words": words,
+        })
+        role = "user" if role == "agent" else "agent"
+        remaining -= count
+        t += random.uniform(0.3, 1.2)
+    return utterances
+
+def latency_metric(mean: float, samples: int):
+    values = sorted(max(1, int(random.gauss(mean, mean * 0.25))) for _ in range(samples))
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return {
+        "p50": pick(0.5), "p90": pick(0.9), "p95": pick(0.95), "p99": pick(0.99),
+        "max": values[-1], "min": values[0], "num": len(values), "values": values,
+    }
+
+def make_call(index: int, status: str = "ended", num_words: int = 300, now_ms: Optional[int] = None):
+    now_ms = now_ms or int(time.time() * 1000)
+    start = now_ms - (SEED_CALLS - index) * 60_000
+    duration_ms = random.randint(30_000, 600_000)
+    transcript_object = make_transcript(num_words)
+    turns = max(1, len(transcript_object) // 2)
+    call = {
+        "call_id": f"call_{uuid.uuid4().hex[:24]}",
+        "call_type": "phone_call",
+        "call_status": status,
+        "agent_id": random.choice(["agent_alpha", "agent_beta", "agent_gamma"]),
+        "agent_name": "Appointment Assistant",
+        "direction": random.choice(["outbound", "inbound"]),
+        "from_number": "+15550000000",
+        "to_number": f"+1555{random.randint(1000000, 9999999)}",
+        "start_timestamp": start,
+        "retell_llm_dynamic_variables": {"customer_name": "Test Customer"},
+    }
+    if status in ("ended", "error"):
+        product_costs = [
+            {"product": "retell_platform", "unit_price": 0.07, "cost": round(duration_ms / 60000 * 7, 4)},
+            {"product": "elevenlabs_tts", "unit_price": 0.04, "cost": round(duration_ms / 60000 * 4, 4)},
+            {"product": "gpt_4o_mini", "unit_price": 0.006, "cost": round(duration_ms / 60000 * 0.6, 4)},
+        ]
+        call.update({
+            "end_timestamp": start + duration_ms,
+            "duration_ms": duration_ms,
+            "disconnection_reason": random.choice(["user_hangup", "agent_hangup", "voicemail_reached"]),
+            "transcript": "\n".join(f"{'Agent' if u['role'] == 'agent' else 'User'}: {u['content']}" for u in transcript_object),
+            "transcript_object": transcript_object,
+            "transcript_with_tool_calls": transcript_object,
+            "recording_url": f"{PUBLIC_URL}/recordings/{index}.wav",
+            "public_log_url": f"{PUBLIC_URL}/logs/{index}.txt",
+            "latency": {
+                "e2e": latency_metric(900, turns),
+                "asr": latency_metric(150, turns),
+                "llm": latency_metric(450, turns),
+                "tts": latency_metric(200, turns),
+            },
+            "call_cost": {
+                "product_costs": product_costs,
+                "total_duration_seconds": duration_ms // 1000,
+                "total_duration_unit_price": 0.116,
+                "combined_cost": round(sum(p["cost"] for p in product_costs), 4),
+            },
+            "llm_token_usage": {"values": [random.randint(800, 2400) for _ in range(turns)], "average": 1500, "num_requests": turns},
+            "call_analysis": {
+                "call_summary": "The agent confirmed the appointment and shared the address.",
+                "in_voicemail": False,
+                "user_sentiment": random.choice(["Positive", "Neutral", "Negative"]),
+                "call_successful": True,
+                "custom_analysis_data": {},
+            },
+        })
+    return call
+
+for i in range(SEED_CALLS):
+    seeded = make_call(i, num_words=random.randint(50, 400))
+    calls[seeded["call_id"]] = seeded
+
+@app.middleware("http")
+async def inject_faults(request: Request, call_next):
+    if LATENCY_MS:
+        await asyncio.sleep(LATENCY_MS / 1000)
+    if FAILURE_RATE and request.url.path.startswith("/v2/") and random.random() < FAILURE_RATE:
+        stats["injected_failures"] += 1
+        if random.random() < 0.5:
+            return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": "1"})
+        return JSONResponse({"error": "unavailable"}, status_code=503)
+    return await call_next(request)
+
+@app.post("/v2/create-phone-call", status_code=201)
+async def create_phone_call(request: Request):
+    stats["create_phone_call"] += 1
+    body = await request.json()
+    call = make_call(SEED_CALLS, status="registered")
+    call["to_number"] = body.get("to_number")
+    call["start_timestamp"] = int(time.time() * 1000)
+    call["retell_llm_dynamic_variables"] = body.get("retell_llm_dynamic_variables") or {}
+    calls[call["call_id"]] = call
+    return {key: call[key] for key in ("call_id", "call_status", "agent_id", "from_number", "to_number", "direction")}
+
+@app.get("/v2/get-call/{call_id}")
+async def get_call(call_id: str):
+    stats["get_call"] += 1
+    if call_id not in calls:
+        raise HTTPException(status_code=404, detail="Call not found")
+    return calls[call_id]
+
+@app.post("/v2/list-calls")
+async def list_calls(request: Request):
+    stats["list_calls"] += 1
+    body = await request.json()
+    criteria = body.get("filter_criteria") or {}
+    result = sorted(calls.values(), key=lambda c: (c.get("start_timestamp") or 0, c["call_id"]),
+                    reverse=body.get("sort_order", "descending") == "descending")
+    for key in ("call_status", "agent_id", "direction"):
+        if criteria.get(key):
+            result = [c for c in result if c.get(key) in criteria[key]]
+    bounds = criteria.get("start_timestamp") or {}
+    if bounds.get("lower_threshold") is not None:
+        result = [c for c in result if (c.get("start_timestamp") or 0) >= bounds["lower_threshold"]]
+    if bounds.get("upper_threshold") is not None:
+        result = [c for c in result if (c.get("start_timestamp") or 0) <= bounds["upper_threshold"]]
+    if body.get("pagination_key"):
+        ids = [c["call_id"] for c in result]
+        result = result[ids.index(body["pagination_key"]) + 1:] if body["pagination_key"] in ids else []
+    return result[: body.get("limit", 1000)]
+
+_recordings = {}
+
+def make_recording(index: int) -> bytes:
+    """8 kHz 8-bit mono WAV with a tone that differs per recording"""
+    if index not in _recordings:
+        rate = 8000
+        frequency = 220 + (index % 20) * 20
+        samples = bytes(128 + int(100 * math.sin(2 * math.pi * frequency * i / rate)) for i in range(rate * RECORDING_SECONDS))
+        header = b"RIFF" + struct.pack("<I", 36 + len(samples)) + b"WAVE"
+        header += b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, rate, rate, 1, 8)
+        header += b"data" + struct.pack("<I", len(samples))
+        _recordings.clear()  # one at a time is enough to stand in for a file server
+        _recordings[index] = header + samples
+    return _recordings[index]
+
+@app.get("/recordings/{index}.wav")
+async def get_recording(index: int):
+    stats["recordings"] += 1
+    return Response(make_recording(index), media_type="audio/wav")
+
+@app.get("/mock/stats")
+async def mock_stats():
+    """Request counters, for checking how much upstream traffic the backend generates"""
+    return {**stats, "calls": len(calls)}
+
+@app.post("/mock/calls/{call_id}/status/{status}")
+async def set_call_status(call_id: str, status: str):
+    """Move a call through its lifecycle, filling in post-call data when it ends"""
+    if call_id not in calls:
+        raise HTTPException(status_code=404, detail="Call not found")
+    if status in ("ended", "error"):
+        finished = make_call(SEED_CALLS, status=status)
+        for key in ("call_id", "agent_id", "from_number", "to_number", "direction", "start_timestamp", "retell_llm_dynamic_variables"):
+            finished[key] = calls[call_id][key]
+        calls[call_id] = finished
+    else:
+        calls[call_id]["call_status"] = status
+    return calls[call_id]
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test latency analytics call counts
+"""
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.analytics import HOUR_MS, LatencyAnalytics
+
+def _call(call_id: str, agent_id: str, start: int, **latency):
+    return {
+        "call_id": call_id,
+        "agent_id": agent_id,
+        "start_timestamp": start,
+        "latency": {component: {"values": values} for component, values in latency.items()},
+    }
+
+def test_calls_follow_filters():
+    analytics = LatencyAnalytics(retention_days=1)
+    now = int(time.time() * 1000)
+    analytics.observe_call(_call("a1", "agent_a", now, e2e=[800, 900], llm=[400]))
+    analytics.observe_call(_call("a2", "agent_a", now - 2 * HOUR_MS, e2e=[700]))
+    analytics.observe_call(_call("b1", "agent_b", now, llm=[300]))
+
+    assert analytics.count_calls() == 3
+    assert analytics.count_calls(agent_id=["agent_a"]) == 2
+    assert analytics.count_calls(components=["e2e"]) == 2
+    assert analytics.count_calls(start_after=now - HOUR_MS) == 2
+    rows = analytics.query(components=["e2e"], agent_id=["agent_a"])
+    assert rows[0]["calls"] == 2 and rows[0]["count"] == 3
+
+    # Counts age out with the sketches
+    analytics.retention_ms = HOUR_MS
+    analytics.prune()
+    assert analytics.count_calls() == 2
+
+if __name__ == "__main__":
+    test_calls_follow_filters()
+    print("✅ Latency analytics counts calls per query")
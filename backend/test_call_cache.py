@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test call cache request coalescing and stale-while-revalidate
+"""
+import asyncio
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.cache import CallCache
+
+class Upstream:
+    """Counts fetches and answers each after an optional delay"""
+
+    def __init__(self, data, delay: float = 0.0):
+        self.data = data
+        self.delay = delay
+        self.fetches = 0
+
+    async def fetch(self):
+        self.fetches += 1
+        await asyncio.sleep(self.delay)
+        return dict(self.data)
+
+def test_concurrent_misses_share_one_fetch():
+    async def scenario():
+        cache = CallCache()
+        upstream = Upstream({"call_id": "c1", "call_status": "ongoing"}, delay=0.05)
+        results = await asyncio.gather(*(cache.get("c1", upstream.fetch) for _ in range(20)))
+        assert upstream.fetches == 1
+        assert all(result["call_status"] == "ongoing" for result in results)
+        assert cache.stats()["coalesced"] == 19
+
+    asyncio.run(scenario())
+
+def test_stale_entry_served_while_refreshing():
+    async def scenario():
+        cache = CallCache(ongoing_ttl=0.05, max_stale=10)
+        upstream = Upstream({"call_id": "c1", "call_status": "ongoing"}, delay=0.05)
+        await cache.get("c1", upstream.fetch)
+        await asyncio.sleep(0.06)
+
+        upstream.data = {"call_id": "c1", "call_status": "ended"}
+        # Stale: answered at once from the old entry while one refresh runs
+        stale = await asyncio.wait_for(cache.get("c1", upstream.fetch), timeout=0.02)
+        again = await cache.get("c1", upstream.fetch)
+        assert stale["call_status"] == again["call_status"] == "ongoing"
+        assert upstream.fetches == 2
+        await asyncio.sleep(0.06)
+        assert (await cache.get("c1", upstream.fetch))["call_status"] == "ended"
+        assert upstream.fetches == 2
+
+    asyncio.run(scenario())
+
+def test_analyzed_calls_never_refetched():
+    async def scenario():
+        cache = CallCache(ongoing_ttl=0.01, ended_ttl=0.01, max_stale=0.01)
+        upstream = Upstream({"call_id": "c1", "call_status": "ended", "call_analysis": {"call_summary": "ok"}})
+        await cache.get("c1", upstream.fetch)
+        await asyncio.sleep(0.05)
+        for _ in range(5):
+            await cache.get("c1", upstream.fetch)
+        assert upstream.fetches == 1
+
+    asyncio.run(scenario())
+
+def test_entries_too_stale_are_refetched():
+    async def scenario():
+        cache = CallCache(ended_ttl=0.01, max_stale=0.01)
+        upstream = Upstream({"call_id": "c1", "call_status": "ended"})
+        await cache.get("c1", upstream.fetch)
+        await asyncio.sleep(0.05)
+        await cache.get("c1", upstream.fetch)
+        assert upstream.fetches == 2
+
+    asyncio.run(scenario())
+
+if __name__ == "__main__":
+    test_concurrent_misses_share_one_fetch()
+    test_stale_entry_served_while_refreshing()
+    test_analyzed_calls_never_refetched()
+    test_entries_too_stale_are_refetched()
+    print("✅ Call cache coalesces and revalidates correctly")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test call store paging
+"""
+import os
+import sys
+import tempfile
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.sqlite_store import SQLiteCallStore
+from app.store import InMemoryCallStore, encode_pagination_key
+
+def _fill(store, count: int):
+    for index in range(count):
+        store.update_call(f"call_{index:02d}", {"call_id": f"call_{index:02d}", "call_status": "ended", "start_timestamp": 1000 + index})
+
+def _check_pages_survive_cursor_delete(store):
+    _fill(store, 10)
+    first = store.query_calls(limit=4)
+    assert [call["call_id"] for call in first] == ["call_09", "call_08", "call_07", "call_06"]
+    key = encode_pagination_key(first[-1])
+    # The call the key was made from goes away between pages
+    store.delete_call("call_06")
+    second = store.query_calls(limit=4, pagination_key=key)
+    assert [call["call_id"] for call in second] == ["call_05", "call_04", "call_03", "call_02"]
+
+def test_memory_pages_survive_cursor_delete():
+    _check_pages_survive_cursor_delete(InMemoryCallStore())
+
+def test_sqlite_pages_survive_cursor_delete():
+    with tempfile.TemporaryDirectory() as directory:
+        _check_pages_survive_cursor_delete(SQLiteCallStore(os.path.join(directory, "calls.db")))
+
+def test_bare_call_id_key():
+    store = InMemoryCallStore()
+    _fill(store, 5)
+    assert [call["call_id"] for call in store.query_calls(limit=2, pagination_key="call_03")] == ["call_02", "call_01"]
+
+def test_malformed_key():
+    try:
+        InMemoryCallStore().query_calls(pagination_key="pk1.not-json")
+    except ValueError:
+        return
+    raise AssertionError("malformed pagination_key accepted")
+
+if __name__ == "__main__":
+    test_memory_pages_survive_cursor_delete()
+    test_sqlite_pages_survive_cursor_delete()
+    test_bare_call_id_key()
+    test_malformed_key()
+    print("✅ Call store paging works")
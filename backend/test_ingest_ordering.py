@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test how webhook events are applied to the call store, including out-of-order delivery
+"""
+import os
+import sys
+import tempfile
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.ingest import process_webhook_event
+from app.sqlite_store import SQLiteCallStore
+from app.store import call_store
+from app.sync import apply_retell_call
+
+def _event(event_type: str, call_id: str, **call):
+    return {"event": event_type, "call": {"call_id": call_id, **call}}
+
+def test_ended_after_analyzed():
+    call_id = "call_ordering_ended_after_analyzed"
+    assert process_webhook_event(_event("call_started", call_id, start_timestamp=1))
+    assert process_webhook_event(_event("call_analyzed", call_id, call_analysis={"call_summary": "ok"}))
+    # call_ended is older than call_analyzed, but must still end the call
+    assert not process_webhook_event(_event("call_ended", call_id, start_timestamp=1, end_timestamp=5))
+
+    call = call_store.get_call(call_id)
+    assert call["call_status"] == "ended", call["call_status"]
+    assert call["ended_at"] == 5
+    assert call["call_analysis"] == {"call_summary": "ok"}
+    call_store.delete_call(call_id)
+
+def test_started_after_ended():
+    call_id = "call_ordering_started_after_ended"
+    assert process_webhook_event(_event("call_ended", call_id, start_timestamp=1, end_timestamp=5))
+    # A late call_started fills in what's missing without reopening the call
+    assert not process_webhook_event(_event("call_started", call_id, start_timestamp=1, agent_name="Agent"))
+
+    call = call_store.get_call(call_id)
+    assert call["call_status"] == "ended", call["call_status"]
+    assert call["agent_name"] == "Agent"
+    call_store.delete_call(call_id)
+
+def test_started_records_agent_and_direction():
+    call_id = "call_ordering_started_identity"
+    assert process_webhook_event(_event("call_started", call_id, start_timestamp=1, agent_id="agent_1", direction="outbound"))
+
+    # Live calls must show up in agent and direction filters before they end
+    call = call_store.get_call(call_id)
+    assert call["agent_id"] == "agent_1"
+    assert call["direction"] == "outbound"
+    call_store.delete_call(call_id)
+
+def test_sqlite_workers_keep_later_event():
+    # Two workers sharing one database: the one that saw call_ended flushes last
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "calls.db")
+        analyzed, ended = SQLiteCallStore(path), SQLiteCallStore(path)
+        call_id = "call_ordering_workers"
+        ended.update_call(call_id, {"call_status": "ongoing", "event_rank": 1})
+        ended.flush()
+        analyzed.update_call(call_id, {"call_status": "ended", "call_analysis": {"call_summary": "ok"}, "event_rank": 3})
+        ended.update_call(call_id, {"call_status": "ended", "ended_at": 5, "call_analysis": None, "event_rank": 2})
+        analyzed.flush()
+        ended.flush()
+
+        call = SQLiteCallStore(path).get_call(call_id)
+        assert call["event_rank"] == 3
+        assert call["call_status"] == "ended"
+        assert call["ended_at"] == 5
+        assert call["call_analysis"] == {"call_summary": "ok"}
+
+def test_unchanged_retell_call_keeps_version():
+    call_id = "call_ordering_unchanged_refresh"
+    retell_call = {"call_id": call_id, "call_status": "ongoing", "start_timestamp": 1, "transcript": "Agent: hi"}
+    apply_retell_call(dict(retell_call))
+    updated_at = call_store.get_call(call_id)["updated_at"]
+    # A revalidation returning the same data must not bump updated_at (and so the ETag)
+    apply_retell_call(dict(retell_call))
+    assert call_store.get_call(call_id)["updated_at"] == updated_at
+    apply_retell_call({**retell_call, "call_status": "ended"})
+    assert call_store.get_call(call_id)["updated_at"] != updated_at
+    call_store.delete_call(call_id)
+
+if __name__ == "__main__":
+    test_ended_after_analyzed()
+    test_started_after_ended()
+    test_started_records_agent_and_direction()
+    test_sqlite_workers_keep_later_event()
+    test_unchanged_retell_call_keeps_version()
+    print("✅ Webhook events applied correctly")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test recording byte ranges and the recording host allowlist
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+import httpx
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.recordings import RangeFileResponse, RecordingCache, RecordingNotAllowed, parse_range
+
+BODY = bytes(range(256)) * 4
+
+def _serve(path: str, **request_headers):
+    """Status, headers and body of a RangeFileResponse for a GET with request_headers"""
+    response = RangeFileResponse(path, {key.replace("_", "-"): value for key, value in request_headers.items()}, "audio/wav")
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(response({"type": "http", "method": "GET", "extensions": {}}, None, send))
+    headers = {key.decode(): value.decode() for key, value in messages[0]["headers"]}
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return messages[0]["status"], headers, body
+
+def _recording() -> str:
+    handle, path = tempfile.mkstemp(suffix=".wav")
+    with os.fdopen(handle, "wb") as file:
+        file.write(BODY)
+    return path
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", 1024) == (0, 99)
+    assert parse_range("bytes=1000-2000", 1024) == (1000, 1023)
+    # Open-ended and suffix ranges
+    assert parse_range("bytes=1000-", 1024) == (1000, 1023)
+    assert parse_range("bytes=-24", 1024) == (1000, 1023)
+    assert parse_range("bytes=-5000", 1024) == (0, 1023)
+    # Multiple ranges, malformed and reversed ranges fall back to the whole file
+    for header in (None, "", "bytes=0-1,5-9", "items=0-1", "bytes=-", "bytes=a-9", "bytes=9-1"):
+        assert parse_range(header, 1024) is None
+    # Unsatisfiable
+    for header, size in (("bytes=1024-", 1024), ("bytes=-0", 1024), ("bytes=-10", 0)):
+        try:
+            parse_range(header, size)
+        except ValueError:
+            continue
+        raise AssertionError(f"{header} should be unsatisfiable for {size} bytes")
+
+def test_range_responses():
+    path = _recording()
+    try:
+        status, headers, body = _serve(path)
+        assert status == 200 and body == BODY and headers["accept-ranges"] == "bytes"
+
+        status, headers, body = _serve(path, range="bytes=-24")
+        assert status == 206 and body == BODY[-24:]
+        assert headers["content-range"] == "bytes 1000-1023/1024" and headers["content-length"] == "24"
+
+        status, headers, body = _serve(path, range="bytes=1000-")
+        assert status == 206 and body == BODY[1000:]
+
+        status, headers, body = _serve(path, range="bytes=0-9,20-29")
+        assert status == 200 and body == BODY
+
+        status, headers, body = _serve(path, range="bytes=4096-")
+        assert status == 416 and body == b"" and headers["content-range"] == "bytes */1024"
+    finally:
+        os.unlink(path)
+
+def test_conditional_responses():
+    path = _recording()
+    try:
+        _, headers, _ = _serve(path)
+        status, _, body = _serve(path, if_none_match=headers["etag"])
+        assert status == 304 and body == b""
+
+        # If-Range: the range applies only while the validator still matches
+        status, _, body = _serve(path, range="bytes=0-9", if_range=headers["etag"])
+        assert status == 206 and body == BODY[:10]
+        status, _, body = _serve(path, range="bytes=0-9", if_range='"stale"')
+        assert status == 200 and body == BODY
+    finally:
+        os.unlink(path)
+
+def test_allowed_hosts():
+    cache = RecordingCache(tempfile.mkdtemp(), allowed_hosts=("recordings.example.com", "*.cdn.example.com"))
+    assert cache.allows("https://recordings.example.com/a.wav")
+    assert cache.allows("https://eu.cdn.example.com/a.wav")
+    assert not cache.allows("http://recordings.example.com/a.wav")
+    assert not cache.allows("https://cdn.example.com.evil.test/a.wav")
+    assert not cache.allows("https://169.254.169.254/latest/meta-data")
+    assert not cache.allows("file:///etc/passwd")
+    assert RecordingCache(tempfile.mkdtemp()).allows("https://recordings.example.com/a.wav") is False
+
+def test_disallowed_downloads_rejected():
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.host)
+        if request.url.host == "recordings.example.com":
+            return httpx.Response(302, headers={"location": "http://169.254.169.254/latest/meta-data"})
+        return httpx.Response(200, content=b"secret")
+
+    async def scenario():
+        cache = RecordingCache(tempfile.mkdtemp(), allowed_hosts=("recordings.example.com",))
+        cache._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=False)
+        try:
+            for url in ("https://internal.example.com/a.wav", "https://recordings.example.com/a.wav"):
+                try:
+                    await cache.fetch("call_1", "recording", url)
+                except RecordingNotAllowed:
+                    continue
+                raise AssertionError(f"{url} should not be downloaded")
+        finally:
+            await cache.close()
+        assert os.listdir(cache.directory) == []
+
+    asyncio.run(scenario())
+    # The redirect target is never requested
+    assert requested == ["recordings.example.com"]
+
+if __name__ == "__main__":
+    test_parse_range()
+    test_range_responses()
+    test_conditional_responses()
+    test_allowed_hosts()
+    test_disallowed_downloads_rejected()
+    print("✅ Recording ranges and host allowlist handled correctly")
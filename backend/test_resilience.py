@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test the Retell circuit breaker and how call lookups fall back when Retell fails
+"""
+import asyncio
+import os
+import sys
+
+import httpx
+from fastapi import HTTPException
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.resilience import CircuitBreaker, CircuitOpenError
+from app.retell_client import RetellClient, retell_client
+from app.routes.calls import _load_call
+from app.cache import call_cache
+from app.store import call_store
+
+def _open(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=0.05)
+    _open(breaker)
+    try:
+        breaker.before_call()
+        raise AssertionError("open circuit let a call through")
+    except CircuitOpenError:
+        pass
+
+    asyncio.run(asyncio.sleep(0.06))
+    assert breaker.before_call() is True
+    try:
+        breaker.before_call()
+        raise AssertionError("second probe let through while one is in flight")
+    except CircuitOpenError:
+        pass
+    # A probe that ends without an outcome hands the slot to the next caller
+    breaker.release_probe()
+    assert breaker.before_call() is True
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.before_call() is False
+
+def test_unreleased_probe_expires():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.05)
+    _open(breaker)
+    asyncio.run(asyncio.sleep(0.06))
+    assert breaker.before_call() is True
+    asyncio.run(asyncio.sleep(0.06))
+    assert breaker.before_call() is True
+
+def test_cancelled_probe_is_released():
+    async def scenario():
+        async def slow(request):
+            await asyncio.sleep(10)
+            return httpx.Response(200, json={})
+
+        client = RetellClient()
+        client._client = httpx.AsyncClient(base_url="http://retell.test", transport=httpx.MockTransport(slow))
+        client.breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.01)
+        _open(client.breaker)
+        await asyncio.sleep(0.02)
+
+        task = asyncio.create_task(client.get_call("call_probe"))
+        await asyncio.sleep(0.05)
+        assert client.breaker._probe_in_flight
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert not client.breaker._probe_in_flight
+        await client._client.aclose()
+
+    asyncio.run(scenario())
+
+def _load_status(call_id: str, get_call) -> int:
+    original = retell_client.get_call
+    retell_client.get_call = get_call
+    call_cache.invalidate(call_id)
+    try:
+        asyncio.run(_load_call(call_id))
+        return 200
+    except HTTPException as e:
+        return e.status_code
+    finally:
+        retell_client.get_call = original
+
+def _response_error(status_code: int):
+    async def get_call(call_id: str):
+        request = httpx.Request("GET", f"http://retell.test/v2/get-call/{call_id}")
+        response = httpx.Response(status_code, request=request)
+        raise httpx.HTTPStatusError(f"HTTP {status_code}", request=request, response=response)
+    return get_call
+
+def test_lookup_falls_back_and_reports_upstream_failures():
+    async def circuit_open(call_id: str):
+        raise CircuitOpenError("Circuit retell is open")
+
+    assert _load_status("call_fallback_missing", _response_error(404)) == 404
+    assert _load_status("call_fallback_missing", _response_error(500)) == 502
+    assert _load_status("call_fallback_missing", circuit_open) == 503
+
+    # With a stored copy, upstream failures are answered from the store
+    call_store.update_call("call_fallback_stored", {"call_id": "call_fallback_stored", "call_status": "ended"})
+    assert _load_status("call_fallback_stored", _response_error(500)) == 200
+    assert _load_status("call_fallback_stored", circuit_open) == 200
+    call_store.delete_call("call_fallback_stored")
+
+if __name__ == "__main__":
+    test_half_open_lets_one_probe_through()
+    test_unreleased_probe_expires()
+    test_cancelled_probe_is_released()
+    test_lookup_falls_back_and_reports_upstream_failures()
+    print("✅ Circuit breaker and call lookup fallbacks work")
@@ -1,4 +1,4 @@
-import { CreateCallRequest, CreateCallResponse, CallStatus } from '../types/call';
+import { CreateCallRequest, CreateCallResponse, CallStatus, CallStatusSummary, CallEvent, CallBatchResponse } from '../types/call';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
@@ -31,6 +31,61 @@ export const retellApi = {
     return response.json();
   },
 
+  async getCallSummary(callId: string): Promise<CallStatusSummary> {
+    // The backend sends an ETag, so repeat polls are revalidated with a 304
+    const response = await fetch(`${API_BASE_URL}/api/calls/${callId}?view=summary`);
+
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({ detail: 'Failed to get call status' }));
+      throw new Error(error.detail || 'Failed to get call status');
+    }
+
+    return response.json();
+  },
+
+  async getCallsBatch(callIds: string[]): Promise<CallBatchResponse> {
+    // One round-trip for many calls; unknown IDs come back in errors
+    const response = await fetch(`${API_BASE_URL}/api/calls/batch`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ call_ids: callIds, view: 'summary' }),
+    });
+
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({ detail: 'Failed to get calls' }));
+      throw new Error(error.detail || 'Failed to get calls');
+    }
+
+    return response.json();
+  },
+
+  recordingUrl(
+    callId: string,
+    variant: 'recording' | 'recording_multi_channel' | 'scrubbed_recording' | 'scrubbed_recording_multi_channel' = 'recording',
+  ): string {
+    // Served from the backend's recording cache, with Range support for seeking
+    return `${API_BASE_URL}/api/calls/${callId}/recording?variant=${variant}`;
+  },
+
+  subscribeToCall(
+    callId: string,
+    onEvent: (event: CallEvent) => void,
+    onError?: () => void,
+  ): () => void {
+    const source = new EventSource(`${API_BASE_URL}/api/calls/${callId}/events`);
+    const handler = (message: MessageEvent) => onEvent(JSON.parse(message.data));
+
+    // call_updated comes from refreshes against the Retell API (status polls, background sync)
+    ['snapshot', 'call_created', 'call_started', 'call_ended', 'call_analyzed', 'call_updated'].forEach((type) =>
+      source.addEventListener(type, handler as EventListener),
+    );
+    source.onerror = () => onError?.();
+
+    return () => source.close();
+  },
+
   async getAllCalls(): Promise<Array<{
     call_id: string;
     call_status: string;
@@ -2,6 +2,10 @@ import React, { useState, useEffect } from 'react';
 import { retellApi } from '../api/retell';
 import { CallStatus } from '../types/call';
 
+// Summary poll intervals while the event stream is connected, and while it is not
+const STREAM_POLL_MS = 15000;
+const FALLBACK_POLL_MS = 3000;
+
 interface CallAnalysisProps {
   callId: string;
 }
@@ -13,7 +17,7 @@ export const CallAnalysis: React.FC<CallAnalysisProps> = ({ callId }) => {
   const [activeTab, setActiveTab] = useState<string>('overview');
 
   useEffect(() => {
-    let intervalId: number;
+    let intervalId: number | undefined;
 
     const pollCallStatus = async () => {
       try {
@@ -33,12 +37,58 @@ export const CallAnalysis: React.FC<CallAnalysisProps> = ({ callId }) => {
     // Initial fetch
     pollCallStatus();
 
-    // Set up polling if still needed
-    if (isPolling) {
-      intervalId = window.setInterval(pollCallStatus, 3000); // Poll every 3 seconds
+    if (!isPolling) {
+      return;
     }
 
+    // Fallback polling only asks for the slim summary and fetches the full
+    // call (transcript, latency, ...) when its status or analysis changes
+    let lastSummary = '';
+    const pollSummary = async () => {
+      try {
+        const summary = await retellApi.getCallSummary(callId);
+        const key = `${summary.call_status}:${summary.has_analysis}`;
+        if (key !== lastSummary) {
+          lastSummary = key;
+          await pollCallStatus();
+        }
+      } catch (err) {
+        setError(err instanceof Error ? err.message : 'Failed to get call status');
+      }
+    };
+
+    // Refetch whenever the backend pushes an update for this call. The summary
+    // poll keeps running either way, since it is what makes the backend check
+    // Retell when a webhook is missed or webhooks aren't configured: slowly
+    // while the event stream is up, every 3s while it is down
+    const setPollInterval = (ms: number) => {
+      if (intervalId) {
+        window.clearInterval(intervalId);
+      }
+      intervalId = window.setInterval(pollSummary, ms);
+    };
+    setPollInterval(STREAM_POLL_MS);
+
+    let streamDown = false;
+    const unsubscribe = retellApi.subscribeToCall(
+      callId,
+      () => {
+        if (streamDown) {
+          streamDown = false;
+          setPollInterval(STREAM_POLL_MS);
+        }
+        pollCallStatus();
+      },
+      () => {
+        if (!streamDown) {
+          streamDown = true;
+          setPollInterval(FALLBACK_POLL_MS);
+        }
+      },
+    );
+
     return () => {
+      unsubscribe();
       if (intervalId) {
         window.clearInterval(intervalId);
       }
@@ -347,10 +397,10 @@ export const CallAnalysis: React.FC<CallAnalysisProps> = ({ callId }) => {
               Standard mono audio recording of the entire conversation
             </p>
             <audio controls style={{ width: '100%', marginTop: '0.5rem' }}>
-              <source src={callStatus!.recording_url} type="audio/wav" />
+              <source src={retellApi.recordingUrl(callId)} type="audio/wav" />
               Your browser does not support the audio element.
             </audio>
-            <a href={callStatus!.recording_url} target="_blank" rel="noopener noreferrer" style={{ fontSize: '0.9rem' }}>
+            <a href={retellApi.recordingUrl(callId)} target="_blank" rel="noopener noreferrer" style={{ fontSize: '0.9rem' }}>
               Download Recording
             </a>
           </div>
@@ -363,10 +413,10 @@ export const CallAnalysis: React.FC<CallAnalysisProps> = ({ callId }) => {
               Stereo recording with agent and user on separate channels for advanced analysis
             </p>
             <audio controls style={{ width: '100%', marginTop: '0.5rem' }}>
-              <source src={callStatus!.recording_multi_channel_url} type="audio/wav" />
+              <source src={retellApi.recordingUrl(callId, 'recording_multi_channel')} type="audio/wav" />
               Your browser does not support the audio element.
             </audio>
-            <a href={callStatus!.recording_multi_channel_url} target="_blank" rel="noopener noreferrer" style={{ fontSize: '0.9rem' }}>
+            <a href={retellApi.recordingUrl(callId, 'recording_multi_channel')} target="_blank" rel="noopener noreferrer" style={{ fontSize: '0.9rem' }}>
               Download Multi-Channel
             </a>
           </div>
@@ -15,6 +15,17 @@ export interface CallAnalysisData {
   custom_analysis_data?: Record<string, any>;
 }
 
+export interface CallStatusSummary {
+  call_id: string;
+  call_status: string;
+  start_timestamp?: number;
+  end_timestamp?: number;
+  duration_ms?: number;
+  disconnection_reason?: string;
+  agent_name?: string;
+  has_analysis: boolean;
+}
+
 export interface CallStatus {
   call_id: string;
   call_status: string;
@@ -40,4 +51,27 @@ export interface CallStatus {
   llm_token_usage?: Record<string, any>;
   retell_llm_dynamic_variables?: Record<string, any>;
   collected_dynamic_variables?: Record<string, any>;
-}
\ No newline at end of file
+}
+
+export interface CallEvent {
+  event: string;
+  call_id: string;
+  call_status?: string;
+  has_analysis: boolean;
+  start_timestamp?: number;
+  end_timestamp?: number;
+  published_at?: number;
+}
+
+export interface CallBatchError {
+  call_id: string;
+  status_code: number;
+  detail: string;
+}
+
+export interface CallBatchResponse<T = CallStatusSummary> {
+  calls: T[];
+  errors: CallBatchError[];
+  from_store: number;
+  refreshed: number;
+}